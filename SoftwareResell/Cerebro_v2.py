@@ -2,10 +2,13 @@ from config import SECRET_KEY
 import asyncio
 from inventory.state import marcar_vendido
 
-from Sincronizador import borrar_en_depop
-from SincronizadorPosh import borrar_en_poshmark
+from delist import DelistIncompleto, imprimir_resultados, obtener_orquestador
+from pool_navegador import cerrar_pools
+from dedup import obtener_indice
+from ebay_ids import es_item_id
 
 from logger import log_accion
+from metricas import cronometrar
 
 # ✅ Seguro por defecto:
 # True = NO borra nada (solo simula)
@@ -21,7 +24,8 @@ def confirmar_borrado(sku: str, platform: str) -> bool:
     return confirmacion.strip().upper() == "SI"
 
 
-async def procesar_evento(evento: dict):
+@cronometrar("procesar_evento")
+async def procesar_evento(evento: dict, trabajo_id=None):
     print("🧠 Cerebro v2 activo")
     print(f"📩 Evento recibido: {evento}")
 
@@ -41,25 +45,68 @@ async def procesar_evento(evento: dict):
         print("❌ Plataforma inválida. Usa: ebay, depop, poshmark")
         return
 
-    # 1) Guardar estado
-    marcar_vendido(sku, platform)
+    # 0) Dedup: reintentos del webhook / re-corridas de la cola no rehacen nada.
+    # El reclamo es del trabajo de la cola: si este proceso muere a mitad de
+    # camino, la re-entrega del mismo trabajo lo retoma.
+    # 1) Guardar estado.
+    # SQLite es bloqueante: las dos cosas van juntas a un hilo para no frenar
+    # el event loop (server_webhook atiende HTTP en el mismo loop)
+    indice = obtener_indice()
+    dueno = None if trabajo_id is None else str(trabajo_id)
+
+    def reclamar_y_marcar() -> bool:
+        if indice.es_duplicado(evento, dueno):
+            return False
+        try:
+            marcar_vendido(sku, platform)
+        except Exception:
+            indice.olvidar(evento)
+            raise
+        return True
+
+    if not await asyncio.to_thread(reclamar_y_marcar):
+        print(f"♻️ Evento duplicado ignorado (SKU: {sku}, {platform})")
+        return
     print("💾 Estado actualizado (SOLD)")
 
+    # un reintento de un delist incompleto trae las plataformas que faltaron
+    pendientes = evento.get("pendientes")
+
+    try:
+        await _procesar_venta(sku, platform, pendientes)
+    except DelistIncompleto as e:
+        await asyncio.to_thread(indice.olvidar, evento)
+        # la cola lo reintenta (backoff / dead-letter) solo con lo que falló
+        e.payload_reintento = {**evento, "pendientes": e.pendientes}
+        raise
+    except Exception:
+        # si falló, que el próximo reintento sí se procese
+        await asyncio.to_thread(indice.olvidar, evento)
+        raise
+    await asyncio.to_thread(indice.confirmar, evento)
+
+
+async def _procesar_venta(sku: str, platform: str, pendientes=None):
+    # (el estado SOLD ya lo guardó procesar_evento junto con el dedup)
     # 2) Log (siempre, incluso en simulado)
     modo = "SIMULADO" if MODO_PRUEBA else "REAL"
     log_accion("ITEM_SOLD", sku, platform, modo)
 
     # 3) Determinar qué plataformas limpiar (no borres donde se vendió)
-    limpiar_depop = platform != "depop"
-    limpiar_posh = platform != "poshmark"
+    limpiar = [p for p in ("ebay", "depop", "poshmark") if p != platform]
+    if pendientes is not None:
+        limpiar = [p for p in limpiar if p in pendientes]
+    # en eBay se termina por ItemID: si el SKU no lo es, no hay listing que
+    # terminar (no existe un mapa SKU -> ItemID)
+    if "ebay" in limpiar and not es_item_id(sku):
+        limpiar.remove("ebay")
+        print(f"ℹ️ SKU {sku} no es un ItemID de eBay → no se termina nada en eBay")
 
     # 4) Modo seguro (simulación)
     if MODO_PRUEBA:
         print("🟡 MODO_PRUEBA = True → NO se borra nada.")
-        if limpiar_depop:
-            print(f"🧪 SIMULADO: Delist en Depop para SKU: {sku}")
-        if limpiar_posh:
-            print(f"🧪 SIMULADO: Delist en Poshmark para SKU: {sku}")
+        for p in limpiar:
+            print(f"🧪 SIMULADO: Delist en {p} para SKU: {sku}")
         return
 
     # 5) Confirmación humana obligatoria
@@ -67,17 +114,14 @@ async def procesar_evento(evento: dict):
         print("❌ Borrado cancelado por el usuario.")
         return
 
-    # 6) Delist REAL
-    tareas = []
-    if limpiar_depop:
-        print("🧹 Delist REAL en Depop...")
-        tareas.append(borrar_en_depop(sku))
-
-    if limpiar_posh:
-        print("🧹 Delist REAL en Poshmark...")
-        tareas.append(borrar_en_poshmark(sku))
-
-    await asyncio.gather(*tareas)
+    # 6) Delist REAL: todas las plataformas a la vez, cada una con su límite,
+    # reintentos y deadline (ver delist.py)
+    print(f"🧹 Delist REAL en {', '.join(limpiar)}...")
+    resultados = await obtener_orquestador().delist(sku, limpiar)
+    imprimir_resultados(resultados)
+    if not all(r.ok for r in resultados):
+        print("⚠️ Delist cruzado incompleto (ver logs/acciones.log)")
+        raise DelistIncompleto(sku, resultados)
     print("✅ Delist cruzado REAL completado")
 
 
@@ -87,7 +131,10 @@ async def main():
         "platform": "ebay",
         "sku": "SKU-DEMO-123"
     }
-    await procesar_evento(evento_demo)
+    try:
+        await procesar_evento(evento_demo)
+    finally:
+        await cerrar_pools()
 
 
 if __name__ == "__main__":
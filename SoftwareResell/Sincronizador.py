@@ -1,39 +1,19 @@
-import asyncio
-from playwright.async_api import async_playwright
-import os
+from metricas import medir
+from pool_navegador import obtener_pool
 
 async def borrar_en_depop(nombre_item):
-    async with async_playwright() as p:
-        ruta_perfil = os.path.join(os.getcwd(), "perfil_depop")
-        
-        context = await p.chromium.launch_persistent_context(
-            user_data_dir=ruta_perfil,
-            channel="chrome",
-            headless=False,
-            args=["--disable-blink-features=AutomationControlled"]
-        )
-        
-        page = context.pages[0]
-        await page.set_viewport_size({"width": 1920, "height": 1080})
-        
-        print(f"🤖 Depop: Entrando al inventario...")
-        
-        try:
-            # CAMBIO AQUÍ: 'domcontentloaded' es mucho más rápido que 'networkidle'
-            await page.goto("https://www.depop.com/products/manage/", wait_until="domcontentloaded", timeout=60000)
-            
-            print(f"🔍 Buscando: {nombre_item}")
-            # Esperamos a la barra de búsqueda específicamente
-            search_bar = page.locator('input[id*="search"], [role="searchbox"]').first
-            await search_bar.wait_for(state="visible", timeout=20000)
-            
-            await search_bar.fill(nombre_item)
-            await page.keyboard.press("Enter")
-            
-            print(f"✅ Búsqueda realizada.")
-            await page.wait_for_timeout(5000) # Tiempo para que veas el resultado
-            
-        except Exception as e:
-            print(f"❌ Error en Depop: {e}")
+    # Reutiliza el navegador tibio de perfil_depop (ver pool_navegador.py)
+    pool = obtener_pool("depop")
 
-        await context.close()
+    print(f"🤖 Depop: Entrando al inventario...")
+    print(f"🔍 Buscando: {nombre_item}")
+    try:
+        with medir("borrar_en_depop"):
+            ms = await pool.ejecutar(nombre_item)
+        print(f"✅ Búsqueda realizada ({ms:.0f} ms).")
+    except Exception as e:
+        print(f"❌ Error en Depop: {e}")
+
+async def borrar_en_depop_lote(skus):
+    # Procesa una cola de SKUs con las páginas ya abiertas
+    return await obtener_pool("depop").procesar(list(skus))
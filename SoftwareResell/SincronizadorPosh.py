@@ -1,29 +1,16 @@
-import asyncio
-from playwright.async_api import async_playwright
-import os
+from pool_navegador import obtener_pool
 
 async def borrar_en_poshmark(nombre_item):
-    async with async_playwright() as p:
-        ruta_perfil = os.path.join(os.getcwd(), "perfil_poshmark")
-        
-        context = await p.chromium.launch_persistent_context(
-            user_data_dir=ruta_perfil,
-            channel="chrome",
-            headless=False,
-            args=["--disable-blink-features=AutomationControlled"]
-        )
-        
-        page = context.pages[0]
-        await page.set_viewport_size({"width": 1920, "height": 1080})
-        
-        print(f"👔 Poshmark: Abriendo página...")
-        # Esta URL no da error 404, te lleva a entrar a tu cuenta
-        await page.goto("https://poshmark.com/login", wait_until="domcontentloaded")
+    # Reutiliza el navegador tibio de perfil_poshmark (ver pool_navegador.py).
+    # Si no hay sesión, espera a que inicies sesión (sin los 60s fijos).
+    pool = obtener_pool("poshmark")
 
-        print("⚠️ POR FAVOR: Inicia sesión manualmente en la ventana que se abrió.")
-        print("⏳ El bot esperará a que termines...")
-        
-        # El bot esperará 60 segundos para que tú pongas tu clave y entres
-        await page.wait_for_timeout(60000) 
+    print(f"👔 Poshmark: Abriendo página...")
+    try:
+        ms = await pool.ejecutar(nombre_item)
+        print(f"✅ Poshmark: búsqueda realizada ({ms:.0f} ms).")
+    except Exception as e:
+        print(f"❌ Error en Poshmark: {e}")
 
-        await context.close()
\ No newline at end of file
+async def borrar_en_poshmark_lote(skus):
+    return await obtener_pool("poshmark").procesar(list(skus))
@@ -1,40 +1,12 @@
-from http.server import BaseHTTPRequestHandler, HTTPServer
-import json
-import os
+# Copia vieja del servicio web: ahora todo vive en ../app.py (servidor en
+# ../servidor_http.py). Se deja este atajo para no romper despliegues que
+# todavía arrancan "python SoftwareResell/app.py".
+import sys
+from pathlib import Path
 
-PORT = int(os.environ.get("PORT", "10000"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-class Handler(BaseHTTPRequestHandler):
-    def _send(self, code=200, payload=None):
-        self.send_response(code)
-        self.send_header("Content-Type", "application/json")
-        self.end_headers()
-        if payload is None:
-            payload = {"ok": True}
-        self.wfile.write(json.dumps(payload).encode("utf-8"))
-
-    def do_GET(self):
-        if self.path == "/" or self.path.startswith("/health"):
-            return self._send(200, {"ok": True, "service": "software-resell"})
-        return self._send(404, {"ok": False, "error": "not_found"})
-
-    def do_POST(self):
-        # Endpoint para futuro: /webhook
-        if not self.path.startswith("/webhook"):
-            return self._send(404, {"ok": False, "error": "not_found"})
-        length = int(self.headers.get("Content-Length", "0"))
-        raw = self.rfile.read(length) if length > 0 else b"{}"
-        try:
-            data = json.loads(raw.decode("utf-8"))
-        except Exception:
-            data = {"raw": raw.decode("utf-8", errors="ignore")}
-        # Por ahora solo confirma recibido
-        return self._send(200, {"ok": True, "received": data})
-
-def main():
-    server = HTTPServer(("0.0.0.0", PORT), Handler)
-    print(f"Listening on port {PORT} ...")
-    server.serve_forever()
+from app import main
 
 if __name__ == "__main__":
     main()
@@ -1,82 +1,164 @@
-from http.server import BaseHTTPRequestHandler, HTTPServer
+import hashlib
+import hmac
 import json
 import os
-from urllib.parse import urlparse, parse_qs
+import random
+import time
+
+from metricas import exponer
+from servidor_http import App, Pedido, servir
 
 PORT = int(os.environ.get("PORT", "10000"))
 API_KEY = os.environ.get("API_KEY", "") # puede estar vacío si no quieres clave
 
-def _json_bytes(obj):
-    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
-
-class Handler(BaseHTTPRequestHandler):
-    def _send(self, code=200, payload=None):
-        self.send_response(code)
-        self.send_header("Content-Type", "application/json")
-        self.end_headers()
-        if payload is None:
-            payload = {"ok": True}
-        self.wfile.write(_json_bytes(payload))
-
-    def _get_key_from_query(self):
-        parsed = urlparse(self.path)
-        qs = parse_qs(parsed.query)
-        return (qs.get("key", [""])[0] or "").strip()
-
-    def _authorized(self):
-        # Acepta key por querystring ?key=...
-        provided = self._get_key_from_query()
-        if not API_KEY:
-            return True # si no hay API_KEY en Render, no exige nada
-        return provided == API_KEY
-
-    def do_GET(self):
-        parsed = urlparse(self.path)
-        path = parsed.path
-
-        # Log básico
-        print(f"[GET] {path} from {self.client_address[0]}", flush=True)
-
-        if path == "/" or path.startswith("/health"):
-            return self._send(200, {"ok": True, "service": "software-resell"})
-        return self._send(404, {"ok": False, "error": "not_found"})
-
-    def do_POST(self):
-        parsed = urlparse(self.path)
-        path = parsed.path
-
-        length = int(self.headers.get("Content-Length", "0"))
-        raw = self.rfile.read(length) if length > 0 else b""
-        raw_text = raw.decode("utf-8", errors="ignore")
-
-        # Log COMPLETO para Render Free
-        print("----- INCOMING REQUEST -----", flush=True)
-        print(f"Method: POST", flush=True)
-        print(f"Path: {path}", flush=True)
-        print(f"Query: {parsed.query}", flush=True)
-        print(f"From: {self.client_address[0]}", flush=True)
-        print(f"Content-Length: {length}", flush=True)
-        print(f"Body(raw): {raw_text}", flush=True)
-        print("----------------------------", flush=True)
-
-        if path not in ("/webhook", "/sold", "/prepared", "/delist"):
-            return self._send(404, {"ok": False, "error": "not_found"})
-
-        if not self._authorized():
-            return self._send(401, {"ok": False, "error": "unauthorized"})
-
-        try:
-            data = json.loads(raw_text) if raw_text else {}
-        except Exception:
-            data = {"raw": raw_text}
-
-        # Respuesta estándar
-        return self._send(200, {"ok": True, "path": path, "received": data})
+# Firma HMAC (recomendado en lugar de ?key=):
+#   X-Signature: sha256=<hex de HMAC-SHA256(WEBHOOK_SECRET, "<unix>.<cuerpo>")>
+#   X-Signature-Timestamp: <unix>   (se rechaza fuera de ±FIRMA_TOLERANCIA_S)
+# Con WEBHOOK_SECRET definido la firma y el timestamp son obligatorios: una
+# firma sin timestamp serviría para siempre y un POST capturado se podría
+# reenviar (un /delist repetido borra de nuevo). Sin secreto ni API_KEY no se
+# exige nada (como antes).
+WEBHOOK_SECRET = os.environ.get("WEBHOOK_SECRET", "")
+FIRMA_TOLERANCIA_S = 300
+
+# Debug: APP_DEBUG=0.05 imprime el request completo de ~5% de los POST
+# (APP_DEBUG=1 todos). Sin APP_DEBUG solo sale una línea por request.
+DEBUG_MUESTRA = float(os.environ.get("APP_DEBUG", "0") or 0)
+DEBUG_BODY_MAX = 4000
+
+MAX_BODY = 1_000_000
+MAX_EVENTOS = 500 # eventos por POST (un objeto o un array)
+PLATFORMS = ("ebay", "depop", "poshmark")
+RUTAS = ("/webhook", "/sold", "/prepared", "/delist")
+
+# HMAC ya inicializado con la clave: por request solo se copia
+_HMAC_BASE = hmac.new(WEBHOOK_SECRET.encode("utf-8"), digestmod=hashlib.sha256) if WEBHOOK_SECRET else None
+
+def firmar(cuerpo: bytes, timestamp: str, secreto: str = WEBHOOK_SECRET) -> str:
+    """Valor de X-Signature para `cuerpo` (lo que tiene que mandar el emisor)."""
+    msg = f"{timestamp}.".encode("ascii") + cuerpo
+    return "sha256=" + hmac.new(secreto.encode("utf-8"), msg, hashlib.sha256).hexdigest()
+
+def firma_valida(cuerpo: bytes, firma: str, timestamp: str, ahora: float = 0.0) -> bool:
+    if _HMAC_BASE is None or not timestamp:
+        return False
+    try:
+        if abs((ahora or time.time()) - int(timestamp)) > FIRMA_TOLERANCIA_S:
+            return False
+    except ValueError:
+        return False
+    h = _HMAC_BASE.copy()
+    h.update(f"{timestamp}.".encode("ascii"))
+    h.update(cuerpo)
+    esperado = "sha256=" + h.hexdigest()
+    firma = firma.strip()
+    if not firma.startswith("sha256="):
+        firma = "sha256=" + firma
+    # comparación en tiempo constante: no filtra cuántos caracteres coinciden
+    return hmac.compare_digest(esperado.encode("ascii"), firma.encode("ascii", errors="replace"))
+
+# ----------------------------
+# Validación por ruta
+# ----------------------------
+
+def _validar(path: str, ev) -> str:
+    """Vacío si el evento es válido para la ruta; si no, el motivo."""
+    if not isinstance(ev, dict):
+        return "el evento debe ser un objeto JSON"
+    if path == "/webhook":
+        return ""
+    sku = str(ev.get("sku") or ev.get("item_id") or "").strip()
+    if not sku:
+        return "falta sku (o item_id)"
+    platform = str(ev.get("platform") or "").strip().lower()
+    if path == "/sold":
+        if platform not in PLATFORMS:
+            return f"platform inválida: usa {', '.join(PLATFORMS)}"
+        event = str(ev.get("event") or "ITEM_SOLD").strip().upper()
+        if event != "ITEM_SOLD":
+            return f"event inesperado en /sold: {event}"
+    elif path == "/delist" and platform and platform not in PLATFORMS:
+        return f"platform inválida: usa {', '.join(PLATFORMS)}"
+    return ""
+
+def procesar_lote(path: str, data) -> dict:
+    """Un objeto o un array de eventos → resultado por evento."""
+    eventos = data if isinstance(data, list) else [data]
+    if len(eventos) > MAX_EVENTOS:
+        return {"ok": False, "error": f"máximo {MAX_EVENTOS} eventos por request", "code": 413}
+    resultados = []
+    aceptados = 0
+    for i, ev in enumerate(eventos):
+        error = _validar(path, ev)
+        if error:
+            resultados.append({"index": i, "ok": False, "error": error})
+            continue
+        aceptados += 1
+        r = {"index": i, "ok": True}
+        if isinstance(ev, dict) and (ev.get("sku") or ev.get("item_id")):
+            r["sku"] = str(ev.get("sku") or ev.get("item_id")).strip()
+        resultados.append(r)
+    rechazados = len(eventos) - aceptados
+    code = 200 if not rechazados else (207 if aceptados else 400)
+    return {"ok": rechazados == 0, "code": code, "path": path, "batch": isinstance(data, list),
+            "accepted": aceptados, "rejected": rechazados, "results": resultados}
+
+# ----------------------------
+# Rutas (servidor: servidor_http.py)
+# ----------------------------
+
+app = App(max_body=MAX_BODY)
+
+def _authorized(pedido: Pedido) -> bool:
+    if WEBHOOK_SECRET:
+        return firma_valida(pedido.cuerpo, pedido.headers.get("X-Signature", ""),
+                            pedido.headers.get("X-Signature-Timestamp", "").strip())
+    if not API_KEY:
+        return True # si no hay API_KEY en Render, no exige nada
+    # Acepta key por querystring ?key=... (comparación en tiempo constante)
+    return hmac.compare_digest(pedido.param("key").encode("utf-8"), API_KEY.encode("utf-8"))
+
+@app.ruta("GET", "/", "/health", "/healthz")
+def health(pedido: Pedido):
+    print(f"[GET] {pedido.path} from {pedido.cliente}", flush=True)
+    return 200, {"ok": True, "service": "software-resell"}
+
+@app.ruta("GET", "/metrics")
+def metrics(pedido: Pedido):
+    # formato de texto de Prometheus; con API_KEY se pide ?key= igual que en los POST
+    if API_KEY and not hmac.compare_digest(pedido.param("key").encode("utf-8"), API_KEY.encode("utf-8")):
+        return 401, {"ok": False, "error": "unauthorized"}
+    return 200, exponer()
+
+@app.ruta("POST", *RUTAS)
+def recibir(pedido: Pedido):
+    t0 = time.perf_counter()
+    raw = pedido.cuerpo
+
+    if DEBUG_MUESTRA and random.random() < DEBUG_MUESTRA:
+        body = raw[:DEBUG_BODY_MAX].decode("utf-8", errors="replace")
+        print("----- INCOMING REQUEST (debug) -----\n"
+              f"Path: {pedido.path}\nQuery: {pedido.query}\nFrom: {pedido.cliente}\n"
+              f"Content-Length: {len(raw)}\nBody(raw): {body}{' ...' if len(raw) > DEBUG_BODY_MAX else ''}\n"
+              "------------------------------------", flush=True)
+
+    # la firma se verifica sobre los bytes, antes de parsear nada
+    if not _authorized(pedido):
+        return 401, {"ok": False, "error": "unauthorized"}
+
+    try:
+        data = json.loads(raw) if raw else {}
+    except Exception as e:
+        return 400, {"ok": False, "error": f"JSON inválido: {e}"}
+
+    res = procesar_lote(pedido.path, data)
+    code = res.pop("code")
+    print(f"[POST] {pedido.path} from {pedido.cliente}: {res.get('accepted', 0)} ok / "
+          f"{res.get('rejected', 0)} rechazados ({(time.perf_counter() - t0) * 1000:.1f} ms)", flush=True)
+    return code, res
 
 def main():
-    server = HTTPServer(("0.0.0.0", PORT), Handler)
-    print(f"Listening on port {PORT} ...", flush=True)
-    server.serve_forever()
+    servir(app, "0.0.0.0", PORT)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,95 @@
+# bench_app.py
+# Uso:
+# python benchmarks/bench_app.py [N_EVENTOS]
+#
+# app.py con WEBHOOK_SECRET (firma HMAC) en un puerto local:
+# 1) N_EVENTOS ventas en N POST firmados vs un solo POST con el array
+# 2) costo de verificar la firma (HMAC precargado + compare_digest)
+# 3) que una firma mala, vencida, ausente o sin timestamp se rechace y que un lote
+#    mezclado devuelva el resultado de cada evento
+
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ["WEBHOOK_SECRET"] = "secreto-de-prueba"
+os.environ.pop("APP_DEBUG", None)
+
+import app
+from servidor_http import ServidorHTTP
+
+
+def _post(port: int, path: str, cuerpo: bytes, headers: dict):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request("POST", path, body=cuerpo, headers={"Content-Type": "application/json", **headers})
+    r = conn.getresponse()
+    data = json.loads(r.read())
+    conn.close()
+    return r.status, data
+
+
+def _firmado(eventos) -> tuple:
+    cuerpo = json.dumps(eventos).encode("utf-8")
+    ts = str(int(time.time()))
+    return cuerpo, {"X-Signature": app.firmar(cuerpo, timestamp=ts), "X-Signature-Timestamp": ts}
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    srv = ServidorHTTP(app.app, "127.0.0.1", 0)
+    port = srv.port
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    eventos = [{"event": "ITEM_SOLD", "platform": "depop", "sku": f"SKU-{i:05d}"} for i in range(n)]
+
+    salida = sys.stdout
+    sys.stdout = open(os.devnull, "w", encoding="utf-8") # la línea por request de app.py
+    try:
+        t0 = time.perf_counter()
+        for ev in eventos:
+            code, _ = _post(port, "/sold", *_firmado(ev))
+            assert code == 200
+        uno_por_uno = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        code, res = _post(port, "/sold", *_firmado(eventos))
+        lote = time.perf_counter() - t0
+        assert code == 200 and res["accepted"] == n
+
+        cuerpo, h = _firmado(eventos)
+        assert _post(port, "/sold", cuerpo, {**h, "X-Signature": "sha256=" + "0" * 64})[0] == 401
+        assert _post(port, "/sold", cuerpo, {})[0] == 401
+        assert _post(port, "/sold", cuerpo, {"X-Signature": h["X-Signature"]})[0] == 401 # sin timestamp
+        viejo = str(int(time.time()) - 3600)
+        assert _post(port, "/sold", cuerpo, {"X-Signature": app.firmar(cuerpo, timestamp=viejo),
+                                            "X-Signature-Timestamp": viejo})[0] == 401
+        mezcla = [eventos[0], {"sku": "X"}, {"platform": "ebay"}, "texto"]
+        code, res = _post(port, "/sold", *_firmado(mezcla))
+    finally:
+        sys.stdout.close()
+        sys.stdout = salida
+    srv.apagar()
+
+    print(f"📨 {n} ventas firmadas:")
+    print(f"   {n} POST:       {uno_por_uno * 1000:7.1f} ms ({uno_por_uno / n * 1000:.2f} ms/evento)")
+    print(f"   1 POST (array): {lote * 1000:7.1f} ms ({lote / n * 1000:.3f} ms/evento)")
+
+    ts = str(int(time.time()))
+    firma = app.firmar(cuerpo, timestamp=ts)
+    reps = 5000
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        app.firma_valida(cuerpo, firma, ts)
+    print(f"🔐 verificar firma de {len(cuerpo) / 1024:.0f} KB: {(time.perf_counter() - t0) / reps * 1e6:.1f} µs")
+    print("🚫 firma mala / ausente / sin timestamp / vencida → 401")
+    print(f"🧾 lote mezclado → HTTP {code}: " + ", ".join(
+        f"#{r['index']} {'ok' if r['ok'] else r['error']}" for r in res["results"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# bench_cliente.py
+# Uso:
+# python benchmarks/bench_cliente.py [N_LLAMADAS]
+#
+# ebay_cliente.py contra el stub de la Trading API (stub_trading.py) con
+# límites de eBay simulados, cuota en un directorio temporal:
+# 1) stub que acepta 5 llamadas/s (ErrorCode 518 pasado eso): GetItem a
+#    ciegas como antes (requests.post, sin reintentos) vs el cliente con cubo
+#    de tokens a 10 rps que frena solo y reintenta con backoff
+# 2) EndItem mientras 8 hilos saturan el cubo con GetItem: latencia con
+#    prioridad vs sin prioridad
+# 3) cuota diaria compartida por 2 procesos: entre los dos no pasan del
+#    límite de las masivas y el EndItem todavía entra con la reserva
+# 4) 30% de HTTP 503: todas las llamadas terminan bien con reintentos
+# Falla (exit 1) si alguna verificación no se cumple.
+
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import metricas
+from ebay_cliente import ClienteTrading, CuboTokens, CuotaAgotada, CuotaEbay, ErrorEbay, obtener_session
+from ebay_xml import ack_rapido
+from stub_trading import StubTrading
+
+BASE_ID = 296000000000
+
+
+def _get_item(item_id: str) -> str:
+    return (f'<?xml version="1.0" encoding="utf-8"?><GetItemRequest xmlns="urn:ebay:apis:eBLBaseComponents">'
+            f"<RequesterCredentials><eBayAuthToken>TOKEN</eBayAuthToken></RequesterCredentials>"
+            f"<ItemID>{item_id}</ItemID></GetItemRequest>")
+
+
+def _end_item(item_id: str) -> str:
+    return (f'<?xml version="1.0" encoding="utf-8"?><EndItemRequest xmlns="urn:ebay:apis:eBLBaseComponents">'
+            f"<RequesterCredentials><eBayAuthToken>TOKEN</eBayAuthToken></RequesterCredentials>"
+            f"<ItemID>{item_id}</ItemID><EndingReason>NotAvailable</EndingReason></EndItemRequest>")
+
+
+def _cliente(url: str, tmp: Path, rps: float = 0, por_dia: int = 0) -> ClienteTrading:
+    return ClienteTrading(url, cubo=CuboTokens(rps=rps), cuota=CuotaEbay(tmp / "cuota.db", por_dia=por_dia, por_hora=0))
+
+
+def throttling(n: int, tmp: Path) -> None:
+    stub = StubTrading(latencia_ms=20, limite_rps=5, seed=1)
+    ids = stub.cargar_catalogo(n)
+    url = stub.start()
+
+    def a_ciegas(item_id: str) -> bool:
+        r = obtener_session().post(url, data=_get_item(item_id).encode("utf-8"), timeout=30,
+                                   headers={"X-EBAY-API-CALL-NAME": "GetItem", "Content-Type": "text/xml"})
+        return ack_rapido(r.text)[0] == "Success"
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        ok_viejo = sum(ex.map(a_ciegas, ids))
+    viejo = time.perf_counter() - t0
+
+    time.sleep(1.0) # ventana del stub vacía
+    stub.rechazadas.clear()
+    cliente = _cliente(url, tmp, rps=10)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        xmls = list(ex.map(lambda i: cliente.llamar("GetItem", _get_item(i)), ids))
+    nuevo = time.perf_counter() - t0
+    stub.stop()
+
+    ok_nuevo = sum(ack_rapido(x)[0] == "Success" for x in xmls)
+    print(f"🚦 stub a 5 llamadas/s, {n} GetItem con 8 hilos:")
+    print(f"   a ciegas: {ok_viejo}/{n} OK en {viejo:.2f}s")
+    print(f"   cliente:  {ok_nuevo}/{n} OK en {nuevo:.2f}s | 518 recibidos={stub.rechazadas.get('518', 0)} "
+          f"| rps final={cliente.cubo.rps:.2f}")
+    assert ok_viejo < n, "el stub no limitó nada"
+    assert ok_nuevo == n, "el cliente dejó llamadas sin terminar"
+
+
+def prioridad(tmp: Path) -> None:
+    stub = StubTrading(latencia_ms=20)
+    ids = stub.cargar_catalogo(200)
+    url = stub.start()
+    res = {}
+    for prioritaria in (False, True):
+        cliente = _cliente(url, tmp, rps=5)
+        corriendo = threading.Event()
+        corriendo.set()
+
+        def masivo(k: int) -> None:
+            i = k
+            while corriendo.is_set():
+                cliente.llamar("GetItem", _get_item(ids[i % len(ids)]))
+                i += 8
+
+        hilos = [threading.Thread(target=masivo, args=(k,)) for k in range(8)]
+        for h in hilos:
+            h.start()
+        time.sleep(2.0) # ráfaga gastada: el cubo está saturado
+        lat = []
+        for k in range(5):
+            t0 = time.perf_counter()
+            cliente.llamar("EndItem", _end_item(str(BASE_ID + 1000 + k + 10 * prioritaria)), prioritaria=prioritaria)
+            lat.append(time.perf_counter() - t0)
+        corriendo.clear()
+        for h in hilos:
+            h.join()
+        res[prioritaria] = sorted(lat)[len(lat) // 2]
+    stub.stop()
+    print(f"🚑 EndItem con 8 hilos de GetItem saturando un cubo de 5 rps (mediana de 5):")
+    print(f"   sin prioridad: {res[False] * 1000:6.0f} ms")
+    print(f"   con prioridad: {res[True] * 1000:6.0f} ms")
+    assert res[True] < res[False] / 2, "la prioridad no adelantó al EndItem"
+
+
+def hijo(url: str, db: str, n: int, por_dia: int) -> None:
+    # un proceso de crosslist que gasta cuota: imprime {"ok": ..., "agotada": ...}
+    metricas.activar(False)
+    cliente = ClienteTrading(url, cubo=CuboTokens(rps=0), cuota=CuotaEbay(Path(db), por_dia=por_dia, por_hora=0))
+    ok = agotada = 0
+    for k in range(n):
+        try:
+            cliente.llamar("GetItem", _get_item(str(BASE_ID + k)))
+            ok += 1
+        except CuotaAgotada:
+            agotada += 1
+    print(json.dumps({"ok": ok, "agotada": agotada}))
+
+
+def cuota(tmp: Path) -> None:
+    stub = StubTrading(latencia_ms=5)
+    stub.cargar_catalogo(50)
+    url = stub.start()
+    por_dia, n = 20, 15
+    db = tmp / "cuota_compartida.db"
+    procs = [subprocess.Popen([sys.executable, __file__, "--hijo", url, str(db), str(n), str(por_dia)],
+                              stdout=subprocess.PIPE, text=True) for _ in range(2)]
+    res = [json.loads(p.communicate()[0].strip().splitlines()[-1]) for p in procs]
+    masivas = sum(r["ok"] for r in res)
+
+    cuota_ebay = CuotaEbay(db, por_dia=por_dia, por_hora=0)
+    cliente = ClienteTrading(url, cubo=CuboTokens(rps=0), cuota=cuota_ebay)
+    xml = cliente.llamar("EndItem", _end_item(str(BASE_ID + 1)))
+    usadas = cuota_ebay.stats()["dia"]["usadas"]
+    try:
+        cliente.llamar("GetItem", _get_item(str(BASE_ID + 2)))
+        extra = "pasó"
+    except CuotaAgotada as e:
+        extra = f"CuotaAgotada ({e.libre_en_s / 3600:.1f} h para liberarse)"
+    stub.stop()
+    print(f"🎫 cuota diaria {por_dia} (reserva EndItem {cuota_ebay.reserva:.0%}), 2 procesos x {n} GetItem:")
+    print(f"   GetItem OK entre los dos: {masivas} | rechazadas sin llamar: {sum(r['agotada'] for r in res)} "
+          f"| llamadas al stub: {stub.llamadas.get('GetItem', 0)}")
+    print(f"   EndItem después: {ack_rapido(xml)[0]} | usadas hoy: {usadas} | otro GetItem: {extra}")
+    assert masivas == int(por_dia * (1 - cuota_ebay.reserva)) == stub.llamadas.get("GetItem", 0)
+    assert ack_rapido(xml)[0] == "Success" and usadas == masivas + 1
+    assert extra != "pasó"
+
+
+def errores_5xx(tmp: Path) -> None:
+    stub = StubTrading(latencia_ms=5, fallos_5xx=0.3, seed=3)
+    ids = stub.cargar_catalogo(30)
+    cliente = _cliente(stub.start(), tmp)
+    t0 = time.perf_counter()
+    fallidas = 0
+    for i in ids:
+        try:
+            cliente.llamar("GetItem", _get_item(i))
+        except ErrorEbay:
+            fallidas += 1
+    dt = time.perf_counter() - t0
+    stub.stop()
+    print(f"🔁 30% de HTTP 503, {len(ids)} GetItem: {len(ids) - fallidas}/{len(ids)} OK en {dt:.2f}s "
+          f"| 503 recibidos={stub.rechazadas.get('503', 0)}")
+    assert not fallidas
+
+
+def main() -> None:
+    if sys.argv[1:2] == ["--hijo"]:
+        hijo(sys.argv[2], sys.argv[3], int(sys.argv[4]), int(sys.argv[5]))
+        return
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        try:
+            throttling(n, tmp)
+            prioridad(tmp)
+            cuota(tmp)
+            errores_5xx(tmp)
+        except AssertionError as e:
+            print(f"❌ {e or 'verificación fallida'}")
+            sys.exit(1)
+        finally:
+            # que el benchmark no deje un volcado en logs/metricas/
+            metricas._METRICAS = None
+    print("✅ Cliente de la Trading API OK")
+
+
+if __name__ == "__main__":
+    main()
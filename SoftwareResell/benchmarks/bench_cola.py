@@ -0,0 +1,96 @@
+# bench_cola.py
+# Uso:
+# python benchmarks/bench_cola.py [N_TRABAJOS] [CONSUMIDORES]
+#
+# Cola persistente (cola.py) en un directorio temporal:
+# 1) encolar de a uno (como el webhook) y en lote
+# 2) CONSUMIDORES procesos tomando y confirmando a la vez: trabajos/s y
+#    control de que cada trabajo se confirmó exactamente una vez
+# 3) un consumidor que se "cuelga" (toma y no confirma): al vencer el lease
+#    otro lo retoma; un trabajo que siempre falla termina en dead-letter
+
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import cola as cola_mod
+from cola import ColaTrabajos
+
+
+def _consumir(args):
+    path, nombre, lote = args
+    c = ColaTrabajos(Path(path))
+    vistos = []
+    while True:
+        trabajos = c.tomar(nombre, lote)
+        if not trabajos:
+            return vistos
+        for t in trabajos:
+            if c.confirmar(t):
+                vistos.append(t.payload["n"])
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    consumidores = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cola.db"
+        c = ColaTrabajos(path)
+
+        t0 = time.perf_counter()
+        for i in range(n):
+            c.encolar({"event": "ITEM_SOLD", "platform": "depop", "sku": f"SKU-{i}", "n": i})
+        uno = time.perf_counter() - t0
+        print(f"📥 encolar de a uno: {n / uno:8.0f} trabajos/s ({uno / n * 1e6:.0f} µs c/u)")
+
+        t0 = time.perf_counter()
+        c.encolar_muchos({"event": "ITEM_SOLD", "platform": "depop", "sku": f"SKU-{i}", "n": n + i} for i in range(n))
+        lote = time.perf_counter() - t0
+        print(f"📥 encolar en lote:  {n / lote:8.0f} trabajos/s")
+
+        for tam_lote in (1, 20):
+            if tam_lote == 20:
+                c.encolar_muchos({"n": i} for i in range(2 * n))
+            t0 = time.perf_counter()
+            with Pool(consumidores) as pool:
+                resultados = pool.map(_consumir, [(str(path), f"c{k}", tam_lote) for k in range(consumidores)])
+            secs = time.perf_counter() - t0
+            todos = [x for r in resultados for x in r]
+            assert len(todos) == len(set(todos)) == 2 * n, (len(todos), len(set(todos)))
+            reparto = "/".join(str(len(r)) for r in resultados)
+            print(f"📤 {consumidores} consumidores, tomar de a {tam_lote:2}: {len(todos) / secs:8.0f} trabajos/s "
+                  f"| {len(todos)} confirmados una sola vez | reparto {reparto}")
+
+        # lease vencido → se vuelve a entregar
+        c.encolar({"n": "colgado"})
+        colgado = c.tomar("colgado", visibilidad_s=0.3)[0]
+        assert not c.tomar("otro")
+        time.sleep(0.35)
+        retomado = c.tomar("otro")[0]
+        assert retomado.id == colgado.id and retomado.intentos == 2
+        assert not c.confirmar(colgado) and c.confirmar(retomado)
+        print("⏰ lease vencido: el trabajo se volvió a entregar a otro consumidor (el lease viejo ya no confirma)")
+
+        # dead-letter
+        cola_mod.BACKOFF_BASE_S = 0.01
+        c.max_intentos = 3
+        c.encolar({"n": "veneno"})
+        estados = []
+        while True:
+            t = c.tomar("x")
+            if not t:
+                if c.stats()["delayed"]:
+                    time.sleep(0.02)
+                    continue
+                break
+            estados.append(c.fallar(t[0], "siempre falla"))
+        print(f"☠️ trabajo que siempre falla: {' → '.join(estados)} | dead-letter={c.stats()['dead']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# bench_crosslist.py
+# Uso:
+# python benchmarks/bench_crosslist.py [N_URLS]
+#
+# Crosslist de N_URLS links contra el stub de la Trading API (stub_trading.py),
+# sobre una copia de los scripts en un directorio temporal (caché y drafts
+# propios, el repo no se toca):
+# 1) como antes: un proceso por URL que a su vez lanza generar_drafts.py
+# 2) crosslist.py --batch: un solo proceso, pipeline resolve → fetch → render → write
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from stub_trading import StubTrading
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CROSSLIST_VIEJO = '''import sys, subprocess
+from ebay_ids import extract_item_id
+item_id = extract_item_id(sys.argv[1])
+sys.exit(subprocess.run([sys.executable, "generar_drafts.py", item_id]).returncode)
+'''
+
+
+def _copiar(dest: Path) -> None:
+    for p in ROOT.glob("*.py"):
+        shutil.copy2(p, dest / p.name)
+    shutil.copytree(ROOT / "templates", dest / "templates")
+    (dest / "ebay.yaml").write_text('api.ebay.com:\n  token: "TOKEN"\n', encoding="utf-8")
+    (dest / "crosslist_viejo.py").write_text(CROSSLIST_VIEJO, encoding="utf-8")
+
+
+def _limpiar(dest: Path) -> None:
+    for d in ("cache", "drafts"):
+        shutil.rmtree(dest / d, ignore_errors=True)
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    stub = StubTrading(latencia_ms=80)
+    ids = stub.cargar_catalogo(n)
+    env = dict(os.environ, EBAY_TRADING_URL=stub.start(), PYTHONIOENCODING="utf-8",
+               EBAY_RPS="0", EBAY_CUOTA_DIA="0", EBAY_CUOTA_HORA="0") # sin límites de ebay_cliente.py
+    urls = [f"https://www.ebay.com/itm/Prenda-{i}/{item_id}?mkcid=1" for i, item_id in enumerate(ids)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        _copiar(tmp)
+        (tmp / "urls.txt").write_text("\n".join(urls) + "\n", encoding="utf-8")
+
+        _limpiar(tmp)
+        t0 = time.perf_counter()
+        for url in urls:
+            subprocess.run([sys.executable, "crosslist_viejo.py", url], cwd=tmp, env=env,
+                           stdout=subprocess.DEVNULL, check=True)
+        viejo = time.perf_counter() - t0
+        n_viejo = len(list((tmp / "drafts").glob("draft_depop_*.txt")))
+
+        _limpiar(tmp)
+        t0 = time.perf_counter()
+        out = subprocess.run([sys.executable, "crosslist.py", "--batch", "urls.txt"], cwd=tmp, env=env,
+                             capture_output=True, text=True, encoding="utf-8", check=True).stdout
+        nuevo = time.perf_counter() - t0
+        n_nuevo = len(list((tmp / "drafts").glob("draft_depop_*.txt")))
+
+    stub.stop()
+    print(f"{n} URLs, GetItem con {stub.latencia_ms:.0f} ms de latencia")
+    print(f"   un proceso por URL: {viejo:6.2f}s ({viejo / n * 1000:5.0f} ms/URL) | {n_viejo} drafts")
+    print(f"   pipeline:           {nuevo:6.2f}s ({nuevo / n * 1000:5.0f} ms/URL) | {n_nuevo} drafts")
+    print("\n" + out[out.index("⏱️"):].rstrip())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# bench_delist.py
+# Uso:
+# python benchmarks/bench_delist.py [N_VENTAS]
+#
+# Simula N ventas contra el orquestador de delist con plataformas falsas:
+# eBay rápido (~80 ms), Depop normal (~400 ms) y Poshmark lento y con fallos
+# intermitentes (~1.5 s, 20% de errores). Muestra que el EndItem de eBay no
+# espera a Poshmark y las latencias p50/p99 por plataforma.
+
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from delist import LIMITES, OrquestadorDelist
+
+
+def accion_falsa(media_s: float, fallos: float = 0.0):
+    async def _accion(sku: str) -> None:
+        await asyncio.sleep(random.uniform(0.5, 1.5) * media_s)
+        if random.random() < fallos:
+            raise RuntimeError("página no respondió")
+    return _accion
+
+
+async def correr(n: int) -> None:
+    orq = OrquestadorDelist(
+        acciones={
+            "ebay": accion_falsa(0.08),
+            "depop": accion_falsa(0.4),
+            "poshmark": accion_falsa(1.5, fallos=0.2),
+        },
+        limites={**LIMITES, "poshmark": {**LIMITES["poshmark"], "deadline_s": 6}},
+        log_path=None,
+    )
+    t0 = time.perf_counter()
+    ventas = [orq.delist_venta(f"SKU{i}", random.choice(["ebay", "depop", "poshmark"])) for i in range(n)]
+    resultados = [r for rs in await asyncio.gather(*ventas) for r in rs]
+    total = time.perf_counter() - t0
+
+    fallidos = [r for r in resultados if not r.ok]
+    print(f"🧹 {n} ventas → {len(resultados)} delists en {total:.1f}s | fallidos={len(fallidos)}")
+    for plataforma, s in orq.stats().items():
+        print(f"   {plataforma:9} ok={s['ok']:4} fail={s['fail']:3} retries={s['retries']:3} "
+              f"p50={s['p50_ms']:8.0f} ms p99={s['p99_ms']:8.0f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(correr(int(sys.argv[1]) if len(sys.argv) > 1 else 50))
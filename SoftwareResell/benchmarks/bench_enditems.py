@@ -0,0 +1,57 @@
+# bench_enditems.py
+# Uso:
+# python benchmarks/bench_enditems.py [N_ITEMS] [FALLOS]
+#
+# Levanta el stub de la Trading API (stub_trading.py) y termina N listings:
+# uno por uno con EndItem (como antes) y con resell.end_items_ebay (EndItems
+# de a 10, en paralelo, reintentando solo los fallidos). Verifica que cada
+# item quede terminado, que los "no es tuyo" (ItemID 17...) no se reintenten
+# y cuenta las llamadas que recibió el stub.
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import ebay_cliente
+import resell
+from stub_trading import StubTrading
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    fallos = float(sys.argv[2]) if len(sys.argv) > 2 else 0.15
+    ids = [str(286000000000 + i) for i in range(n)] + ["170000000001"]
+    # sin cubo de tokens ni cuota (inventory/ebay_cuota.db): se mide solo EndItem vs EndItems
+    ebay_cliente._CLIENTE = ebay_cliente.ClienteTrading(
+        cubo=ebay_cliente.CuboTokens(rps=0), cuota=ebay_cliente.CuotaEbay(por_dia=0, por_hora=0))
+
+    # 1) EndItem uno por uno (sin fallos, para medir solo la latencia)
+    stub = StubTrading(latencia_ms=80, fallos=0.0, seed=1)
+    resell.EBAY_TRADING_URL = stub.start()
+    t0 = time.perf_counter()
+    for item_id in ids[:-1]:
+        resell.end_item_ebay(item_id, "TOKEN")
+    serial = time.perf_counter() - t0
+    stub.stop()
+
+    # 2) EndItems en lote con fallos transitorios
+    stub = StubTrading(latencia_ms=80, fallos=fallos, seed=1)
+    resell.EBAY_TRADING_URL = stub.start()
+    t0 = time.perf_counter()
+    res = resell.end_items_ebay(ids, "TOKEN")
+    lote = time.perf_counter() - t0
+    stub.stop()
+
+    ok = [i for i, r in res.items() if r["ok"]]
+    assert set(ok) == set(ids[:-1]) == set(stub.terminados), "quedaron items sin terminar"
+    assert res["170000000001"]["intentos"] == 1 and res["170000000001"]["code"] == "17"
+    print(f"🐢 EndItem x{n}: {serial:.2f}s")
+    print(f"🚀 EndItems x{n} (fallos {fallos:.0%}): {lote:.2f}s | llamadas={stub.llamadas.get('EndItems', 0)} "
+          f"| reintentos máx={max(r['intentos'] for r in res.values())} | ok={len(ok)}/{n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# bench_fotos.py
+# Uso:
+# python benchmarks/bench_fotos.py [N_ITEMS] [FOTOS_POR_ITEM]
+#
+# Sirve fotos falsas desde un servidor local (60 ms de latencia, ~300 KB
+# cada una, algunas repetidas entre items con otra URL) y corre
+# fotos.CacheFotos.preparar dos veces en un directorio temporal:
+# la primera baja todo en paralelo, la segunda sale de la caché.
+# Compara contra bajarlas una por una sin caché.
+
+import hashlib
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import requests
+
+from fotos import CacheFotos, imprimir_reporte
+
+LATENCIA_S = 0.06
+TAMANO = 300 * 1024
+
+
+def servidor() -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(LATENCIA_S)
+            # /img/<n>/<variante>: el contenido depende solo de <n>, así
+            # dos URLs distintas pueden traer la misma foto
+            n = self.path.split("/")[2]
+            semilla = hashlib.sha256(n.encode()).digest()
+            data = semilla * (TAMANO // len(semilla))
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+def main() -> None:
+    n_items = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    por_item = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    srv = servidor()
+    base = f"http://127.0.0.1:{srv.server_address[1]}/img"
+    # la última foto de cada item es la "foto de medidas" compartida
+    fotos = {str(296000000000 + i): [f"{base}/{i * 10 + j}/a" for j in range(por_item - 1)] + [f"{base}/medidas/{i}"]
+             for i in range(n_items)}
+    urls = [u for us in fotos.values() for u in us]
+
+    t0 = time.perf_counter()
+    for u in urls:
+        requests.get(u, timeout=30).content
+    serial = time.perf_counter() - t0
+    print(f"🐢 una por una, sin caché: {len(urls)} fotos en {serial:.1f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for corrida in (1, 2):
+            rep = CacheFotos(tmp / "cache").preparar(fotos, salida=tmp / "salida")
+            print(f"\n— corrida {corrida}")
+            imprimir_reporte(rep)
+        assert rep["descargadas"] == 0 and rep["hits"] == rep["urls"]
+    srv.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+# bench_itemid.py
+# Uso:
+# python benchmarks/bench_itemid.py [REPETICIONES]
+#
+# Corre el corpus de benchmarks/fixtures/urls.txt (formas reales de links de
+# eBay) contra los extractores viejos de crosslist.py / resell.py y contra
+# ebay_ids.py:
+# 1) aciertos y µs por URL resolviendo solo con patrones (sin memo y con memo)
+# 2) links cortos y páginas sin id contra un servidor local (50 ms, HTML de
+#    ~400 KB): GET de la página uno por uno vs HEAD + lote concurrente
+
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import requests
+
+import ebay_ids
+
+CORPUS = Path(__file__).resolve().parent / "fixtures" / "urls.txt"
+LATENCIA_S = 0.05
+REDIRECTS = {
+    "/s/m-AbC123": "/itm/287045152832?mkcid=16",
+    "/s/XyZ789": "/itm/Levis-501-Jeans/286819039664",
+    "/s/2hops": "/s/hop2",
+    "/s/hop2": "/itm/126543210987",
+}
+
+
+# ----------------------------
+# Extractores anteriores (solo para comparar)
+# ----------------------------
+
+def crosslist_legacy(url: str, red: bool = True) -> str:
+    url = url.strip()
+    for pat in (r"/itm/(?:[^/]+/)?(\d{9,})", r"[?&]item=(\d{9,})", r"(\d{9,})"):
+        m = re.search(pat, url)
+        if m:
+            return m.group(1)
+    if not red:
+        raise ValueError("sin ItemID")
+    r = requests.get(url, timeout=30, headers={"User-Agent": "Mozilla/5.0"})
+    r.raise_for_status()
+    for pat in (r'"legacyItemId"\s*:\s*"(\d{9,})"', r'"itemId"\s*:\s*"(\d{9,})"', r'item=(\d{9,})',
+                r'/itm/(?:[^/]+/)?(\d{9,})', r'\b(\d{12})\b'):
+        m = re.search(pat, r.text)
+        if m:
+            return m.group(1)
+    raise ValueError("sin ItemID")
+
+
+def resell_legacy(value: str) -> str:
+    s = value.strip()
+    if re.fullmatch(r"\d{8,20}", s):
+        return s
+    m = re.search(r"/itm/(?:[^/]+/)?(\d{8,20})", s)
+    if m:
+        return m.group(1)
+    m2 = re.search(r"(?:item=|hash=item)(\d{8,20})", s)
+    if m2:
+        return m2.group(1)
+    raise ValueError("sin ItemID")
+
+
+# ----------------------------
+# Servidor local
+# ----------------------------
+
+class Servidor:
+    def __init__(self):
+        self.bytes = 0
+        self.pedidos = 0
+        self.lock = threading.Lock()
+        srv = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _responder(self, con_cuerpo: bool):
+                time.sleep(LATENCIA_S)
+                path = self.path.split("?")[0]
+                if path in REDIRECTS:
+                    self.send_response(301)
+                    self.send_header("Location", REDIRECTS[path])
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                m = re.search(r"(\d{12})", path)
+                item_id = m.group(1) if m else "286819039664"
+                relleno = "<div class='x'>" + "lorem ipsum " * 33000 + "</div>"
+                data = f'<html>{relleno}<script>{{"legacyItemId":"{item_id}"}}</script></html>'.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                if con_cuerpo:
+                    self.wfile.write(data)
+                    with srv.lock:
+                        srv.bytes += len(data)
+
+            def do_GET(self):
+                with srv.lock:
+                    srv.pedidos += 1
+                self._responder(True)
+
+            def do_HEAD(self):
+                with srv.lock:
+                    srv.pedidos += 1
+                self._responder(False)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def reset(self):
+        self.bytes = 0
+        self.pedidos = 0
+
+
+def cargar_corpus(stub: str):
+    casos = []
+    for line in CORPUS.read_text(encoding="utf-8").splitlines():
+        if not line.strip() or line.startswith("#"):
+            continue
+        url, esperado = line.rsplit("\t", 1)
+        casos.append((url.replace("{stub}", stub), esperado.strip()))
+    return casos
+
+
+def _medir(fn, urls, reps: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        for u in urls:
+            fn(u)
+    return (time.perf_counter() - t0) / (reps * len(urls)) * 1e6
+
+
+def main() -> None:
+    reps = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    srv = Servidor()
+    casos = cargar_corpus(srv.url)
+    locales = [(u, e) for u, e in casos if not u.startswith(srv.url)]
+    remotos = [(u, e) for u, e in casos if u.startswith(srv.url)]
+
+    # 1) Aciertos y costo solo con patrones
+    print(f"{'extractor':28} {'aciertos':>9} {'µs/URL':>8}")
+    for nombre, fn in (("crosslist (viejo)", lambda u: crosslist_legacy(u, red=False)),
+                       ("resell (viejo)", resell_legacy)):
+        ok = 0
+        for u, e in locales:
+            try:
+                ok += fn(u) == e
+            except ValueError:
+                pass
+        print(f"{nombre:28} {ok:>4}/{len(locales):<4} {_medir(lambda u: _seguro(fn, u), [u for u, _ in locales], reps):8.2f}")
+
+    ok = sum(ebay_ids.extract_item_id(u, red=False) == e for u, e in locales)
+    urls = [u for u, _ in locales]
+    sin_memo = _medir(lambda u: ebay_ids.item_id_sin_red.__wrapped__(u), urls, reps)
+    con_memo = _medir(ebay_ids.item_id_sin_red, urls, reps)
+    print(f"{'ebay_ids (sin memo)':28} {ok:>4}/{len(locales):<4} {sin_memo:8.2f}")
+    print(f"{'ebay_ids (memo)':28} {ok:>4}/{len(locales):<4} {con_memo:8.2f}")
+
+    # 2) Links cortos / páginas sin id
+    srv.reset()
+    t0 = time.perf_counter()
+    viejos = [crosslist_legacy(u) for u, _ in remotos]
+    t_viejo = time.perf_counter() - t0
+    b_viejo, p_viejo = srv.bytes, srv.pedidos
+
+    srv.reset()
+    t0 = time.perf_counter()
+    ids, errores = ebay_ids.resolver_lote([u for u, _ in remotos])
+    t_nuevo = time.perf_counter() - t0
+    assert not errores, errores
+    assert all(ids[u] == e for u, e in remotos), ids
+    print(f"\n🔗 {len(remotos)} links cortos/sin id:")
+    print(f"   GET uno por uno: {t_viejo * 1000:6.0f} ms | {p_viejo} pedidos | {b_viejo / 1024:7.0f} KB | "
+          f"aciertos {sum(v == e for v, (_, e) in zip(viejos, remotos))}/{len(remotos)}")
+    print(f"   HEAD + lote:     {t_nuevo * 1000:6.0f} ms | {srv.pedidos} pedidos | {srv.bytes / 1024:7.0f} KB | "
+          f"aciertos {len(ids)}/{len(remotos)}")
+
+    srv.reset()
+    t0 = time.perf_counter()
+    ebay_ids.resolver_lote([u for u, _ in remotos])
+    print(f"   repetido (memo): {(time.perf_counter() - t0) * 1000:6.2f} ms | {srv.pedidos} pedidos")
+    srv.httpd.shutdown()
+
+
+def _seguro(fn, u):
+    try:
+        return fn(u)
+    except ValueError:
+        return None
+
+
+if __name__ == "__main__":
+    main()
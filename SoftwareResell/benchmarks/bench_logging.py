@@ -0,0 +1,69 @@
+# bench_logging.py
+# Uso:
+# python benchmarks/bench_logging.py [N_LINEAS]
+#
+# Compara el log_accion anterior (mkdir + open + write + close por línea)
+# contra el registro con buffer de logger.py, en un directorio temporal.
+# Mide lo que tarda el llamador (lo que bloquea a procesar_evento) y el
+# tiempo total hasta que todo está en disco. Con rotación chica para que
+# también se ejerciten los renombres.
+
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from logger import Registro
+
+
+def log_legacy(path: Path, evento: str, sku: str, platform: str, modo: str) -> None:
+    """Copia del log_accion anterior (solo para comparar)."""
+    path.parent.mkdir(exist_ok=True)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(f"{timestamp} | {evento} | {sku} | {platform} | {modo}\n")
+
+
+def contar_lineas(path: Path) -> int:
+    total = 0
+    for p in path.parent.glob(path.name + "*"):
+        with open(p, "rb") as f:
+            total += sum(1 for _ in f)
+    return total
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        viejo = tmp / "viejo" / "acciones.log"
+        t0 = time.perf_counter()
+        for i in range(n):
+            log_legacy(viejo, "ITEM_SOLD", f"SKU{i}", "ebay", "REAL")
+        t_viejo = time.perf_counter() - t0
+
+        for formato in ("texto", "json"):
+            nuevo = tmp / formato / "acciones.log"
+            reg = Registro(nuevo, formato=formato, max_bytes=2 * 1024 * 1024, backups=50)
+            t0 = time.perf_counter()
+            for i in range(n):
+                reg.escribir(f"ITEM_SOLD | SKU{i} | ebay | REAL",
+                             {"evento": "ITEM_SOLD", "sku": f"SKU{i}", "platform": "ebay", "modo": "REAL"})
+            t_llamador = time.perf_counter() - t0
+            reg.cerrar()
+            t_total = time.perf_counter() - t0
+            escritas = contar_lineas(reg.path)
+
+            print(f"📝 {formato}: {n} líneas | escritas={escritas} descartadas={reg.descartadas}")
+            print(f"   llamador: {t_llamador * 1e6 / n:.2f} µs/línea ({n / t_llamador:,.0f} líneas/s)")
+            print(f"   hasta disco: {n / t_total:,.0f} líneas/s")
+
+        print(f"🐢 open/close por línea: {t_viejo * 1e6 / n:.2f} µs/línea ({n / t_viejo:,.0f} líneas/s)")
+
+
+if __name__ == "__main__":
+    main()
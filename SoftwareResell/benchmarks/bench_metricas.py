@@ -0,0 +1,94 @@
+# bench_metricas.py
+# Uso:
+# python benchmarks/bench_metricas.py [N]
+#
+# Costo por muestra de metricas.py:
+# 1) función decorada con @cronometrar vs la misma sin decorar, con las
+#    métricas apagadas (METRICAS=0) y prendidas
+# 2) lo mismo para una corutina y para "with medir(...)"
+# 3) observar() directo (el que usan las llamadas a la Trading API)
+# Falla (exit 1) si apagadas cuestan 1 µs o más por muestra.
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import metricas
+from metricas import cronometrar, medir, observar
+
+LIMITE_APAGADO_US = 1.0
+
+
+def _por_llamada(fn, n: int) -> float:
+    mejor = float("inf")
+    for _ in range(5):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor / n * 1e6
+
+
+def _por_llamada_async(coro_fn, n: int) -> float:
+    async def bucle():
+        for _ in range(n):
+            await coro_fn()
+
+    mejor = float("inf")
+    for _ in range(5):
+        t0 = time.perf_counter()
+        asyncio.run(bucle())
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor / n * 1e6
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    def base():
+        return 1
+
+    async def base_async():
+        return 1
+
+    def con_medir():
+        with medir("bench_bloque"):
+            return 1
+
+    decorada = cronometrar("bench_sync")(base)
+    decorada_async = cronometrar("bench_async")(base_async)
+
+    filas = []
+    for activo in (False, True):
+        metricas.activar(activo)
+        cero = _por_llamada(base, n)
+        cero_async = _por_llamada_async(base_async, n // 4)
+        filas.append((activo, "@cronometrar", _por_llamada(decorada, n) - cero))
+        filas.append((activo, "@cronometrar async", _por_llamada_async(decorada_async, n // 4) - cero_async))
+        filas.append((activo, "with medir()", _por_llamada(con_medir, n) - cero))
+        filas.append((activo, "observar()", _por_llamada(
+            lambda: observar("bench_api", 0.01, {"call": "GetItem"}, ack="Success", error=""), n) - cero))
+    metricas.activar(True)
+
+    print(f"⏱️ Overhead por muestra ({n} llamadas, mejor de 5):")
+    peor_apagado = 0.0
+    for activo, nombre, us in filas:
+        print(f"   {'prendidas' if activo else 'apagadas ':9} {nombre:20} {max(us, 0.0):6.3f} µs")
+        if not activo:
+            peor_apagado = max(peor_apagado, us)
+
+    h = metricas.obtener_metricas().histograma("bench_sync_segundos")
+    assert h.n >= n, h.n
+    if peor_apagado >= LIMITE_APAGADO_US:
+        print(f"❌ Apagadas cuestan {peor_apagado:.3f} µs por muestra (límite {LIMITE_APAGADO_US} µs)")
+        sys.exit(1)
+    print(f"✅ Apagadas: {peor_apagado:.3f} µs por muestra (< {LIMITE_APAGADO_US} µs)")
+    # que el benchmark no deje un volcado en logs/metricas/
+    metricas._METRICAS = None
+
+
+if __name__ == "__main__":
+    main()
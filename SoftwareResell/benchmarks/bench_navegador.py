@@ -0,0 +1,95 @@
+# bench_navegador.py
+# Uso:
+# python benchmarks/bench_navegador.py [N_ITEMS]
+#
+# Levanta un sitio HTML de prueba en localhost (inventario con barra de
+# búsqueda, como Depop) y mide la latencia por item:
+#  - antes:   lanzar Chromium con perfil nuevo por cada item (esquema viejo)
+#  - después: PoolNavegador con contexto y páginas reutilizadas
+#
+# Requiere: pip install playwright && playwright install chromium
+
+import asyncio
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pool_navegador
+from pool_navegador import PoolNavegador
+
+_INVENTARIO = b"""<!doctype html><html><body>
+<h1>Inventario</h1>
+<form action="/products/manage/" method="get">
+  <input id="product-search" name="q" role="searchbox">
+</form>
+</body></html>"""
+
+
+class _Stub(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(_INVENTARIO)))
+        self.end_headers()
+        self.wfile.write(_INVENTARIO)
+
+    def log_message(self, format, *args):
+        return
+
+
+def _levantar_stub() -> str:
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{httpd.server_address[1]}"
+
+
+async def antes(skus, base: str, perfil: str):
+    """Esquema viejo: un Playwright + contexto por item."""
+    lat = []
+    for sku in skus:
+        t0 = time.perf_counter()
+        pool = PoolNavegador("depop", paginas=1, headless=True, channel=None, perfil_dir=perfil)
+        await pool.ejecutar(sku)
+        await pool.close()
+        lat.append((time.perf_counter() - t0) * 1000)
+    return lat
+
+
+async def despues(skus, base: str, perfil: str):
+    pool = PoolNavegador("depop", paginas=2, headless=True, channel=None, perfil_dir=perfil)
+    t0 = time.perf_counter()
+    await pool.start()
+    arranque = (time.perf_counter() - t0) * 1000
+    resultados = await pool.procesar(skus)
+    await pool.close()
+    return arranque, [r["ms"] for r in resultados if r["ok"]]
+
+
+def _resumen(nombre: str, lat) -> None:
+    lat = sorted(lat)
+    print(f"{nombre}: {len(lat)} items | media {statistics.mean(lat):.0f}ms | "
+          f"p50 {lat[len(lat) // 2]:.0f}ms | max {lat[-1]:.0f}ms")
+
+
+async def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    base = _levantar_stub()
+    pool_navegador.PLATAFORMAS["depop"]["base_url"] = base
+    skus = [f"SKU-{i:04d}" for i in range(n)]
+
+    with tempfile.TemporaryDirectory() as perfil:
+        _resumen("Antes  (navegador por item)", await antes(skus, base, perfil))
+    with tempfile.TemporaryDirectory() as perfil:
+        arranque, lat = await despues(skus, base, perfil)
+        print(f"Pool: arranque único {arranque:.0f}ms")
+        _resumen("Después (pool tibio)      ", lat)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
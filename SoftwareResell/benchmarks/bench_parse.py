@@ -0,0 +1,74 @@
+# bench_parse.py
+# Uso:
+# python benchmarks/bench_parse.py [REPETICIONES]
+#
+# Microbenchmark del parseo de GetItem sobre los XML de benchmarks/fixtures
+# (armados a partir de los items de drafts/). Compara el esquema viejo de
+# regex DOTALL repetidos contra el parser de una pasada (ebay_xml.py), con
+# la descripción tal cual y inflada a ~200KB para ver el costo de backtracking.
+
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ebay_xml import parse_trading_response
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def regex_legacy(xml: str) -> dict:
+    """Copia del parseo anterior de resell.get_item_from_ebay (solo para comparar)."""
+    def grab(tag: str) -> str:
+        m = re.search(fr"<{tag}>(.*?)</{tag}>", xml, flags=re.S)
+        return m.group(1).strip() if m else ""
+
+    out = {"ack": grab("Ack"), "title": grab("Title"), "desc": grab("Description"),
+           "category": grab("CategoryName"), "condition": grab("ConditionDisplayName")}
+    m = re.search(r"<CurrentPrice[^>]*>(.*?)</CurrentPrice>", xml, flags=re.S)
+    out["price"] = m.group(1) if m else ""
+    specs = {}
+    for block in re.findall(r"<NameValueList>(.*?)</NameValueList>", xml, flags=re.S):
+        n = re.search(r"<Name>(.*?)</Name>", block, flags=re.S)
+        v = re.search(r"<Value>(.*?)</Value>", block, flags=re.S)
+        if n and v:
+            specs[n.group(1)] = v.group(1)
+    out["specifics"] = specs
+    out["pictures"] = re.findall(r"<PictureURL>(.*?)</PictureURL>", xml, flags=re.S)
+    return out
+
+
+def _medir(fn, xml: str, reps: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        fn(xml)
+    return (time.perf_counter() - t0) / reps * 1e6
+
+
+def cargar_fixtures():
+    return {p.stem: p.read_text(encoding="utf-8") for p in sorted(FIXTURES.glob("getitem_*.xml"))}
+
+
+def inflar_descripcion(xml: str, kb: int = 200) -> str:
+    relleno = ("Lorem ipsum dolor sit amet &lt;br&gt; " * (kb * 1024 // 38))
+    return xml.replace("</Description>", relleno + "</Description>", 1)
+
+
+def main() -> None:
+    reps = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    casos = cargar_fixtures()
+    for nombre, xml in list(casos.items()):
+        casos[nombre + " (desc 200KB)"] = inflar_descripcion(xml)
+
+    print(f"{'fixture':45} {'regex µs':>10} {'1-pasada µs':>12} {'x':>6}")
+    for nombre, xml in casos.items():
+        n = reps if len(xml) < 50_000 else max(10, reps // 100)
+        viejo = _medir(regex_legacy, xml, n)
+        nuevo = _medir(parse_trading_response, xml, n)
+        print(f"{nombre:45} {viejo:10.1f} {nuevo:12.1f} {viejo / nuevo:6.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# bench_render.py
+# Uso:
+# python benchmarks/bench_render.py [N_ITEMS] [PROCESOS]
+#
+# Renderiza drafts Depop + Poshmark para N items (10k por defecto) armados a
+# partir de los fixtures GetItem, en serie y con el pool de procesos de
+# plantillas.render_batch, y reporta items/s. Antes verifica la sintaxis de
+# las plantillas ($var, ${var}, $$, llaves literales).
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import generar_drafts
+import plantillas
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def items_de_prueba(n: int):
+    base = [generar_drafts.item_from_getitem_xml(p.stem.split("_")[-1], p.read_text(encoding="utf-8"))
+            for p in sorted(FIXTURES.glob("getitem_*.xml"))]
+    items = []
+    for i in range(n):
+        it = dict(base[i % len(base)])
+        it["item_id"] = str(100000000000 + i)
+        it["title"] = f"{it['title']} #{i}"
+        items.append(it)
+    return items
+
+
+def verificar_sintaxis() -> None:
+    fmt, nombres = plantillas._compilar_linea("Hola ${title}x y $brand $$5 {literal} $")
+    assert fmt == "Hola {title}x y {brand} $5 {{literal}} $", fmt
+    assert nombres == ("title", "brand"), nombres
+    assert fmt.format(title="Jeans", brand="Levi's") == "Hola Jeansx y Levi's $5 {literal} $"
+
+
+def main() -> None:
+    verificar_sintaxis()
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    procesos = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    items = items_de_prueba(n)
+
+    t0 = time.perf_counter()
+    plantillas.render_batch(items, procesos=1)
+    serie = time.perf_counter() - t0
+    print(f"Serie        : {n} items en {serie:.2f}s ({n / serie:,.0f} items/s)")
+
+    if procesos > 1:
+        t0 = time.perf_counter()
+        plantillas.render_batch(items, procesos=procesos)
+        pool = time.perf_counter() - t0
+        print(f"Pool x{procesos:<6}: {n} items en {pool:.2f}s ({n / pool:,.0f} items/s)")
+
+
+if __name__ == "__main__":
+    main()
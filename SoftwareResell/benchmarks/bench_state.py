@@ -0,0 +1,71 @@
+# bench_state.py
+# Uso:
+# python benchmarks/bench_state.py [N_EVENTOS]
+#
+# Reproduce N ventas (100k por defecto) contra el store SQLite y, para
+# comparar, una muestra contra el esquema antiguo (cargar + reescribir
+# state.json completo por cada venta).
+
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from inventory.store import PLATFORMS, StateStore
+
+
+def _eventos(n: int, skus: int):
+    rnd = random.Random(42)
+    for _ in range(n):
+        yield f"SKU-{rnd.randrange(skus):06d}", rnd.choice(PLATFORMS)
+
+
+def bench_json_legacy(n: int, skus: int, tmp: Path) -> float:
+    path = tmp / "state.json"
+    t0 = time.perf_counter()
+    for sku, plat in _eventos(n, skus):
+        data = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        data[sku] = {"status": "SOLD", "sold_on": plat}
+        path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    return time.perf_counter() - t0
+
+
+def bench_store(n: int, skus: int, tmp: Path) -> dict:
+    store = StateStore(tmp / "state.db", legacy_json=None)
+
+    t0 = time.perf_counter()
+    for sku, plat in _eventos(n, skus):
+        store.mark_sold(sku, plat)
+    one_by_one = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for i in range(10_000):
+        store.get(f"SKU-{i % skus:06d}")
+    lookup = (time.perf_counter() - t0) / 10_000
+
+    return {"eventos": n, "skus": store.count(), "segundos": one_by_one,
+            "eventos_s": n / one_by_one, "lookup_us": lookup * 1e6}
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    skus = max(1, n // 2)
+
+    with tempfile.TemporaryDirectory() as d:
+        tmp = Path(d)
+        r = bench_store(n, skus, tmp)
+        print(f"SQLite WAL : {r['eventos']} ventas en {r['segundos']:.2f}s "
+              f"({r['eventos_s']:.0f} ventas/s) | {r['skus']} SKUs | lookup {r['lookup_us']:.1f}µs")
+
+        muestra = min(n, 2_000)
+        legacy = bench_json_legacy(muestra, skus, tmp)
+        print(f"JSON legado: {muestra} ventas en {legacy:.2f}s ({muestra / legacy:.0f} ventas/s, "
+              f"y empeora con el tamaño del inventario)")
+
+
+if __name__ == "__main__":
+    main()
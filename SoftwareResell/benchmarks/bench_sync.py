@@ -0,0 +1,73 @@
+# bench_sync.py
+# Uso:
+# python benchmarks/bench_sync.py [N_ITEMS] [N_CAMBIOS]
+#
+# Sync del catálogo contra el stub de la Trading API (stub_trading.py), con
+# caché, cursor y map.json en un directorio temporal:
+# 1) sync completo (GetSellerList de a 200) vs lo que costaba un GetItem por item
+# 2) se editan N_CAMBIOS items y se terminan algunos → sync incremental
+#    (GetSellerEvents + GetItem solo de lo que cambió)
+
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import ebay_cache
+import ebay_cliente
+import resell
+from ebay_sync import SyncEbay
+from stub_trading import StubTrading
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    cambios = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+
+    stub = StubTrading(latencia_ms=20)
+    ids = stub.cargar_catalogo(n)
+    resell.EBAY_TRADING_URL = stub.start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        ebay_cache._CACHE = ebay_cache.GetItemCache(tmp / "cache")
+        ebay_cliente._CLIENTE = ebay_cliente.ClienteTrading(
+            cubo=ebay_cliente.CuboTokens(rps=0), cuota=ebay_cliente.CuotaEbay(tmp / "cuota.db", por_dia=0, por_hora=0))
+
+        def syncer() -> SyncEbay:
+            return SyncEbay("TOKEN",
+                            call=lambda name, body: resell.ebay_trading_call(name, "TOKEN", body),
+                            refrescar_item=lambda i: resell.get_item_from_ebay(i, "TOKEN", refresh=True),
+                            workers=8, cursor_path=tmp / "cursor.json", map_path=tmp / "map.json")
+
+        full = syncer().sync()
+        print(f"📚 full: {full['items']} items | {full['calls']} llamadas (antes: {n} GetItem) | {full['secs']}s")
+        assert full["mode"] == "full" and full["items"] == n
+        assert ebay_cache.obtener_cache().stats()["entries"] == n
+
+        stub.modificar(ids[:cambios])
+        stub.modificar(ids[cambios:cambios + 5], status="Completed")
+        time.sleep(0.01) # las fechas de la Trading API van al milisegundo
+        delta = syncer().sync()
+        print(f"🔁 delta: {delta['items']} cambiados | {delta['ended']} terminados | "
+              f"{delta['calls']} llamadas | {delta['secs']}s")
+        assert delta["mode"] == "delta" and delta["items"] == cambios + 5 and delta["ended"] == 5
+
+        mp = json.loads((tmp / "map.json").read_text(encoding="utf-8"))
+        assert mp[ids[0]]["title"].endswith("(editado)")
+        assert mp[ids[cambios]]["ebay_status"] == "Completed"
+        item = resell.get_item_from_ebay(ids[0], "TOKEN", offline=True)
+        assert item["title"].endswith("(editado)"), item["title"]
+
+        vacio = syncer().sync()
+        # la ventana arranca SOLAPE_S antes del cursor: lo recién cambiado se repite una vez
+        print(f"💤 sin cambios nuevos: {vacio['items']} items (solape) | {vacio['calls']} llamadas")
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# check_importtime.py
+# Uso:
+# python benchmarks/check_importtime.py [REPETICIONES]
+#
+# Presupuesto de arranque de los scripts de entrada. Importa cada uno con
+# python -X importtime (bytecode ya compilado, mejor de N corridas) y falla
+# (exit 1) si:
+# - el import tarda más que su presupuesto, o
+# - al importarlo se carga algún módulo pesado que solo hace falta en un
+#   comando concreto (requests, yaml, sqlite3, asyncio, Playwright, ...)
+# Correrlo después de tocar los imports de resell.py, vender.py o crosslist.py.
+
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Set, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# ms acumulados del import (medido: resell ~7, vender ~0.3, crosslist ~5)
+PRESUPUESTO_MS: Dict[str, float] = {
+    "resell": 40,
+    "vender": 15,
+    "crosslist": 30,
+}
+PROHIBIDOS = ("requests", "urllib3", "yaml", "sqlite3", "asyncio", "playwright", "multiprocessing",
+              "concurrent.futures", "Cerebro_v2")
+
+
+_BASE: Set[str] = set()
+
+
+def _importtime(codigo: str, env: Dict[str, str]) -> Dict[str, float]:
+    """{módulo: ms acumulados} de lo que importa `codigo`."""
+    r = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo],
+                       cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    out: Dict[str, float] = {}
+    for line in r.stderr.splitlines():
+        if line.startswith("import time:") and "cumulative" not in line:
+            _, acumulado, nombre = line[len("import time:"):].split("|")
+            out[nombre.strip()] = int(acumulado) / 1000
+    return out
+
+
+def medir(modulo: str, env: Dict[str, str]) -> Tuple[float, Set[str]]:
+    """(ms acumulados del import, módulos que cargó además del arranque del intérprete)."""
+    if not _BASE:
+        _BASE.update(_importtime("pass", env))
+    tiempos = _importtime(f"import {modulo}", env)
+    return tiempos.get(modulo, 0.0), set(tiempos) - _BASE
+
+
+def main() -> None:
+    reps = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    fallas = []
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, PYTHONPYCACHEPREFIX=tmp)
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        print(f"{'módulo':10} {'ms':>7} {'presupuesto':>11}  pesados")
+        for modulo, presupuesto in PRESUPUESTO_MS.items():
+            medir(modulo, env) # compila el bytecode
+            muestras = [medir(modulo, env) for _ in range(reps)]
+            ms = min(m for m, _ in muestras)
+            cargados = set().union(*(c for _, c in muestras))
+            pesados = [p for p in PROHIBIDOS if any(m == p or m.startswith(p + ".") for m in cargados)]
+            ok = ms <= presupuesto and not pesados
+            print(f"{modulo:10} {ms:7.1f} {presupuesto:11.0f}  {', '.join(pesados) or '-'} {'✅' if ok else '❌'}")
+            if not ok:
+                fallas.append(modulo)
+    if fallas:
+        print(f"\n❌ Arranque fuera de presupuesto: {', '.join(fallas)} "
+              f"(mover el import pesado a la función que lo usa)")
+        sys.exit(1)
+    print("\n✅ Arranque dentro del presupuesto")
+
+
+if __name__ == "__main__":
+    main()
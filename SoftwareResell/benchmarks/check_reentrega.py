@@ -0,0 +1,126 @@
+# check_reentrega.py
+# Uso:
+# python benchmarks/check_reentrega.py
+#
+# La cola de ventas es at-least-once de punta a punta (cola.py + dedup de
+# Cerebro_v2), en un directorio temporal y con el delist reemplazado por
+# acciones que anotan en un archivo:
+# 1) un consumidor (procesar_cola.py en otro proceso) toma la venta, el
+#    dedup la reclama y el proceso se cuelga antes de marcar el SKU; se lo
+#    mata con kill (como un kill -9 o un corte de luz)
+# 2) vence el lease y otro consumidor recibe el mismo trabajo: el SKU tiene
+#    que quedar SOLD y el delist tiene que correr en las otras plataformas
+# 3) la misma venta encolada otra vez (reintento del webhook) se descarta
+# Falla (exit 1) si alguna verificación no se cumple.
+
+import asyncio
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+VISIBILIDAD_S = 1.0
+EVENTO = {"event": "ITEM_SOLD", "platform": "ebay", "sku": "SKU-REENTREGA-1"}
+
+
+def consumidor(tmp: Path, colgar: bool) -> None:
+    # procesar_cola.main con todo apuntando a `tmp`
+    import Cerebro_v2
+    import cola
+    import dedup
+    import delist
+    import logger
+    import metricas
+    import procesar_cola
+    from inventory import store
+    from inventory.store import StateStore
+
+    metricas.activar(False)
+    cola._COLA = cola.ColaTrabajos(tmp / "cola.db", visibilidad_s=VISIBILIDAD_S)
+    store._DEFAULT = StateStore(tmp / "state.db", legacy_json=None)
+    dedup._INDICE = dedup.IndiceDedup(tmp / "state.db")
+    logger.LOG_FILE = tmp / "logs" / "acciones.log"
+    procesar_cola.COLA = tmp / "cola_ventas.csv"
+    procesar_cola.PROCESADAS = tmp / "logs" / "cola_procesada.csv"
+    procesar_cola.CHECKPOINT = tmp / "logs" / "cola_offset.json"
+
+    def accion(plataforma: str):
+        async def _borrar(sku: str) -> None:
+            with open(tmp / "delist.txt", "a", encoding="utf-8") as f:
+                f.write(f"{plataforma} {sku}\n")
+        return _borrar
+
+    delist._ORQUESTADOR = delist.OrquestadorDelist(acciones={p: accion(p) for p in delist.PLATAFORMAS},
+                                                   log_path=tmp / "logs" / "delist.log")
+    marcar_vendido = Cerebro_v2.marcar_vendido
+
+    def marcar_o_colgarse(sku: str, plataforma: str) -> None:
+        if colgar:
+            (tmp / "colgado").touch()
+            time.sleep(3600)
+        marcar_vendido(sku, plataforma)
+
+    Cerebro_v2.marcar_vendido = marcar_o_colgarse
+    Cerebro_v2.MODO_PRUEBA = False
+    Cerebro_v2.confirmar_borrado = lambda sku, platform: True
+    asyncio.run(procesar_cola.main(workers=1))
+
+
+def _correr(tmp: Path, colgar: bool) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, __file__, "--consumidor", str(tmp), str(int(colgar))],
+                            stdout=subprocess.DEVNULL)
+
+
+def main() -> None:
+    if sys.argv[1:2] == ["--consumidor"]:
+        consumidor(Path(sys.argv[2]), sys.argv[3] == "1")
+        return
+
+    from cola import ColaTrabajos
+    from inventory.store import StateStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        c = ColaTrabajos(tmp / "cola.db", visibilidad_s=VISIBILIDAD_S)
+        c.encolar(EVENTO)
+
+        p = _correr(tmp, colgar=True)
+        limite = time.monotonic() + 60
+        while not (tmp / "colgado").exists() and p.poll() is None and time.monotonic() < limite:
+            time.sleep(0.05)
+        colgado = (tmp / "colgado").exists()
+        p.kill()
+        p.wait()
+        time.sleep(VISIBILIDAD_S + 0.2) # que venza el lease
+
+        _correr(tmp, colgar=False).wait(timeout=120)
+        st = StateStore(tmp / "state.db", legacy_json=None)
+        estado = (st.get(EVENTO["sku"]) or {}).get("status", "")
+        delist_txt = tmp / "delist.txt"
+        delistados = sorted(delist_txt.read_text(encoding="utf-8").split()[::2]) if delist_txt.exists() else []
+        print(f"💥 consumidor muerto a mitad de la venta: {'sí' if colgado else 'NO'}")
+        print(f"🔁 re-entrega: estado={estado or '-'} | delist en {', '.join(delistados) or 'nada'} "
+              f"| cola {c.stats()['pending']} pendientes")
+
+        c.encolar(EVENTO)
+        _correr(tmp, colgar=False).wait(timeout=120)
+        repetidos = len(delist_txt.read_text(encoding="utf-8").split()) // 2 if delist_txt.exists() else 0
+        print(f"♻️ misma venta encolada otra vez: delists totales={repetidos} | cola {c.stats()['pending']} pendientes")
+        st.close()
+
+        try:
+            assert colgado, "el consumidor no llegó a reclamar la venta"
+            assert estado == "SOLD", "la venta re-entregada no quedó SOLD (el dedup la descartó)"
+            assert delistados == ["depop", "poshmark"], "la re-entrega no delistó"
+            assert repetidos == 2, "el duplicado volvió a delistar"
+        except AssertionError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+    print("✅ Re-entrega at-least-once OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# load_http.py
+# Uso:
+# python benchmarks/load_http.py                       (app.py en proceso: servidor nuevo vs HTTPServer viejo)
+# python benchmarks/load_http.py --url http://localhost:10000
+# python benchmarks/load_http.py --conns 32 --seconds 5 --lento
+#
+# Clientes keep-alive (uno por hilo) mandando GET /health y POST /sold
+# durante --seconds; reporta requests/s y latencia p50/p99/p99.9/max.
+# Sin --url mide app.py en proceso dos veces: con servidor_http (pool de
+# hilos, HTTP/1.1) y con el HTTPServer de antes (una conexión a la vez,
+# HTTP/1.0: cada request abre conexión nueva). Con --lento además deja
+# abierta una conexión que manda media línea y no termina nunca, como un
+# cliente lento o un proxy colgado. Al final verifica el apagado ordenado:
+# un request en curso termina bien aunque llegue el apagado.
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import HTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ.pop("WEBHOOK_SECRET", None)
+os.environ.pop("API_KEY", None)
+os.environ.pop("APP_DEBUG", None)
+
+import app
+import servidor_http
+from servidor_http import ServidorHTTP
+
+
+def _percentil(muestras, p: float) -> float:
+    if not muestras:
+        return 0.0
+    orden = sorted(muestras)
+    return orden[min(len(orden) - 1, int(round(p / 100 * (len(orden) - 1))))]
+
+
+def _cliente(host: str, port: int, hasta: float, lat: list, errores: list, i: int) -> None:
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    cuerpo = json.dumps({"event": "ITEM_SOLD", "platform": "ebay", "sku": f"LOAD-{i:04d}"}).encode("utf-8")
+    n = 0
+    while time.perf_counter() < hasta:
+        t0 = time.perf_counter()
+        try:
+            if n % 2:
+                conn.request("POST", "/sold", body=cuerpo, headers={"Content-Type": "application/json"})
+            else:
+                conn.request("GET", "/health")
+            r = conn.getresponse()
+            r.read()
+            if r.status >= 300:
+                errores.append(r.status)
+        except (OSError, http.client.HTTPException) as e:
+            errores.append(type(e).__name__)
+            conn.close()
+        lat.append((time.perf_counter() - t0) * 1000)
+        n += 1
+    conn.close()
+
+
+def _lento(host: str, port: int) -> socket.socket:
+    s = socket.create_connection((host, port))
+    s.sendall(b"GET /health HT") # nunca termina la línea
+    return s
+
+
+def medir(nombre: str, host: str, port: int, conns: int, segundos: float, lento: bool) -> str:
+    colgado = _lento(host, port) if lento else None
+    lat: list = []
+    errores: list = []
+    hasta = time.perf_counter() + segundos
+    hilos = [threading.Thread(target=_cliente, args=(host, port, hasta, lat, errores, i), daemon=True)
+             for i in range(conns)]
+    t0 = time.perf_counter()
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join(segundos + 60)
+    total = time.perf_counter() - t0
+    if colgado is not None:
+        colgado.close()
+    return (f"🚀 {nombre}: {len(lat)} requests en {total:.1f}s → {len(lat) / total:,.0f} req/s "
+            f"({conns} conexiones{', con cliente lento' if lento else ''})\n"
+            f"   p50={_percentil(lat, 50):.2f}ms p99={_percentil(lat, 99):.2f}ms "
+            f"p99.9={_percentil(lat, 99.9):.2f}ms max={max(lat or [0]):.2f}ms  errores: {len(errores)}")
+
+
+class _Legado(servidor_http._Manejador):
+    # como el Handler de antes: HTTP/1.0, una conexión por request
+    protocol_version = "HTTP/1.0"
+    timeout = None
+
+
+class _ServidorLegado(HTTPServer):
+    # el HTTPServer de antes (un request a la vez) con las rutas de hoy
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Legado)
+        self.app, self.verboso, self.cerrando = app.app, False, False
+
+    def _registrar(self, h):
+        pass
+
+    _olvidar = _registrar
+
+
+def _apagado_ordenado(informes: list) -> None:
+    # un request que tarda 300 ms sigue en curso cuando llega el apagado
+    app.app.ruta("GET", "/_lento")(lambda pedido: (time.sleep(0.3), (200, "ok"))[1])
+    srv = ServidorHTTP(app.app, "127.0.0.1", 0, hilos=4)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    ocioso = http.client.HTTPConnection("127.0.0.1", srv.port, timeout=5)
+    ocioso.request("GET", "/health")
+    ocioso.getresponse().read() # queda keep-alive sin hacer nada
+    res = {}
+
+    def pedir():
+        c = http.client.HTTPConnection("127.0.0.1", srv.port, timeout=5)
+        c.request("GET", "/_lento")
+        r = c.getresponse()
+        res["status"], res["body"], res["conn"] = r.status, r.read(), r.getheader("Connection")
+
+    t = threading.Thread(target=pedir)
+    t.start()
+    time.sleep(0.1)
+    t0 = time.perf_counter()
+    quedan = srv.apagar(espera_s=5)
+    t.join()
+    assert res.get("status") == 200 and res["body"] == b"ok", res
+    assert quedan == 0
+    informes.append(f"🛑 apagado ordenado: request en curso → {res['status']} (Connection: {res['conn']}), "
+          f"conexión ociosa cerrada, {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Prueba de carga del servicio web (app.py)")
+    ap.add_argument("--url", default="")
+    ap.add_argument("--conns", type=int, default=16)
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--lento", action="store_true", help="agrega un cliente que nunca termina su request")
+    args = ap.parse_args()
+
+    if args.url:
+        u = urlparse(args.url)
+        print(medir(args.url, u.hostname, u.port or 80, args.conns, args.seconds, args.lento))
+        return
+
+    srv = ServidorHTTP(app.app, "127.0.0.1", 0, hilos=max(servidor_http.HILOS, args.conns + 2))
+    viejo = _ServidorLegado()
+    for s in (srv, viejo):
+        threading.Thread(target=s.serve_forever, daemon=True).start()
+
+    salida = sys.stdout
+    sys.stdout = open(os.devnull, "w", encoding="utf-8") # la línea por request de app.py
+    try:
+        informes = [medir("servidor_http", "127.0.0.1", srv.port, args.conns, args.seconds, args.lento),
+                    # con el servidor viejo un cliente lento frena todo hasta que se va: sin --lento
+                    medir("HTTPServer viejo", "127.0.0.1", viejo.server_address[1], args.conns, args.seconds, False)]
+        srv.apagar(espera_s=2)
+        viejo.shutdown()
+        viejo.server_close()
+        _apagado_ordenado(informes)
+    finally:
+        sys.stdout.close()
+        sys.stdout = salida
+    print("\n".join(informes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# load_webhook.py
+# Uso:
+# python benchmarks/load_webhook.py                  (servidor en proceso, procesador simulado)
+# python benchmarks/load_webhook.py --url http://localhost:5000/webhook
+# python benchmarks/load_webhook.py --rate 5000 --minutes 1 --conns 20
+#
+# Envía eventos ITEM_SOLD al ritmo pedido (5000/min por defecto) sobre
+# conexiones keep-alive y reporta latencia de ack (p50/p99) y errores.
+# Sin --url levanta WebhookServer en el mismo loop con un procesador que
+# solo duerme PROC_MS milisegundos, para medir la ingesta aislada.
+
+import argparse
+import asyncio
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cola import ColaTrabajos
+from server_webhook import WebhookServer, _percentil
+
+PROC_MS = 50
+
+
+async def _procesador_simulado(evento: dict, trabajo_id: int) -> None:
+    await asyncio.sleep(PROC_MS / 1000)
+
+
+async def _cliente(host: str, port: int, path: str, cola: "asyncio.Queue", lat: list, errores: list) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            evento = await cola.get()
+            if evento is None:
+                break
+            body = json.dumps(evento).encode("utf-8")
+            req = (
+                f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n"
+            ).encode("latin-1") + body
+            t0 = time.perf_counter()
+            writer.write(req)
+            await writer.drain()
+            status = await reader.readline()
+            length = 0
+            while True:
+                h = await reader.readline()
+                if h in (b"\r\n", b""):
+                    break
+                if h.lower().startswith(b"content-length:"):
+                    length = int(h.split(b":", 1)[1])
+            await reader.readexactly(length)
+            lat.append((time.perf_counter() - t0) * 1000)
+            code = int(status.split()[1])
+            if code >= 300:
+                errores.append(code)
+    finally:
+        writer.close()
+
+
+async def run(args) -> None:
+    server = None
+    if args.url:
+        u = urlparse(args.url)
+        host, port, path = u.hostname, u.port or 80, u.path or "/webhook"
+    else:
+        # cola propia en un directorio temporal: no toca inventory/cola.db
+        tmp = tempfile.mkdtemp(prefix="load_webhook_")
+        server = WebhookServer(_procesador_simulado, workers=args.workers,
+                               cola=ColaTrabajos(Path(tmp) / "cola.db"))
+        await server.start("127.0.0.1", 0)
+        host, port, path = "127.0.0.1", server._server.sockets[0].getsockname()[1], "/webhook"
+
+    total = int(args.rate * args.minutes)
+    intervalo = 60.0 / args.rate
+    cola: "asyncio.Queue" = asyncio.Queue()
+    lat: list = []
+    errores: list = []
+    clientes = [asyncio.create_task(_cliente(host, port, path, cola, lat, errores)) for _ in range(args.conns)]
+
+    print(f"🚀 {total} eventos a {args.rate:.0f}/min contra {host}:{port}{path} ({args.conns} conexiones)")
+    t0 = time.perf_counter()
+    for i in range(total):
+        objetivo = t0 + i * intervalo
+        espera = objetivo - time.perf_counter()
+        if espera > 0:
+            await asyncio.sleep(espera)
+        await cola.put({"event": "ITEM_SOLD", "platform": "ebay", "sku": f"LOAD-{i:06d}"})
+    for _ in clientes:
+        await cola.put(None)
+    await asyncio.gather(*clientes)
+    enviado = time.perf_counter() - t0
+
+    print(f"✅ Enviados {len(lat)} en {enviado:.1f}s ({len(lat) / enviado * 60:.0f}/min)")
+    print(f"   ack p50={_percentil(lat, 50):.2f}ms p99={_percentil(lat, 99):.2f}ms max={max(lat or [0]):.2f}ms")
+    print(f"   errores HTTP: {len(errores)}")
+
+    if server is not None:
+        await server.stop(drain=True)
+        s = server.stats()
+        print(f"   servidor: procesados={s['processed']} rechazados={s['rejected']} "
+              f"espera en cola p99={s['queue_wait_ms']['p99']:.1f}ms")
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Prueba de carga del webhook server")
+    ap.add_argument("--url", default="")
+    ap.add_argument("--rate", type=float, default=5000, help="eventos por minuto")
+    ap.add_argument("--minutes", type=float, default=1.0)
+    ap.add_argument("--conns", type=int, default=20)
+    ap.add_argument("--workers", type=int, default=8, help="workers del servidor en proceso")
+    asyncio.run(run(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+# stub_trading.py
+# Uso:
+# python benchmarks/stub_trading.py [--port 8089] [--latencia-ms 80] [--fallos 0.1]
+#                                   [--limite-rps 5] [--fallos-5xx 0.05]
+# set EBAY_TRADING_URL=http://127.0.0.1:8089/ws/api.dll
+#
+# Stub local de la Trading API para probar sin tocar eBay:
+# - EndItems: hasta 10 EndItemRequestContainer, responde un container por
+#   item con su CorrelationID; un % de items falla con un error transitorio
+#   (10007) y los ItemIDs que empiezan con "17" fallan siempre (código 17)
+# - EndItem: un item, mismas reglas
+# - GetItem: devuelve benchmarks/fixtures/getitem_<id>.xml si existe, o el
+#   item del catálogo falso
+# - GetSellerList / GetSellerEvents: paginan / filtran por fecha de
+#   modificación un catálogo falso (cargar_catalogo, modificar)
+# Los items ya terminados responden 1047 ("already closed") como eBay.
+# Límites de eBay simulados:
+# - limite_rps: más de N llamadas en el último segundo responden Ack=Failure
+#   con ErrorCode 518 ("Call usage limit has been reached"), sin ejecutar nada
+# - fallos_5xx: un % de las llamadas responde HTTP 503 sin ejecutar nada
+
+import random
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+NS = "{urn:ebay:apis:eBLBaseComponents}"
+
+
+def _error(code: str, msg: str, severity: str = "Error") -> str:
+    return (f"<Errors><ShortMessage>{msg}</ShortMessage><LongMessage>{msg}</LongMessage>"
+            f"<ErrorCode>{code}</ErrorCode><SeverityCode>{severity}</SeverityCode></Errors>")
+
+
+def _ts(s: str) -> datetime:
+    return datetime.fromisoformat(s.replace("Z", "+00:00"))
+
+
+class StubTrading:
+    def __init__(self, latencia_ms: float = 80, fallos: float = 0.0, seed: Optional[int] = None,
+                 limite_rps: float = 0, fallos_5xx: float = 0.0):
+        self.latencia_ms = latencia_ms
+        self.fallos = fallos
+        self.limite_rps = limite_rps
+        self.fallos_5xx = fallos_5xx
+        self.rand = random.Random(seed)
+        self.terminados: Dict[str, str] = {}
+        self.llamadas: Dict[str, int] = {}
+        self.rechazadas: Dict[str, int] = {} # "518" / "503" -> cuántas
+        self._ventana: List[float] = [] # llamadas aceptadas en el último segundo
+        self.lock = threading.Lock()
+        self.server: Optional[ThreadingHTTPServer] = None
+        self.catalogo: Dict[str, Dict[str, Any]] = {}
+
+    # ----------------------------
+    # Catálogo falso
+    # ----------------------------
+
+    def cargar_catalogo(self, n: int, base: int = 296000000000) -> List[str]:
+        ahora = datetime.now(timezone.utc)
+        for i in range(n):
+            self.catalogo[str(base + i)] = {
+                "title": f"Vintage Item {i} Levi's 501 Jeans",
+                "status": "Active",
+                "mod": ahora - timedelta(days=3),
+                "end": ahora + timedelta(days=1 + i % 29),
+            }
+        return list(self.catalogo)
+
+    def modificar(self, ids: List[str], status: str = "Active") -> None:
+        ahora = datetime.now(timezone.utc)
+        with self.lock:
+            for item_id in ids:
+                it = self.catalogo[item_id]
+                it["status"] = status
+                it["mod"] = ahora
+                it["title"] = it["title"] + " (editado)"
+
+    # ----------------------------
+    # Límites simulados
+    # ----------------------------
+
+    def _rechazo(self, call: str) -> Optional[Tuple[str, int]]:
+        """(respuesta, status) si la llamada se rechaza por límite o 5xx, si no None."""
+        with self.lock:
+            if self.fallos_5xx and self.rand.random() < self.fallos_5xx:
+                self.rechazadas["503"] = self.rechazadas.get("503", 0) + 1
+                return "Service Unavailable", 503
+            if self.limite_rps:
+                ahora = time.monotonic()
+                self._ventana = [t for t in self._ventana if ahora - t < 1.0]
+                if len(self._ventana) >= self.limite_rps:
+                    self.rechazadas["518"] = self.rechazadas.get("518", 0) + 1
+                    return self._respuesta(call or "Unknown", "Failure",
+                                           _error("518", "Call usage limit has been reached.")), 200
+                self._ventana.append(ahora)
+        return None
+
+    # ----------------------------
+    # Lógica de cada call
+    # ----------------------------
+
+    def _terminar(self, item_id: str) -> Tuple[str, str]:
+        """(EndTime, errores XML) para un item."""
+        with self.lock:
+            if item_id.startswith("17"):
+                return "", _error("17", "This item cannot be accessed because the listing has been deleted or you are not the seller.")
+            if item_id in self.terminados:
+                return "", _error("1047", "The auction has already been closed.")
+            if self.rand.random() < self.fallos:
+                return "", _error("10007", "Internal error to the application.")
+            end = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
+            self.terminados[item_id] = end
+            return end, ""
+
+    def end_items(self, req: ET.Element) -> str:
+        partes: List[str] = []
+        fallidos = 0
+        for cont in req.iter(NS + "EndItemRequestContainer"):
+            cid = cont.findtext(NS + "MessageID", "")
+            end, errores = self._terminar(cont.findtext(NS + "ItemID", ""))
+            fallidos += bool(errores)
+            partes.append(f"<EndItemResponseContainer>{f'<EndTime>{end}</EndTime>' if end else ''}"
+                          f"<CorrelationID>{cid}</CorrelationID>{errores}</EndItemResponseContainer>")
+        ack = "Success" if not fallidos else ("Failure" if fallidos == len(partes) else "PartialFailure")
+        return self._respuesta("EndItems", ack, "".join(partes))
+
+    def end_item(self, req: ET.Element) -> str:
+        end, errores = self._terminar(req.findtext(NS + "ItemID", ""))
+        return self._respuesta("EndItem", "Failure" if errores else "Success",
+                               errores or f"<ItemID>{req.findtext(NS + 'ItemID', '')}</ItemID><EndTime>{end}</EndTime>")
+
+    def get_item(self, req: ET.Element) -> str:
+        item_id = req.findtext(NS + "ItemID", "")
+        p = FIXTURES / f"getitem_{item_id}.xml"
+        if p.exists():
+            return p.read_text(encoding="utf-8")
+        if item_id in self.catalogo:
+            return self._respuesta("GetItem", "Success", self._item_xml(item_id))
+        return self._respuesta("GetItem", "Failure", _error("17", f"Item {item_id} not found."))
+
+    def _item_xml(self, item_id: str, completo: bool = True) -> str:
+        it = self.catalogo[item_id]
+        extra = ""
+        if completo:
+            extra = (f"<Description>&lt;p&gt;{it['title']} in great condition.&lt;/p&gt;</Description>"
+                     "<PrimaryCategory><CategoryID>11483</CategoryID><CategoryName>Jeans</CategoryName></PrimaryCategory>"
+                     "<ConditionDisplayName>Pre-owned</ConditionDisplayName>"
+                     "<ItemSpecifics><NameValueList><Name>Brand</Name><Value>Levi's</Value></NameValueList>"
+                     "<NameValueList><Name>Size</Name><Value>32</Value></NameValueList></ItemSpecifics>"
+                     f"<PictureDetails><PictureURL>https://i.ebayimg.com/images/g/{item_id}/s-l1600.jpg</PictureURL></PictureDetails>")
+        return (f"<Item><ItemID>{item_id}</ItemID><Title>{it['title']}</Title>{extra}"
+                f"<ListingDetails><EndTime>{it['end'].strftime('%Y-%m-%dT%H:%M:%S.000Z')}</EndTime></ListingDetails>"
+                f"<SellingStatus><CurrentPrice currencyID=\"USD\">24.99</CurrentPrice>"
+                f"<ListingStatus>{it['status']}</ListingStatus></SellingStatus></Item>")
+
+    def get_seller_list(self, req: ET.Element) -> str:
+        desde = _ts(req.findtext(NS + "EndTimeFrom", ""))
+        hasta = _ts(req.findtext(NS + "EndTimeTo", ""))
+        por_pagina = int(req.findtext(f"{NS}Pagination/{NS}EntriesPerPage", "25"))
+        pagina = int(req.findtext(f"{NS}Pagination/{NS}PageNumber", "1"))
+        with self.lock:
+            ids = [i for i, it in self.catalogo.items() if it["status"] == "Active" and desde <= it["end"] <= hasta]
+        total_pag = max(1, -(-len(ids) // por_pagina))
+        items = "".join(self._item_xml(i) for i in ids[(pagina - 1) * por_pagina:pagina * por_pagina])
+        return self._respuesta("GetSellerList", "Success",
+                               f"<PaginationResult><TotalNumberOfPages>{total_pag}</TotalNumberOfPages>"
+                               f"<TotalNumberOfEntries>{len(ids)}</TotalNumberOfEntries></PaginationResult>"
+                               f"<HasMoreItems>{'true' if pagina < total_pag else 'false'}</HasMoreItems>"
+                               f"<ItemArray>{items}</ItemArray>")
+
+    def get_seller_events(self, req: ET.Element) -> str:
+        desde = _ts(req.findtext(NS + "ModTimeFrom", ""))
+        hasta = _ts(req.findtext(NS + "ModTimeTo", ""))
+        with self.lock:
+            ids = [i for i, it in self.catalogo.items() if desde <= it["mod"] <= hasta]
+        items = "".join(self._item_xml(i, completo=False) for i in ids)
+        return self._respuesta("GetSellerEvents", "Success", f"<ItemArray>{items}</ItemArray>")
+
+    def _respuesta(self, call: str, ack: str, cuerpo: str) -> str:
+        ahora = datetime.now(timezone.utc)
+        return (f'<?xml version="1.0" encoding="UTF-8"?>\n<{call}Response xmlns="urn:ebay:apis:eBLBaseComponents">'
+                f"<Timestamp>{ahora.strftime('%Y-%m-%dT%H:%M:%S.')}{ahora.microsecond // 1000:03d}Z</Timestamp>"
+                f"<Ack>{ack}</Ack><Version>967</Version>{cuerpo}</{call}Response>")
+
+    # ----------------------------
+    # Servidor
+    # ----------------------------
+
+    def start(self, port: int = 0) -> str:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # headers + cuerpo en un solo send: con keep-alive, Nagle + ACK
+            # demorado sumaban ~40 ms a cada llamada que reusa la conexión
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                call = self.headers.get("X-EBAY-API-CALL-NAME", "")
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+                with stub.lock:
+                    stub.llamadas[call] = stub.llamadas.get(call, 0) + 1
+                time.sleep(stub.latencia_ms / 1000)
+                fn = {"EndItems": stub.end_items, "EndItem": stub.end_item, "GetItem": stub.get_item,
+                      "GetSellerList": stub.get_seller_list, "GetSellerEvents": stub.get_seller_events}.get(call)
+                rechazo = stub._rechazo(call)
+                if rechazo is not None:
+                    out, status = rechazo
+                elif fn is None:
+                    out, status = stub._respuesta(call or "Unknown", "Failure", _error("2", "Unsupported call.")), 200
+                else:
+                    try:
+                        out, status = fn(ET.fromstring(body)), 200
+                    except ET.ParseError:
+                        out, status = "bad xml", 400
+                data = out.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/xml")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self.server.server_address[1]}/ws/api.dll"
+
+    def stop(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+def main() -> None:
+    args = sys.argv[1:]
+
+    def opt(name: str, default: str) -> str:
+        return args[args.index(name) + 1] if name in args else default
+
+    stub = StubTrading(latencia_ms=float(opt("--latencia-ms", "80")), fallos=float(opt("--fallos", "0")),
+                       limite_rps=float(opt("--limite-rps", "0")), fallos_5xx=float(opt("--fallos-5xx", "0")))
+    url = stub.start(int(opt("--port", "8089")))
+    print(f"🟢 Stub Trading API en {url}")
+    print(f"   set EBAY_TRADING_URL={url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+# suite.py
+# Uso:
+# python benchmarks/suite.py                       corre todo y compara con benchmarks/baseline.json
+# python benchmarks/suite.py --solo parse,render   solo algunos casos
+# python benchmarks/suite.py --json salida.json    además guarda los resultados
+# python benchmarks/suite.py --guardar             los resultados pasan a ser el baseline
+# python benchmarks/suite.py --tolerancia 0.5      regresión = más de 50% más lento (0.3 por defecto)
+#
+# Suite offline (sin red, sin eBay, sin Playwright) con los fixtures GetItem
+# de benchmarks/fixtures, el stub de la Trading API (stub_trading.py) y
+# acciones de delist falsas. Todo corre en un directorio temporal: no toca
+# inventory/, drafts/, cache/ ni logs/ del repo.
+#
+#   parse          item_from_getitem_xml (resell y generar_drafts) y
+#                  get_item_from_ebay / ebay_get_item contra el stub
+#   render         build_depop_draft / build_posh_draft / render_item
+#   estado         marcar_vendido y resell.mark_sold con 1k, 10k y 100k SKUs
+#   procesar       procesar_evento simulado y con delist (acciones falsas)
+#   cola           procesar_cola.main de punta a punta sobre una cola temporal
+#
+# Cada métrica es µs por operación (menos es mejor), mejor de varias
+# repeticiones. Sale con código 1 si alguna empeoró más que la tolerancia
+# respecto del baseline. El baseline depende de la máquina: regenerarlo con
+# --guardar en la máquina donde se compara.
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+TOLERANCIA = 0.30
+REPETICIONES = 5
+
+Resultados = Dict[str, float]
+
+
+def _us(fn: Callable[[], object], n: int, reps: int = REPETICIONES) -> float:
+    """µs por llamada: mejor de `reps` corridas de `n` llamadas."""
+    mejor = float("inf")
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return round(mejor / n * 1e6, 2)
+
+
+def _fixtures() -> Dict[str, str]:
+    return {p.stem.split("_")[-1]: p.read_text(encoding="utf-8") for p in sorted(FIXTURES.glob("getitem_*.xml"))}
+
+
+def _silencio():
+    return redirect_stdout(open(os.devnull, "w", encoding="utf-8"))
+
+
+# ----------------------------
+# Casos
+# ----------------------------
+
+def caso_parse(tmp: Path) -> Resultados:
+    import ebay_cache
+    import ebay_cliente
+    import generar_drafts
+    import resell
+    from stub_trading import StubTrading
+
+    xmls = _fixtures()
+    ids = list(xmls)
+    out: Resultados = {
+        "resell.item_from_getitem_xml": _us(lambda: [resell.item_from_getitem_xml(i, x) for i, x in xmls.items()],
+                                             200) / len(ids),
+        "generar_drafts.item_from_getitem_xml": _us(
+            lambda: [generar_drafts.item_from_getitem_xml(i, x) for i, x in xmls.items()], 200) / len(ids),
+    }
+
+    # GetItem de punta a punta (HTTP local + parseo + caché en disco)
+    stub = StubTrading(latencia_ms=0)
+    url = stub.start()
+    resell.EBAY_TRADING_URL = generar_drafts.EBAY_TRADING_URL = url
+    ebay_cache._CACHE = ebay_cache.GetItemCache(tmp / "cache")
+    ebay_cliente._CLIENTE = ebay_cliente.ClienteTrading(
+        cubo=ebay_cliente.CuboTokens(rps=0), cuota=ebay_cliente.CuotaEbay(tmp / "cuota.db", por_dia=0, por_hora=0))
+    try:
+        out["get_item_from_ebay (stub)"] = _us(lambda: [resell.get_item_from_ebay(i, "TOKEN", refresh=True)
+                                                        for i in ids], 20) / len(ids)
+        out["ebay_get_item (stub)"] = _us(lambda: [generar_drafts.ebay_get_item(i, "TOKEN", refresh=True)
+                                                   for i in ids], 20) / len(ids)
+        out["get_item_from_ebay (caché)"] = _us(lambda: [resell.get_item_from_ebay(i, "TOKEN") for i in ids],
+                                                200) / len(ids)
+    finally:
+        stub.stop()
+    return out
+
+
+def caso_render(tmp: Path) -> Resultados:
+    import generar_drafts
+    import plantillas
+    import resell
+
+    items = [generar_drafts.item_from_getitem_xml(i, x) for i, x in _fixtures().items()]
+    return {
+        "build_depop_draft": _us(lambda: [resell.build_depop_draft(it) for it in items], 500) / len(items),
+        "build_posh_draft": _us(lambda: [resell.build_posh_draft(it) for it in items], 500) / len(items),
+        "render_item (depop+posh)": _us(lambda: [plantillas.render_item(it) for it in items], 500) / len(items),
+    }
+
+
+def caso_estado(tmp: Path) -> Resultados:
+    import resell
+    from inventory import state, store
+    from inventory.store import PLATFORMS, StateStore
+
+    resell.ACCIONES_LOG = tmp / "logs" / "acciones.log"
+    rnd = random.Random(42)
+    out: Resultados = {}
+    for tam in (1_000, 10_000, 100_000):
+        st = StateStore(tmp / f"state_{tam}.db", legacy_json=None)
+        st.mark_sold_many((f"SKU-{i:06d}", PLATFORMS[i % 3]) for i in range(tam))
+        store._DEFAULT = st
+        skus = [f"SKU-{rnd.randrange(tam * 2):06d}" for _ in range(2000)] # mitad existentes, mitad nuevos
+        it = iter(skus * (REPETICIONES * 2))
+        out[f"marcar_vendido [{tam} SKUs]"] = _us(lambda: state.marcar_vendido(next(it), "depop"), 400)
+        out[f"resell.mark_sold [{tam} SKUs]"] = _us(lambda: resell.mark_sold(next(it), "ebay"), 400)
+        st.close()
+    store._DEFAULT = None
+    return out
+
+
+def _preparar_evento(tmp: Path) -> None:
+    import dedup
+    import logger
+    from inventory import store
+    from inventory.store import StateStore
+
+    logger.LOG_FILE = tmp / "logs" / "acciones.log"
+    dedup._INDICE = dedup.IndiceDedup(tmp / f"dedup_{time.monotonic_ns()}.db")
+    store._DEFAULT = StateStore(tmp / f"state_{time.monotonic_ns()}.db", legacy_json=None)
+
+
+def caso_procesar(tmp: Path) -> Resultados:
+    import Cerebro_v2
+    import delist
+
+    async def nada(sku: str) -> None:
+        return None
+
+    # delist "real" con las acciones de Playwright / EndItem reemplazadas por no-ops
+    delist._ORQUESTADOR = delist.OrquestadorDelist(acciones={p: nada for p in delist.PLATAFORMAS},
+                                                   log_path=tmp / "logs" / "delist.log")
+    out: Resultados = {}
+    n = 1000
+    for nombre, prueba in (("procesar_evento (simulado)", True), ("procesar_evento (delist stub)", False)):
+        mejor = float("inf")
+        for rep in range(REPETICIONES):
+            _preparar_evento(tmp)
+            eventos = [{"event": "ITEM_SOLD", "platform": "depop", "sku": f"P-{rep}-{i}"} for i in range(n)]
+
+            async def correr():
+                for ev in eventos:
+                    await Cerebro_v2.procesar_evento(ev)
+
+            Cerebro_v2.MODO_PRUEBA = prueba
+            Cerebro_v2.confirmar_borrado = lambda sku, platform: True
+            with _silencio():
+                t0 = time.perf_counter()
+                asyncio.run(correr())
+                mejor = min(mejor, time.perf_counter() - t0)
+        out[nombre] = round(mejor / n * 1e6, 2)
+    Cerebro_v2.MODO_PRUEBA = True
+    delist._ORQUESTADOR = None
+    return out
+
+
+def caso_cola(tmp: Path) -> Resultados:
+    import Cerebro_v2
+    import cola
+    import procesar_cola
+
+    Cerebro_v2.MODO_PRUEBA = True
+    procesar_cola.COLA = tmp / "cola_ventas.csv"
+    procesar_cola.PROCESADAS = tmp / "logs" / "cola_procesada.csv"
+    procesar_cola.CHECKPOINT = tmp / "logs" / "cola_offset.json"
+    n = 1000
+    mejor = float("inf")
+    for rep in range(3):
+        _preparar_evento(tmp)
+        cola._COLA = cola.ColaTrabajos(tmp / f"cola_{rep}.db")
+        cola._COLA.encolar_muchos({"event": "ITEM_SOLD", "platform": "poshmark", "sku": f"C-{rep}-{i}"}
+                                  for i in range(n))
+        with _silencio():
+            t0 = time.perf_counter()
+            asyncio.run(procesar_cola.main(workers=procesar_cola.WORKERS))
+            mejor = min(mejor, time.perf_counter() - t0)
+        assert cola._COLA.stats()["pending"] == 0
+    cola._COLA = None
+    return {f"procesar_cola.main ({procesar_cola.WORKERS} workers)": round(mejor / n * 1e6, 2)}
+
+
+CASOS: Dict[str, Callable[[Path], Resultados]] = {
+    "parse": caso_parse,
+    "render": caso_render,
+    "estado": caso_estado,
+    "procesar": caso_procesar,
+    "cola": caso_cola,
+}
+
+
+# ----------------------------
+# Baseline
+# ----------------------------
+
+def comparar(actual: Dict[str, Resultados], base: Dict[str, Resultados], tolerancia: float) -> List[str]:
+    """Imprime la tabla contra el baseline y devuelve las métricas que empeoraron."""
+    regresiones = []
+    print(f"\n{'':52} {'baseline':>10} {'ahora':>10} {'cambio':>8}")
+    for caso, metricas in actual.items():
+        print(f"[{caso}]")
+        for nombre, valor in metricas.items():
+            antes = base.get(caso, {}).get(nombre)
+            if not antes:
+                print(f"  {nombre:50} {'-':>10} {valor:>8.2f}µs {'nuevo':>8}")
+                continue
+            cambio = valor / antes - 1
+            marca = ""
+            if cambio > tolerancia:
+                marca = " ❌"
+                regresiones.append(f"{caso}/{nombre}")
+            elif cambio < -tolerancia:
+                marca = " 🚀"
+            print(f"  {nombre:50} {antes:>8.2f}µs {valor:>8.2f}µs {cambio:>+7.0%}{marca}")
+    return regresiones
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Suite de benchmarks offline")
+    ap.add_argument("--solo", default="", help="casos separados por coma: " + ",".join(CASOS))
+    ap.add_argument("--json", default="", help="guarda los resultados en este archivo")
+    ap.add_argument("--baseline", default=str(BASELINE))
+    ap.add_argument("--guardar", action="store_true", help="escribe los resultados como baseline")
+    ap.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    args = ap.parse_args()
+
+    elegidos = [c.strip() for c in args.solo.split(",") if c.strip()] or list(CASOS)
+    for c in elegidos:
+        if c not in CASOS:
+            ap.error(f"caso desconocido: {c} (hay {', '.join(CASOS)})")
+
+    import logger
+    import metricas
+
+    tmp = Path(tempfile.mkdtemp(prefix="suite_"))
+    resultados: Dict[str, Resultados] = {}
+    try:
+        for c in elegidos:
+            t0 = time.perf_counter()
+            resultados[c] = CASOS[c](tmp)
+            print(f"⏱️ {c:9} {time.perf_counter() - t0:5.1f}s  " +
+                  "  ".join(f"{k}={v:.1f}µs" for k, v in resultados[c].items()))
+    finally:
+        # los registros de logger.py escriben en tmp: cerrarlos antes de borrarlo
+        for clave, reg in list(logger._REGISTROS.items()):
+            if clave.startswith(str(tmp.resolve())):
+                reg.cerrar()
+                logger._REGISTROS.pop(clave, None)
+        metricas._METRICAS = None # sin volcado en logs/metricas/
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    salida = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "unidad": "µs por operación",
+        "resultados": resultados,
+    }
+    if args.json:
+        Path(args.json).write_text(json.dumps(salida, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"💾 Resultados en {args.json}")
+
+    baseline = Path(args.baseline)
+    if args.guardar:
+        if baseline.exists():
+            # conserva los casos que no se corrieron esta vez
+            previo = json.loads(baseline.read_text(encoding="utf-8"))
+            salida["resultados"] = {**previo.get("resultados", {}), **resultados}
+        baseline.write_text(json.dumps(salida, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"📌 Baseline actualizado: {baseline}")
+        return
+    if not baseline.exists():
+        print(f"📭 No hay baseline ({baseline}); crealo con --guardar")
+        return
+
+    base = json.loads(baseline.read_text(encoding="utf-8"))
+    regresiones = comparar(resultados, base.get("resultados", {}), args.tolerancia)
+    if regresiones:
+        print(f"\n❌ {len(regresiones)} regresiones (> {args.tolerancia:.0%} más lento que el baseline "
+              f"del {base.get('fecha', '?')[:10]}): {', '.join(regresiones)}")
+        sys.exit(1)
+    print(f"\n✅ Sin regresiones (tolerancia {args.tolerancia:.0%})")
+
+
+if __name__ == "__main__":
+    main()
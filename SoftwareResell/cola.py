@@ -0,0 +1,270 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+# Cola de trabajos persistente (reemplaza cola_ventas.csv).
+#
+# - inventory/cola.db (SQLite en WAL): encolar es un INSERT en una
+#   transacción, así que un evento aceptado no se pierde aunque se corte el
+#   proceso, y varios productores pueden escribir a la vez
+# - tomar() entrega trabajos con un lease: quedan invisibles para otros
+#   consumidores durante `visibilidad_s`. Si el consumidor no confirma a
+#   tiempo (se colgó, se cortó), el trabajo vuelve a estar disponible
+# - confirmar() borra el trabajo; fallar() lo reprograma con backoff
+# - después de MAX_INTENTOS entregas pasa a "muerto" (dead-letter) y queda
+#   ahí para revisarlo o revivirlo a mano (procesar_cola.py --muertos/--revivir)
+# - varios consumidores (hilos o procesos) pueden tomar a la vez: el
+#   reparto se hace con BEGIN IMMEDIATE, nunca se entrega dos veces el
+#   mismo lease
+# - los consumidores async procesan dentro de `lease_renovado`: un delist
+#   largo (login de Playwright + deadline) no deja vencer el lease
+
+ROOT = Path(__file__).resolve().parent
+DB_PATH = ROOT / "inventory" / "cola.db"
+
+COLA_VENTAS = "ventas"
+VISIBILIDAD_S = float(os.environ.get("COLA_VISIBILIDAD_S", "300")) # tiempo para confirmar un trabajo tomado
+MAX_INTENTOS = int(os.environ.get("COLA_MAX_INTENTOS", "5"))
+BACKOFF_BASE_S = 2.0
+BACKOFF_MAX_S = 300.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trabajos (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    cola       TEXT NOT NULL,
+    payload    TEXT NOT NULL,
+    estado     TEXT NOT NULL DEFAULT 'pendiente', -- pendiente | muerto
+    intentos   INTEGER NOT NULL DEFAULT 0,
+    visible_en REAL NOT NULL,                    -- no se entrega antes de esto (lease o backoff)
+    lease      TEXT,
+    consumidor TEXT,
+    creado_en  REAL NOT NULL,
+    error      TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_trabajos_orden ON trabajos(cola, estado, id);
+"""
+
+
+@dataclass
+class Trabajo:
+    id: int
+    cola: str
+    payload: Dict[str, Any]
+    intentos: int
+    lease: str
+    creado_en: float
+
+
+class ColaTrabajos:
+    def __init__(self, path: Path = DB_PATH, visibilidad_s: float = VISIBILIDAD_S, max_intentos: int = MAX_INTENTOS):
+        self.path = Path(path)
+        self.visibilidad_s = visibilidad_s
+        self.max_intentos = max_intentos
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._ready = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+            if not self._ready:
+                with self._init_lock:
+                    if not self._ready:
+                        conn.executescript(_SCHEMA)
+                        self._ready = True
+        return conn
+
+    # ----------------------------
+    # Productores
+    # ----------------------------
+
+    def encolar(self, payload: Dict[str, Any], cola: str = COLA_VENTAS, demora_s: float = 0.0) -> int:
+        """Agrega un trabajo. Devuelve su id (ya está en disco al volver)."""
+        ahora = time.time()
+        cur = self._conn().execute(
+            "INSERT INTO trabajos (cola, payload, visible_en, creado_en) VALUES (?, ?, ?, ?)",
+            (cola, json.dumps(payload, ensure_ascii=False), ahora + demora_s, ahora),
+        )
+        return int(cur.lastrowid)
+
+    def encolar_muchos(self, payloads: Iterable[Dict[str, Any]], cola: str = COLA_VENTAS) -> int:
+        """Varios trabajos en una sola transacción (todo o nada). Devuelve cuántos."""
+        ahora = time.time()
+        filas = [(cola, json.dumps(p, ensure_ascii=False), ahora, ahora) for p in payloads]
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("INSERT INTO trabajos (cola, payload, visible_en, creado_en) VALUES (?, ?, ?, ?)", filas)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(filas)
+
+    # ----------------------------
+    # Consumidores
+    # ----------------------------
+
+    def tomar(self, consumidor: str = "", n: int = 1, cola: str = COLA_VENTAS,
+              visibilidad_s: Optional[float] = None, ids: Optional[Iterable[int]] = None) -> List[Trabajo]:
+        """
+        Toma hasta `n` trabajos visibles (los más viejos primero) con un
+        lease de `visibilidad_s`. Con `ids` solo considera esos trabajos.
+        """
+        ahora = time.time()
+        vence = ahora + (self.visibilidad_s if visibilidad_s is None else visibilidad_s)
+        filtro, params = "", []
+        if ids is not None:
+            ids = [int(i) for i in ids]
+            if not ids:
+                return []
+            filtro = f" AND id IN ({','.join('?' * len(ids))})"
+            params = ids
+
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            trabajos: List[Trabajo] = []
+            while len(trabajos) < n:
+                filas = conn.execute(
+                    "SELECT id, payload, intentos, creado_en FROM trabajos "
+                    f"WHERE cola = ? AND estado = 'pendiente' AND visible_en <= ?{filtro} ORDER BY id LIMIT ?",
+                    [cola, ahora, *params, max(1, n - len(trabajos))],
+                ).fetchall()
+                if not filas:
+                    break
+                for id_, payload, intentos, creado_en in filas:
+                    if intentos >= self.max_intentos:
+                        # lease vencido que ya agotó sus entregas → dead-letter
+                        conn.execute("UPDATE trabajos SET estado = 'muerto', lease = NULL, "
+                                     "error = COALESCE(error, 'lease vencido sin confirmar') WHERE id = ?", (id_,))
+                        continue
+                    lease = uuid.uuid4().hex
+                    conn.execute(
+                        "UPDATE trabajos SET lease = ?, consumidor = ?, visible_en = ?, intentos = intentos + 1 WHERE id = ?",
+                        (lease, consumidor, vence, id_),
+                    )
+                    trabajos.append(Trabajo(id_, cola, json.loads(payload), intentos + 1, lease, creado_en))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return trabajos
+
+    def confirmar(self, trabajo: Trabajo) -> bool:
+        """Trabajo terminado: se borra. False si el lease ya venció y lo tomó otro."""
+        cur = self._conn().execute("DELETE FROM trabajos WHERE id = ? AND lease = ?", (trabajo.id, trabajo.lease))
+        return cur.rowcount == 1
+
+    def fallar(self, trabajo: Trabajo, error: str, reintentar: bool = True,
+               payload: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Devuelve el trabajo a la cola con backoff, o lo manda a dead-letter si
+        agotó los intentos (o reintentar=False). Devuelve el estado nuevo.
+        Con `payload` el reintento recibe ese payload en vez del original.
+        """
+        muerto = not reintentar or trabajo.intentos >= self.max_intentos
+        espera = min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2 ** (trabajo.intentos - 1))
+        cur = self._conn().execute(
+            "UPDATE trabajos SET estado = ?, lease = NULL, visible_en = ?, error = ?, "
+            "payload = COALESCE(?, payload) WHERE id = ? AND lease = ?",
+            ("muerto" if muerto else "pendiente", time.time() + (0 if muerto else espera),
+             " ".join(str(error).split())[:2000],
+             json.dumps(payload, ensure_ascii=False) if payload is not None else None, trabajo.id, trabajo.lease),
+        )
+        if cur.rowcount != 1:
+            return "perdido" # el lease venció y otro consumidor lo tiene
+        return "muerto" if muerto else "pendiente"
+
+    def extender(self, trabajo: Trabajo, segundos: Optional[float] = None) -> bool:
+        """Alarga el lease de un trabajo largo. False si ya no es nuestro."""
+        vence = time.time() + (self.visibilidad_s if segundos is None else segundos)
+        cur = self._conn().execute("UPDATE trabajos SET visible_en = ? WHERE id = ? AND lease = ?",
+                                   (vence, trabajo.id, trabajo.lease))
+        return cur.rowcount == 1
+
+    # ----------------------------
+    # Dead-letter / estado
+    # ----------------------------
+
+    def muertos(self, cola: str = COLA_VENTAS, limite: int = 100) -> List[Dict[str, Any]]:
+        filas = self._conn().execute(
+            "SELECT id, payload, intentos, creado_en, error FROM trabajos "
+            "WHERE cola = ? AND estado = 'muerto' ORDER BY id LIMIT ?", (cola, limite),
+        ).fetchall()
+        return [{"id": i, "payload": json.loads(p), "intentos": n, "creado_en": c, "error": e or ""}
+                for i, p, n, c, e in filas]
+
+    def revivir(self, cola: str = COLA_VENTAS, ids: Optional[Iterable[int]] = None) -> int:
+        """Devuelve trabajos muertos a la cola con los intentos en cero."""
+        sql = ("UPDATE trabajos SET estado = 'pendiente', intentos = 0, visible_en = ?, lease = NULL, error = NULL "
+               "WHERE cola = ? AND estado = 'muerto'")
+        params: List[Any] = [time.time(), cola]
+        if ids is not None:
+            ids = [int(i) for i in ids]
+            sql += f" AND id IN ({','.join('?' * len(ids)) or 'NULL'})"
+            params += ids
+        return self._conn().execute(sql, params).rowcount
+
+    def stats(self, cola: str = COLA_VENTAS) -> Dict[str, Any]:
+        ahora = time.time()
+        listos, demorados, en_curso, muertos, mas_viejo = self._conn().execute(
+            """SELECT
+                 COALESCE(SUM(estado = 'pendiente' AND visible_en <= ?), 0),
+                 COALESCE(SUM(estado = 'pendiente' AND lease IS NULL AND visible_en > ?), 0),
+                 COALESCE(SUM(estado = 'pendiente' AND lease IS NOT NULL AND visible_en > ?), 0),
+                 COALESCE(SUM(estado = 'muerto'), 0),
+                 MIN(CASE WHEN estado = 'pendiente' THEN creado_en END)
+               FROM trabajos WHERE cola = ?""", (ahora, ahora, ahora, cola),
+        ).fetchone()
+        return {
+            "ready": listos, # se pueden tomar ya (incluye leases vencidos)
+            "delayed": demorados, # esperando el backoff de un reintento
+            "in_flight": en_curso, # tomados, lease vigente
+            "dead": muertos,
+            "pending": listos + demorados,
+            "oldest_s": round(ahora - mas_viejo, 1) if mas_viejo else 0.0,
+        }
+
+
+@asynccontextmanager
+async def lease_renovado(cola: ColaTrabajos, trabajo: Trabajo):
+    """Renueva el lease de `trabajo` cada visibilidad_s / 3 mientras dura el bloque."""
+    async def renovar() -> None:
+        while True:
+            await asyncio.sleep(cola.visibilidad_s / 3)
+            if not await asyncio.to_thread(cola.extender, trabajo):
+                return # ya no es nuestro (confirmado, fallado o vencido)
+
+    tarea = asyncio.create_task(renovar())
+    try:
+        yield
+    finally:
+        tarea.cancel()
+
+
+_COLA: Optional[ColaTrabajos] = None
+_COLA_LOCK = threading.Lock()
+
+
+def obtener_cola() -> ColaTrabajos:
+    global _COLA
+    if _COLA is None:
+        with _COLA_LOCK:
+            if _COLA is None:
+                _COLA = ColaTrabajos()
+    return _COLA
@@ -1,81 +1,278 @@
 # crosslist.py
 # Uso:
-# python crosslist.py "URL_DE_EBAY"
+# python crosslist.py "URL_DE_EBAY" ["URL_2" ...]
+# python crosslist.py --batch urls.txt          (o "-" para leer de stdin)
+# Opciones: --workers N (GetItem simultáneos) | --refresh | --offline
 #
 # Requiere:
-# - generar_drafts.py (ya te funciona)
-# - internet
+# - ebay.yaml (token) e internet, salvo --offline
 #
-# Qué hace:
-# 1) Intenta extraer ItemID desde la URL
-# 2) Si no puede, abre el link y busca el ItemID en el HTML
-# 3) Ejecuta generar_drafts.py con el ItemID
+# Qué hace, todo en el mismo proceso (ebay.yaml se lee una sola vez):
+# 1) resolve: URL -> ItemID (ver ebay_ids.py)
+# 2) fetch:   GetItem del listing (pasa por la caché de ebay_cache.py)
+# 3) render:  textos Depop/Poshmark (ver plantillas.py)
+# 4) write:   drafts/drafts.db + copia en drafts/ (ver draft_store.py)
+# Cada etapa corre en sus propios hilos y se pasan los items por colas:
+# mientras un item se descarga, los anteriores ya se renderizan y guardan.
+# Al final se imprime el tiempo de cada etapa.
 
-import re
+# Los módulos de cada etapa se importan al armar el pipeline: el mensaje de
+# uso no paga requests/yaml/sqlite.
+
+import queue
 import sys
-import subprocess
-import requests
-
-def extract_item_id_from_text(text: str) -> str | None:
-    # patrones comunes de item id en HTML
-    patterns = [
-        r'"legacyItemId"\s*:\s*"(\d{9,})"',
-        r'"itemId"\s*:\s*"(\d{9,})"',
-        r'item=(\d{9,})',
-        r'/itm/(?:[^/]+/)?(\d{9,})',
-        r'\b(\d{12})\b', # fallback 12 dígitos típico
-    ]
-    for pat in patterns:
-        m = re.search(pat, text)
-        if m:
-            return m.group(1)
-    return None
-
-def extract_item_id(url: str) -> str:
-    url = url.strip()
-
-    # Intento 1: URL típica /itm/...
-    m = re.search(r"/itm/(?:[^/]+/)?(\d{9,})", url)
-    if m:
-        return m.group(1)
-
-    # Intento 2: parámetro item=
-    m = re.search(r"[?&]item=(\d{9,})", url)
-    if m:
-        return m.group(1)
-
-    # Intento 3: cualquier número largo en la URL
-    m = re.search(r"(\d{9,})", url)
-    if m:
-        return m.group(1)
-
-    # Intento 4: abrir el link y sacar el item id del HTML
-    r = requests.get(url, timeout=30, headers={"User-Agent": "Mozilla/5.0"})
-    r.raise_for_status()
-
-    item_id = extract_item_id_from_text(r.text)
-    if item_id:
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DRAFTS_DIR = Path("drafts") # mismo lugar que generar_drafts.py
+RESOLVE_WORKERS = 8 # links cortos: HEAD simultáneos
+FETCH_WORKERS = 4 # GetItem simultáneos
+WRITE_LOTE = 50 # items por transacción en drafts.db
+
+_FIN = object()
+
+
+def _percentil(muestras: List[float], p: float) -> float:
+    if not muestras:
+        return 0.0
+    orden = sorted(muestras)
+    return orden[min(len(orden) - 1, int(round(p / 100 * (len(orden) - 1))))]
+
+
+class Etapa:
+    """
+    N hilos que leen (clave, valor) de una cola, aplican `fn` y pasan
+    (clave, resultado) a la siguiente. Si fn devuelve None el item se
+    descarta; si lanza, queda en `errores`. Con lote > 1, fn recibe una
+    lista de valores y devuelve una lista de resultados.
+    """
+
+    def __init__(self, nombre: str, fn: Callable[[Any], Any], hilos: int = 1, lote: int = 1):
+        self.nombre = nombre
+        self.fn = fn
+        self.hilos = max(1, hilos)
+        self.lote = max(1, lote)
+        self.ms: List[float] = [] # tiempo por item
+        self.errores: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._vivos = self.hilos
+
+    def arrancar(self, entrada: "queue.Queue", salida: "queue.Queue") -> None:
+        for n in range(self.hilos):
+            threading.Thread(target=self._correr, args=(entrada, salida),
+                             name=f"{self.nombre}-{n}", daemon=True).start()
+
+    def _tomar(self, entrada: "queue.Queue") -> Tuple[List[Tuple[str, Any]], bool]:
+        pares = []
+        fin = False
+        x = entrada.get()
+        while True:
+            if x is _FIN:
+                entrada.put(_FIN) # para los otros hilos de la etapa
+                fin = True
+                break
+            pares.append(x)
+            if len(pares) >= self.lote:
+                break
+            try:
+                x = entrada.get_nowait()
+            except queue.Empty:
+                break
+        return pares, fin
+
+    def _correr(self, entrada: "queue.Queue", salida: "queue.Queue") -> None:
+        while True:
+            pares, fin = self._tomar(entrada)
+            if pares:
+                self._procesar(pares, salida)
+            if fin:
+                with self._lock:
+                    self._vivos -= 1
+                    ultimo = self._vivos == 0
+                if ultimo:
+                    salida.put(_FIN)
+                return
+
+    def _procesar(self, pares: List[Tuple[str, Any]], salida: "queue.Queue") -> None:
+        t0 = time.perf_counter()
+        try:
+            if self.lote > 1:
+                resultados = self.fn([v for _, v in pares])
+            else:
+                resultados = [self.fn(pares[0][1])]
+        except Exception as e:
+            err = " ".join(str(e).split()) or type(e).__name__
+            with self._lock:
+                for clave, _ in pares:
+                    self.errores[clave] = err
+            return
+        ms = (time.perf_counter() - t0) * 1000 / len(pares)
+        with self._lock:
+            self.ms.extend([ms] * len(pares))
+        for (clave, _), res in zip(pares, resultados):
+            if res is not None:
+                salida.put((clave, res))
+
+
+class PipelineCrosslist:
+    def __init__(self, token: str = "", fetch_workers: int = FETCH_WORKERS,
+                 refresh: bool = False, offline: bool = False, drafts_dir: Path = DRAFTS_DIR):
+        self.token = token
+        self.refresh = refresh
+        self.offline = offline
+        self.drafts_dir = Path(drafts_dir)
+        from draft_store import obtener_store
+        self.store = obtener_store()
+        self.duplicados: Dict[str, str] = {}
+        self._vistos: set = set()
+        self._lock = threading.Lock()
+        self.etapas = [
+            Etapa("resolve", self._resolve, RESOLVE_WORKERS),
+            Etapa("fetch", self._fetch, fetch_workers),
+            Etapa("render", self._render),
+            Etapa("write", self._write, lote=WRITE_LOTE),
+        ]
+
+    # ----------------------------
+    # Etapas
+    # ----------------------------
+
+    def _resolve(self, valor: str) -> Optional[str]:
+        from ebay_ids import extract_item_id # patrones precompilados + HEAD para links cortos + memo
+        item_id = extract_item_id(valor)
+        with self._lock:
+            if item_id in self._vistos:
+                self.duplicados[valor] = item_id
+                return None
+            self._vistos.add(item_id)
         return item_id
 
-    raise ValueError(
-        "No pude extraer el ItemID de ese enlace.\n"
-        "Tip: la URL del listing normalmente se ve como:\n"
-        "https://www.ebay.com/itm/123456789012"
-    )
+    def _fetch(self, item_id: str) -> Dict[str, Any]:
+        from generar_drafts import ebay_get_item
+        return ebay_get_item(item_id, self.token, refresh=self.refresh, offline=self.offline)
+
+    def _render(self, item: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        import plantillas
+        return item, plantillas.render_item(item)
+
+    def _write(self, lote: List[Tuple[Dict[str, Any], Dict[str, str]]]) -> List[str]:
+        import plantillas
+        from draft_store import ebay_json
+        rows = []
+        for item, textos in lote:
+            item_id = item["item_id"]
+            rows.append((item_id, "ebay", ebay_json(item)))
+            rows.extend((item_id, p, textos[p]) for p in plantillas.PLATAFORMAS)
+        self.store.save_many(rows)
+        ids = [item["item_id"] for item, _ in lote]
+        self.store.export(self.drafts_dir, item_ids=ids)
+        return ids
+
+    # ----------------------------
+    # Entrada
+    # ----------------------------
+
+    def correr(self, valores: List[str], al_terminar: Optional[Callable[[str, str], None]] = None) -> Dict[str, Any]:
+        """
+        Pasa cada URL/ItemID por resolve → fetch → render → write. Devuelve
+        {"ok": {valor: item_id}, "errores": {valor: (etapa, error)}, "duplicados", "secs", "etapas"}.
+        """
+        t0 = time.perf_counter()
+        colas = [queue.Queue() for _ in range(len(self.etapas) + 1)]
+        for etapa, entrada, salida in zip(self.etapas, colas, colas[1:]):
+            etapa.arrancar(entrada, salida)
+        for v in dict.fromkeys(v.strip() for v in valores if v.strip()):
+            colas[0].put((v, v))
+        colas[0].put(_FIN)
+
+        ok: Dict[str, str] = {}
+        while True:
+            x = colas[-1].get()
+            if x is _FIN:
+                break
+            ok[x[0]] = x[1]
+            if al_terminar:
+                al_terminar(x[0], x[1])
+
+        errores = {v: (e.nombre, err) for e in self.etapas for v, err in e.errores.items()}
+        return {
+            "ok": ok,
+            "errores": errores,
+            "duplicados": dict(self.duplicados),
+            "secs": time.perf_counter() - t0,
+            "etapas": self.tiempos(),
+        }
+
+    def tiempos(self) -> Dict[str, Dict[str, float]]:
+        return {
+            e.nombre: {
+                "items": len(e.ms),
+                "total_s": round(sum(e.ms) / 1000, 3),
+                "p50_ms": round(_percentil(e.ms, 50), 2),
+                "p95_ms": round(_percentil(e.ms, 95), 2),
+                "hilos": e.hilos,
+            }
+            for e in self.etapas
+        }
+
+
+def imprimir_tiempos(res: Dict[str, Any]) -> None:
+    n = len(res["ok"])
+    rate = n / res["secs"] if res["secs"] > 0 else 0.0
+    print(f"\n⏱️ {n} items en {res['secs']:.2f}s ({rate:.1f} items/s)")
+    print(f"   {'etapa':8} {'items':>6} {'hilos':>5} {'total s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for nombre, t in res["etapas"].items():
+        print(f"   {nombre:8} {t['items']:>6} {t['hilos']:>5} {t['total_s']:>8.2f} {t['p50_ms']:>8.2f} {t['p95_ms']:>8.2f}")
+
+
+def _leer_lote(source: str) -> List[str]:
+    if source == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        lines = Path(source).read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
+
 
 def main():
-    if len(sys.argv) < 2:
-        print('Uso: python crosslist.py "URL_DE_EBAY"')
+    args = sys.argv[1:]
+    refresh = "--refresh" in args
+    offline = "--offline" in args
+    args = [a for a in args if a not in ("--refresh", "--offline")]
+
+    workers = FETCH_WORKERS
+    if "--workers" in args:
+        i = args.index("--workers")
+        workers = int(args[i + 1])
+        del args[i:i + 2]
+
+    valores: List[str] = []
+    if "--batch" in args:
+        i = args.index("--batch")
+        valores += _leer_lote(args[i + 1])
+        del args[i:i + 2]
+    valores += args
+
+    if not valores:
+        print('Uso: python crosslist.py "URL_DE_EBAY" ["URL_2" ...] [--batch urls.txt] [--workers N] [--refresh | --offline]')
         sys.exit(1)
 
-    url = sys.argv[1]
-    item_id = extract_item_id(url)
+    from generar_drafts import load_yaml_config
+    token = "" if offline else load_yaml_config("ebay.yaml")["token"]
+    pipeline = PipelineCrosslist(token, fetch_workers=workers, refresh=refresh, offline=offline)
 
-    print(f"✅ ItemID detectado: {item_id}")
-    print("🚀 Generando drafts...")
+    def listo(valor: str, item_id: str) -> None:
+        print(f"✅ {item_id}: {DRAFTS_DIR / f'draft_depop_{item_id}.txt'} | {DRAFTS_DIR / f'draft_posh_{item_id}.txt'}")
 
-    result = subprocess.run([sys.executable, "generar_drafts.py", item_id])
-    sys.exit(result.returncode)
+    print(f"🚀 Generando drafts de {len(valores)} link/s...")
+    res = pipeline.correr(valores, al_terminar=listo)
+    for valor, item_id in res["duplicados"].items():
+        print(f"↪️ {valor[:80]} es el mismo ItemID {item_id}, lo salto")
+    for valor, (etapa, err) in res["errores"].items():
+        print(f"❌ {valor[:80]} ({etapa}): {err[:160]}")
+    imprimir_tiempos(res)
+    sys.exit(1 if res["errores"] else 0)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
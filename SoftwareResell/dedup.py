@@ -0,0 +1,173 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from inventory.store import DB_PATH
+
+# Índice de eventos ya procesados para cortar reintentos del webhook y
+# re-corridas de procesar_cola.py ANTES de tocar estado o navegador.
+#
+# Clave: (event, platform, sku, event_id opcional).
+# - ventana de tiempo: un evento repetido dentro de VENTANA_S es duplicado
+# - acotado: como máximo MAX_ENTRADAS en memoria (LRU por antigüedad)
+# - persistido en la tabla `dedup` de inventory/state.db, así un reinicio
+#   no vuelve a delistar lo que ya se hizo
+# - dos estados: es_duplicado() reclama el evento como "en_curso" a nombre
+#   del trabajo de la cola (dueño) y confirmar() lo pasa a "hecho" recién
+#   cuando la venta se procesó. Si el consumidor muere a mitad de camino, el
+#   lease vence y la re-entrega del MISMO trabajo retoma el reclamo (la cola
+#   sigue siendo at-least-once); otro trabajo con el mismo evento es
+#   duplicado. Un reclamo sin dueño (llamada fuera de la cola) se puede
+#   retomar pasados EN_CURSO_MAX_S
+# - la tabla manda: los reclamos son UPSERT condicionales que ven lo que
+#   hizo otro proceso (server_webhook y procesar_cola comparten la cola y la
+#   base). En memoria solo quedan los "hecho", que ya no cambian: un hit en
+#   memoria corta sin tocar SQLite
+
+VENTANA_S = 7 * 24 * 3600
+EN_CURSO_MAX_S = 3600 # reclamo sin dueño abandonado (proceso que murió fuera de la cola)
+MAX_ENTRADAS = 100_000
+PODA_CADA = 1000 # inserciones entre limpiezas de la tabla
+
+Clave = Tuple[str, str, str, str]
+
+
+def clave_evento(evento: Dict[str, Any]) -> Clave:
+    event_id = evento.get("event_id") or evento.get("id") or ""
+    return (
+        str(evento.get("event", "")).strip().upper(),
+        str(evento.get("platform", "")).strip().lower(),
+        str(evento.get("sku", "")).strip(),
+        str(event_id).strip(),
+    )
+
+
+class IndiceDedup:
+    def __init__(self, path: Path = DB_PATH, ventana_s: float = VENTANA_S, max_entradas: int = MAX_ENTRADAS):
+        self.path = Path(path)
+        self.ventana_s = ventana_s
+        self.max_entradas = max_entradas
+        self._vistos: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._insertados = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _abrir(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # como los demás stores: un corte de luz puede perder el último
+            # reclamo o "hecho", y eso solo significa procesar otra vez
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            conn.execute("CREATE TABLE IF NOT EXISTS dedup (clave TEXT PRIMARY KEY, ts REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_dedup_ts ON dedup(ts)")
+            # tablas de antes de los estados: lo registrado ya se había procesado
+            columnas = {fila[1] for fila in conn.execute("PRAGMA table_info(dedup)")}
+            if "estado" not in columnas:
+                try:
+                    conn.execute("ALTER TABLE dedup ADD COLUMN estado TEXT NOT NULL DEFAULT 'hecho'")
+                    conn.execute("ALTER TABLE dedup ADD COLUMN dueno TEXT")
+                except sqlite3.OperationalError:
+                    pass # otro proceso la migró a la vez
+            desde = time.time() - self.ventana_s
+            filas = conn.execute(
+                "SELECT clave, ts FROM dedup WHERE ts >= ? AND estado = 'hecho' ORDER BY ts DESC LIMIT ?",
+                (desde, self.max_entradas),
+            ).fetchall()
+            for clave, ts in reversed(filas):
+                self._vistos[clave] = ts
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _texto(clave: Clave) -> str:
+        return "|".join(clave)
+
+    def es_duplicado(self, evento: Dict[str, Any], dueno: Optional[str] = None) -> bool:
+        """True si el evento ya se procesó (o lo está procesando otro trabajo).
+
+        Si no, lo reclama como "en_curso" a nombre de `dueno` (id del trabajo
+        de la cola) y devuelve False: hay que llamar a confirmar() al terminar
+        bien u olvidar() si falla.
+        """
+        clave = self._texto(clave_evento(evento))
+        ahora = time.time()
+        with self._lock:
+            self._abrir()
+            ts = self._vistos.get(clave)
+            if ts is not None and ahora - ts <= self.ventana_s:
+                self.hits += 1
+                return True
+
+            # reclama si no existe, si venció la ventana, si el reclamo es del
+            # mismo trabajo (re-entrega tras un corte) o si quedó abandonado.
+            # rowcount 0 = hecho, o en curso en otro trabajo
+            cur = self._conn.execute(
+                "INSERT INTO dedup (clave, ts, estado, dueno) VALUES (?, ?, 'en_curso', ?) "
+                "ON CONFLICT(clave) DO UPDATE SET ts = excluded.ts, estado = 'en_curso', dueno = excluded.dueno "
+                "WHERE dedup.ts < ? OR (dedup.estado = 'en_curso' AND (dedup.dueno = excluded.dueno OR dedup.ts < ?))",
+                (clave, ahora, dueno, ahora - self.ventana_s, ahora - EN_CURSO_MAX_S),
+            )
+            if cur.rowcount == 0:
+                fila = self._conn.execute("SELECT ts, estado FROM dedup WHERE clave = ?", (clave,)).fetchone()
+                if fila and fila[1] == "hecho":
+                    self._recordar(clave, fila[0])
+                self.hits += 1
+                return True
+
+            self.misses += 1
+            self._insertados += 1
+            if self._insertados % PODA_CADA == 0:
+                self._conn.execute("DELETE FROM dedup WHERE ts < ?", (ahora - self.ventana_s,))
+            return False
+
+    def confirmar(self, evento: Dict[str, Any]) -> None:
+        """El evento reclamado con es_duplicado() se procesó bien: queda "hecho"."""
+        clave = self._texto(clave_evento(evento))
+        ahora = time.time()
+        with self._lock:
+            self._abrir()
+            self._conn.execute("UPDATE dedup SET estado = 'hecho', ts = ?, dueno = NULL WHERE clave = ?",
+                               (ahora, clave))
+            self._recordar(clave, ahora)
+
+    def _recordar(self, clave: str, ts: float) -> None:
+        self._vistos[clave] = ts
+        self._vistos.move_to_end(clave)
+        while len(self._vistos) > self.max_entradas:
+            self._vistos.popitem(last=False)
+
+    def olvidar(self, evento: Dict[str, Any]) -> None:
+        """Suelta el reclamo de un evento cuyo procesamiento falló (lo "hecho" no se toca)."""
+        clave = self._texto(clave_evento(evento))
+        with self._lock:
+            self._abrir()
+            self._conn.execute("DELETE FROM dedup WHERE clave = ? AND estado = 'en_curso'", (clave,))
+
+    def stats(self, plataformas_por_evento: int = 2) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "entradas": len(self._vistos),
+            # cada duplicado evitado ahorra el delist en las otras plataformas
+            "delists_evitados": self.hits * plataformas_por_evento,
+        }
+
+
+_INDICE: Optional[IndiceDedup] = None
+
+
+def obtener_indice() -> IndiceDedup:
+    global _INDICE
+    if _INDICE is None:
+        _INDICE = IndiceDedup()
+    return _INDICE
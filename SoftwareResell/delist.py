@@ -0,0 +1,235 @@
+import asyncio
+import os
+import random
+from collections import deque
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional
+
+from logger import obtener_registro
+from metricas import observar
+
+# Orquestador único de delist (eBay EndItem, Depop, Poshmark).
+#
+# - las plataformas corren en paralelo y cada una tiene su propio semáforo:
+#   un Poshmark lento no frena el EndItem de eBay
+# - reintentos con backoff exponencial + jitter dentro de un presupuesto de
+#   tiempo por plataforma (deadline); pasado el deadline se corta
+# - cada plataforma devuelve un ResultadoDelist (nunca lanza) y se registra
+#   como línea DELIST en logs/acciones.log
+# - latencias p50/p99 por plataforma en stats(), y delist_segundos /
+#   delist_total{plataforma, resultado} en /metrics (incluye Depop/Poshmark,
+#   que van por el pool de navegador y no pasan por ningún @cronometrar)
+
+ROOT = Path(__file__).resolve().parent
+ACCIONES_LOG = ROOT / "logs" / "acciones.log"
+
+PLATAFORMAS = ("ebay", "depop", "poshmark")
+
+# concurrencia: eBay es HTTP; Depop/Poshmark usan las páginas del pool de navegador
+LIMITES: Dict[str, Dict[str, float]] = {
+    "ebay": {"concurrencia": 4, "deadline_s": 30, "intentos": 4},
+    "depop": {"concurrencia": int(os.environ.get("PLAYWRIGHT_PAGES", "2")), "deadline_s": 120, "intentos": 3},
+    "poshmark": {"concurrencia": int(os.environ.get("PLAYWRIGHT_PAGES", "2")), "deadline_s": 120, "intentos": 3},
+}
+BACKOFF_BASE_S = 0.5
+BACKOFF_MAX_S = 10.0
+EBAY_PLAZO_S = 10.0 # un EndItem (reintentos HTTP incluidos) termina bien antes del deadline de eBay
+MUESTRAS = 1000 # latencias guardadas por plataforma
+
+Accion = Callable[[str], Awaitable[Any]]
+
+
+class ErrorDefinitivo(Exception):
+    """Error que no tiene sentido reintentar (falta token, item inexistente, ...)."""
+
+
+class DelistIncompleto(Exception):
+    """Alguna plataforma no se pudo delistar. `pendientes` son las que faltan."""
+
+    def __init__(self, sku: str, resultados: List["ResultadoDelist"]):
+        self.sku = sku
+        self.pendientes = [r.plataforma for r in resultados if not r.ok]
+        # payload con el que reencolar el evento (lo completa Cerebro_v2)
+        self.payload_reintento: Optional[Dict[str, Any]] = None
+        detalle = "; ".join(f"{r.plataforma}: {r.error}" for r in resultados if not r.ok)
+        super().__init__(f"Delist incompleto de {sku} ({detalle})")
+
+
+@dataclass
+class ResultadoDelist:
+    plataforma: str
+    sku: str
+    ok: bool
+    intentos: int
+    ms: float
+    error: str = ""
+
+
+def _percentil(muestras, p: float) -> float:
+    if not muestras:
+        return 0.0
+    orden = sorted(muestras)
+    k = min(len(orden) - 1, int(round(p / 100 * (len(orden) - 1))))
+    return round(orden[k], 2)
+
+
+# ----------------------------
+# Acciones por defecto
+# ----------------------------
+
+def accion_ebay(token: Optional[str] = None, plazo_s: float = EBAY_PLAZO_S) -> Accion:
+    # EndItem en vuelo por item: wait_for no puede cortar el hilo, así que un
+    # reintento tras un timeout espera al EndItem anterior en vez de mandar otro
+    en_curso: Dict[str, asyncio.Future] = {}
+
+    async def _end_item(item_id: str) -> None:
+        from resell import end_item_ebay, load_ebay_cfg # import diferido: resell importa este módulo
+        previo = en_curso.get(item_id)
+        if previo is not None:
+            if not previo.done():
+                await asyncio.shield(previo)
+                en_curso.pop(item_id, None)
+                return
+            en_curso.pop(item_id, None)
+            if not previo.cancelled() and previo.exception() is None:
+                return # terminó bien después del timeout
+        tok = token
+        if tok is None:
+            try:
+                tok = str(load_ebay_cfg().get("token", "")).strip()
+            except (FileNotFoundError, ValueError) as e:
+                raise ErrorDefinitivo(str(e))
+        if not tok:
+            raise ErrorDefinitivo("Falta token en ebay.yaml")
+        # requests es bloqueante: va a un hilo para no frenar el event loop.
+        # plazo_s acota el hilo (timeout HTTP + reintentos) por debajo del deadline
+        hilo = en_curso[item_id] = asyncio.ensure_future(asyncio.to_thread(end_item_ebay, item_id, tok, plazo_s=plazo_s))
+        try:
+            await asyncio.shield(hilo)
+        except asyncio.CancelledError:
+            raise # timeout: sigue en en_curso para el próximo intento
+        except BaseException:
+            en_curso.pop(item_id, None)
+            raise
+        en_curso.pop(item_id, None)
+    return _end_item
+
+
+def accion_navegador(plataforma: str) -> Accion:
+    async def _borrar(sku: str) -> None:
+        from pool_navegador import obtener_pool
+        await obtener_pool(plataforma).ejecutar(sku)
+    return _borrar
+
+
+# ----------------------------
+# Orquestador
+# ----------------------------
+
+class OrquestadorDelist:
+    def __init__(self, acciones: Optional[Dict[str, Accion]] = None,
+                 limites: Optional[Dict[str, Dict[str, float]]] = None, log_path: Optional[Path] = ACCIONES_LOG):
+        self.acciones: Dict[str, Accion] = acciones or {
+            "ebay": accion_ebay(),
+            "depop": accion_navegador("depop"),
+            "poshmark": accion_navegador("poshmark"),
+        }
+        self.limites = {p: dict(v) for p, v in (limites or LIMITES).items()}
+        self.log_path = log_path
+        self._sems: Dict[str, asyncio.Semaphore] = {}
+        self._lat: Dict[str, Deque[float]] = {p: deque(maxlen=MUESTRAS) for p in self.acciones}
+        self._cont: Dict[str, Dict[str, int]] = {p: {"ok": 0, "fail": 0, "retries": 0} for p in self.acciones}
+
+    def _sem(self, plataforma: str) -> asyncio.Semaphore:
+        sem = self._sems.get(plataforma)
+        if sem is None:
+            sem = self._sems[plataforma] = asyncio.Semaphore(int(self.limites[plataforma]["concurrencia"]))
+        return sem
+
+    async def _una(self, plataforma: str, sku: str) -> ResultadoDelist:
+        lim = self.limites[plataforma]
+        accion = self.acciones[plataforma]
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        deadline = t0 + lim["deadline_s"]
+        intentos = 0
+        error = ""
+
+        async def _con_semaforo() -> None:
+            async with self._sem(plataforma):
+                await accion(sku)
+
+        while intentos < lim["intentos"]:
+            restante = deadline - loop.time()
+            if restante <= 0:
+                error = error or "deadline agotado"
+                break
+            intentos += 1
+            try:
+                await asyncio.wait_for(_con_semaforo(), timeout=restante)
+                error = ""
+                break
+            except ErrorDefinitivo as e:
+                error = str(e)
+                break
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError) and loop.time() >= deadline:
+                    error = f"timeout ({lim['deadline_s']:.0f}s)"
+                    break
+                error = " ".join(str(e).split()) or type(e).__name__
+                if intentos >= lim["intentos"]:
+                    break
+                espera = min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2 ** (intentos - 1))
+                espera = min(espera * random.uniform(0.5, 1.0), max(0.0, deadline - loop.time()))
+                self._cont[plataforma]["retries"] += 1
+                await asyncio.sleep(espera)
+
+        ms = (loop.time() - t0) * 1000
+        res = ResultadoDelist(plataforma, sku, ok=not error, intentos=intentos, ms=round(ms, 1), error=error)
+        self._lat[plataforma].append(ms)
+        self._cont[plataforma]["ok" if res.ok else "fail"] += 1
+        observar("delist", ms / 1000, {"plataforma": plataforma}, resultado="ok" if res.ok else "error")
+        if self.log_path is not None:
+            linea = f"DELIST | item_id={sku} | platform={plataforma} | ok={int(res.ok)} | intentos={intentos} | ms={ms:.0f}"
+            if error:
+                linea += f" | error={error.replace('|', '/')}"
+            obtener_registro(self.log_path).escribir(linea, {"evento": "DELIST", **asdict(res)})
+        return res
+
+    async def delist(self, sku: str, plataformas: Iterable[str]) -> List[ResultadoDelist]:
+        """Delista `sku` en todas las `plataformas` a la vez. Devuelve un resultado por plataforma."""
+        plataformas = [p for p in plataformas if p in self.acciones]
+        return list(await asyncio.gather(*(self._una(p, sku) for p in plataformas)))
+
+    async def delist_venta(self, sku: str, vendido_en: str) -> List[ResultadoDelist]:
+        """Delista en todas las plataformas menos donde se vendió."""
+        return await self.delist(sku, [p for p in PLATAFORMAS if p != vendido_en.lower()])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            p: {
+                **self._cont[p],
+                "p50_ms": _percentil(self._lat[p], 50),
+                "p99_ms": _percentil(self._lat[p], 99),
+            }
+            for p in self.acciones
+        }
+
+
+_ORQUESTADOR: Optional[OrquestadorDelist] = None
+
+
+def obtener_orquestador() -> OrquestadorDelist:
+    global _ORQUESTADOR
+    if _ORQUESTADOR is None:
+        _ORQUESTADOR = OrquestadorDelist()
+    return _ORQUESTADOR
+
+
+def imprimir_resultados(resultados: List[ResultadoDelist]) -> None:
+    for r in resultados:
+        if r.ok:
+            print(f"✅ Delist {r.plataforma}: OK ({r.ms:.0f} ms, {r.intentos} intento/s)")
+        else:
+            print(f"❌ Delist {r.plataforma}: {r.error} ({r.ms:.0f} ms, {r.intentos} intento/s)")
@@ -0,0 +1,264 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Store de drafts indexado por (item_id, plataforma, versión).
+#
+# Reemplaza los draft_<plataforma>_<id>_<stamp>.txt + ebay_<id>.json sueltos
+# en drafts/:
+# - los textos se guardan una sola vez por contenido (sha256, comprimidos)
+# - si el draft nuevo es idéntico al último, no se crea versión
+# - solo se guardan las últimas KEEP_VERSIONS versiones por item/plataforma
+# - "último draft del item X" es una búsqueda por índice, sin listar carpetas
+# - export en bloque a archivos cuando hace falta copiarlos a mano
+#
+# Los archivos viejos de drafts/ se importan solos la primera vez.
+
+ROOT = Path(__file__).resolve().parent
+DRAFTS_DIR = ROOT / "drafts"
+DB_PATH = DRAFTS_DIR / "drafts.db"
+KEEP_VERSIONS = 5
+
+_LEGACY_TXT = re.compile(r"^draft_(depop|posh)_(\d+)_(\d{8}_\d{6})\.txt$")
+_LEGACY_JSON = re.compile(r"^ebay_(\d+)\.json$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bodies (
+    hash TEXT PRIMARY KEY,
+    body BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS versions (
+    item_id    TEXT NOT NULL,
+    platform   TEXT NOT NULL,
+    version    INTEGER NOT NULL,
+    hash       TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (item_id, platform, version)
+);
+CREATE INDEX IF NOT EXISTS idx_versions_hash ON versions(hash);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class DraftStore:
+    def __init__(self, path: Path = DB_PATH, keep: int = KEEP_VERSIONS, legacy_dir: Optional[Path] = DRAFTS_DIR):
+        self.path = Path(path)
+        self.keep = keep
+        self.legacy_dir = legacy_dir
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._ready = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            if not self._ready:
+                with self._init_lock:
+                    if not self._ready:
+                        conn.executescript(_SCHEMA)
+                        # listo recién después de importar: si falla, el próximo _conn lo reintenta
+                        try:
+                            self._import_legacy(conn)
+                        except Exception:
+                            conn.close()
+                            raise
+                        self._ready = True
+            self._local.conn = conn
+        return conn
+
+    # ----------------------------
+    # Escritura
+    # ----------------------------
+
+    def _save(self, conn: sqlite3.Connection, item_id: str, platform: str, body: str,
+              created_at: Optional[str] = None) -> Tuple[int, bool]:
+        data = body.encode("utf-8")
+        h = hashlib.sha256(data).hexdigest()
+        last = conn.execute(
+            "SELECT version, hash FROM versions WHERE item_id = ? AND platform = ? ORDER BY version DESC LIMIT 1",
+            (item_id, platform),
+        ).fetchone()
+        if last and last[1] == h:
+            return last[0], False
+
+        version = (last[0] + 1) if last else 1
+        conn.execute("INSERT OR IGNORE INTO bodies (hash, body) VALUES (?, ?)", (h, zlib.compress(data)))
+        conn.execute(
+            "INSERT INTO versions (item_id, platform, version, hash, created_at) VALUES (?, ?, ?, ?, ?)",
+            (item_id, platform, version, h, created_at or datetime.now().isoformat()),
+        )
+
+        # recorta versiones viejas y borra textos que ya nadie usa
+        viejas = conn.execute(
+            "SELECT version, hash FROM versions WHERE item_id = ? AND platform = ? AND version <= ?",
+            (item_id, platform, version - self.keep),
+        ).fetchall()
+        for v, vh in viejas:
+            conn.execute("DELETE FROM versions WHERE item_id = ? AND platform = ? AND version = ?",
+                         (item_id, platform, v))
+            if not conn.execute("SELECT 1 FROM versions WHERE hash = ? LIMIT 1", (vh,)).fetchone():
+                conn.execute("DELETE FROM bodies WHERE hash = ?", (vh,))
+        return version, True
+
+    def save(self, item_id: str, platform: str, body: str) -> Tuple[int, bool]:
+        """Guarda un draft. Devuelve (versión, True si es nueva)."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            out = self._save(conn, str(item_id), platform, body)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return out
+
+    def save_many(self, rows: Iterable[Tuple[str, str, str]]) -> int:
+        """Guarda muchos (item_id, platform, body) en una sola transacción."""
+        conn = self._conn()
+        n = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for item_id, platform, body in rows:
+                _, nueva = self._save(conn, str(item_id), platform, body)
+                n += nueva
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return n
+
+    # ----------------------------
+    # Lectura
+    # ----------------------------
+
+    def latest(self, item_id: str, platform: str) -> Optional[str]:
+        row = self._conn().execute(
+            """
+            SELECT b.body FROM versions v JOIN bodies b ON b.hash = v.hash
+            WHERE v.item_id = ? AND v.platform = ? ORDER BY v.version DESC LIMIT 1
+            """,
+            (str(item_id), platform),
+        ).fetchone()
+        return zlib.decompress(row[0]).decode("utf-8") if row else None
+
+    def versions(self, item_id: str, platform: str) -> List[Dict[str, Any]]:
+        rows = self._conn().execute(
+            "SELECT version, hash, created_at FROM versions WHERE item_id = ? AND platform = ? ORDER BY version DESC",
+            (str(item_id), platform),
+        )
+        return [{"version": v, "hash": h, "created_at": c} for v, h, c in rows]
+
+    def items(self) -> List[str]:
+        return [r[0] for r in self._conn().execute("SELECT DISTINCT item_id FROM versions ORDER BY item_id")]
+
+    def export(self, dest: Path, item_ids: Optional[Iterable[str]] = None,
+               platforms: Optional[Iterable[str]] = None) -> int:
+        """Escribe el último draft de cada item/plataforma en dest/. Devuelve cuántos."""
+        dest = Path(dest)
+        dest.mkdir(parents=True, exist_ok=True)
+        sql = """
+            SELECT v.item_id, v.platform, b.body FROM versions v
+            JOIN (SELECT item_id, platform, MAX(version) AS version FROM versions GROUP BY item_id, platform) m
+              ON m.item_id = v.item_id AND m.platform = v.platform AND m.version = v.version
+            JOIN bodies b ON b.hash = v.hash
+        """
+        wanted_items = set(map(str, item_ids)) if item_ids else None
+        wanted_plats = set(platforms) if platforms else None
+        n = 0
+        for item_id, platform, body in self._conn().execute(sql):
+            if wanted_items is not None and item_id not in wanted_items:
+                continue
+            if wanted_plats is not None and platform not in wanted_plats:
+                continue
+            ext = "json" if platform == "ebay" else "txt"
+            name = f"ebay_{item_id}.json" if platform == "ebay" else f"draft_{platform}_{item_id}.{ext}"
+            (dest / name).write_bytes(zlib.decompress(body))
+            n += 1
+        return n
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._conn()
+        versions, items = conn.execute("SELECT COUNT(*), COUNT(DISTINCT item_id) FROM versions").fetchone()
+        bodies, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM bodies").fetchone()
+        return {"items": items, "versions": versions, "bodies": bodies, "bytes": size}
+
+    # ----------------------------
+    # Migración de drafts/ plano
+    # ----------------------------
+
+    def _import_legacy(self, conn: sqlite3.Connection) -> None:
+        if not self.legacy_dir or not Path(self.legacy_dir).exists():
+            return
+        if conn.execute("SELECT value FROM meta WHERE key = 'imported_legacy'").fetchone():
+            return
+        found = []
+        for p in Path(self.legacy_dir).iterdir():
+            m = _LEGACY_TXT.match(p.name)
+            if m:
+                platform, item_id, stamp = m.groups()
+                found.append((stamp, item_id, platform, p))
+                continue
+            m = _LEGACY_JSON.match(p.name)
+            if m:
+                stamp = datetime.fromtimestamp(p.stat().st_mtime).strftime("%Y%m%d_%H%M%S")
+                found.append((stamp, m.group(1), "ebay", p))
+        found.sort()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for stamp, item_id, platform, p in found:
+                created = datetime.strptime(stamp, "%Y%m%d_%H%M%S").isoformat()
+                self._save(conn, item_id, platform, p.read_text(encoding="utf-8"), created)
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('imported_legacy', ?)",
+                         (datetime.now().isoformat(),))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if found:
+            print(f"📦 Importados {len(found)} archivos de {Path(self.legacy_dir).name}/ → {self.path.name}")
+
+
+def ebay_json(item: Dict[str, Any]) -> str:
+    """
+    Cuerpo de la versión "ebay" (debug) de un item. Un solo formato para los
+    items de resell.py (specifics/pictures) y de generar_drafts/crosslist.py
+    (itemSpecifics/photos): si cada uno guardara el suyo, correr ambos
+    comandos sobre el mismo item crearía versiones nuevas sin que nada cambie.
+    """
+    specs = item.get("specifics") or item.get("itemSpecifics") or {}
+    return json.dumps({
+        "item_id": item.get("item_id", ""),
+        "title": item.get("title", ""),
+        "price": item.get("price", ""),
+        "currency": item.get("currency", ""),
+        "category_id": item.get("category_id", ""),
+        "category_name": item.get("category_name", ""),
+        "condition": item.get("condition", ""),
+        "pictures": list(item.get("pictures") or item.get("photos") or []),
+        "specifics": {" ".join(str(k).split()): " ".join(str(v).split()) for k, v in specs.items()},
+        "description_html": item.get("description_html", ""),
+    }, ensure_ascii=False, indent=2)
+
+
+_STORE: Optional[DraftStore] = None
+
+
+def obtener_store() -> DraftStore:
+    global _STORE
+    if _STORE is None:
+        _STORE = DraftStore()
+    return _STORE
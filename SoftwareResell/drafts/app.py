@@ -1,14 +1,11 @@
-from http.server import BaseHTTPRequestHandler, HTTPServer
-import os
+# Atajo al servicio web único (../app.py, servidor en ../servidor_http.py):
+# mismo puerto (PORT, 10000 por defecto) y GET / y /health responden 200.
+import sys
+from pathlib import Path
 
-class Handler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        self.send_response(200)
-        self.send_header("Content-type", "text/plain")
-        self.end_headers()
-        self.wfile.write(b"Software Resell is running")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import main
 
 if __name__ == "__main__":
-    port = int(os.environ.get("PORT", 10000))
-    server = HTTPServer(("0.0.0.0", port), Handler)
-    server.serve_forever()
\ No newline at end of file
+    main()
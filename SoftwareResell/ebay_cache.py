@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+# Caché en disco de respuestas GetItem ya parseadas (ebay_xml.parse_trading_response),
+# compartida por resell.py y generar_drafts.py.
+#
+# - direccionada por contenido: cada resultado se guarda como
+#   objects/<sha256[:2]>/<sha256>.json; si eBay devuelve lo mismo, no se
+#   escribe nada nuevo (solo se renueva fetched_at)
+# - índice SQLite item_id -> hash, fetched_at, last_access, size
+# - TTL: pasado CACHE_TTL_S se vuelve a pedir a eBay; si eBay no responde
+#   (red, throttling, 5xx) se usa la copia vieja (con aviso). Un refresh
+#   explícito, un Ack=Failure o la cuota agotada se propagan tal cual
+# - LRU por tamaño: si el total supera CACHE_MAX_BYTES se borran los items
+#   menos usados
+# - contadores de hits/misses persistidos para ver la tasa de aciertos
+
+ROOT = Path(__file__).resolve().parent
+CACHE_DIR = ROOT / "cache" / "getitem"
+CACHE_TTL_S = float(os.environ.get("CACHE_TTL_S", str(24 * 3600)))
+CACHE_MAX_BYTES = int(os.environ.get("CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    item_id     TEXT PRIMARY KEY,
+    hash        TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    fetched_at  REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_access ON entries(last_access);
+CREATE TABLE IF NOT EXISTS stats (
+    key   TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class OfflineMiss(LookupError):
+    """El item no está en caché y estamos en modo offline."""
+
+
+def _es_transitorio(e: BaseException) -> bool:
+    # ebay_cliente.ErrorEbay(transitorio=True) sin importar el cliente (trae requests)
+    return bool(getattr(e, "transitorio", False)) or isinstance(e, (ConnectionError, TimeoutError))
+
+
+class GetItemCache:
+    def __init__(self, root: Path = CACHE_DIR, ttl_s: float = CACHE_TTL_S, max_bytes: int = CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.root / "index.db"), timeout=30,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _obj_path(self, h: str) -> Path:
+        return self.root / "objects" / h[:2] / f"{h}.json"
+
+    def _bump(self, key: str, n: int = 1) -> None:
+        self._db().execute(
+            "INSERT INTO stats (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = value + ?",
+            (key, n, n),
+        )
+
+    # ----------------------------
+    # Lectura / escritura
+    # ----------------------------
+
+    def get(self, item_id: str, allow_stale: bool = False) -> Optional[Dict[str, Any]]:
+        """Devuelve el resultado parseado o None si no hay (o está vencido)."""
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT hash, fetched_at FROM entries WHERE item_id = ?", (item_id,)).fetchone()
+            if row is None:
+                return None
+            h, fetched_at = row
+            if not allow_stale and time.time() - fetched_at > self.ttl_s:
+                return None
+            p = self._obj_path(h)
+            if not p.exists():
+                db.execute("DELETE FROM entries WHERE item_id = ?", (item_id,))
+                return None
+            db.execute("UPDATE entries SET last_access = ? WHERE item_id = ?", (time.time(), item_id))
+        with open(p, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def put(self, item_id: str, parsed: Dict[str, Any]) -> str:
+        data = json.dumps(parsed, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        h = hashlib.sha256(data).hexdigest()
+        p = self._obj_path(h)
+        if not p.exists():
+            p.parent.mkdir(parents=True, exist_ok=True)
+            # nombre propio por proceso/hilo: dos escritores del mismo objeto no se pisan
+            tmp = p.with_name(f"{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, p)
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                """
+                INSERT INTO entries (item_id, hash, size, fetched_at, last_access) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(item_id) DO UPDATE SET
+                    hash = excluded.hash, size = excluded.size,
+                    fetched_at = excluded.fetched_at, last_access = excluded.last_access
+                """,
+                (item_id, h, len(data), now, now),
+            )
+            self._evict()
+        return h
+
+    def invalidate(self, item_id: str) -> None:
+        """Marca el item como vencido (lo pide de nuevo la próxima vez)."""
+        with self._lock:
+            self._db().execute("UPDATE entries SET fetched_at = 0 WHERE item_id = ?", (item_id,))
+
+    def _evict(self) -> None:
+        db = self._db()
+        # tamaño total de objetos distintos
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT hash, size FROM entries)").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for item_id, h in db.execute("SELECT item_id, hash FROM entries ORDER BY last_access ASC").fetchall():
+            db.execute("DELETE FROM entries WHERE item_id = ?", (item_id,))
+            if not db.execute("SELECT 1 FROM entries WHERE hash = ? LIMIT 1", (h,)).fetchone():
+                p = self._obj_path(h)
+                if p.exists():
+                    total -= p.stat().st_size
+                    p.unlink()
+            self._bump("evictions")
+            if total <= self.max_bytes:
+                break
+
+    # ----------------------------
+    # Uso principal
+    # ----------------------------
+
+    def fetch(self, item_id: str, fetcher: Callable[[], Dict[str, Any]],
+              refresh: bool = False, offline: bool = False) -> Dict[str, Any]:
+        """
+        Devuelve el GetItem parseado de `item_id`, usando la caché si está fresca.
+        - refresh=True: ignora la caché y vuelve a pedir a eBay
+        - offline=True: nunca llama a eBay (acepta copias vencidas)
+        """
+        if offline:
+            cached = self.get(item_id, allow_stale=True)
+            with self._lock:
+                self._bump("hits" if cached is not None else "misses")
+            if cached is None:
+                raise OfflineMiss(f"ItemID {item_id} no está en la caché (modo offline).")
+            return cached
+
+        if not refresh:
+            cached = self.get(item_id)
+            if cached is not None:
+                with self._lock:
+                    self._bump("hits")
+                return cached
+
+        try:
+            parsed = fetcher()
+        except Exception as e:
+            if refresh or not _es_transitorio(e):
+                raise
+            stale = self.get(item_id, allow_stale=True)
+            if stale is None:
+                raise
+            print(f"⚠️ eBay falló para {item_id}; uso la copia en caché (vencida).")
+            with self._lock:
+                self._bump("stale_hits")
+            return stale
+
+        with self._lock:
+            self._bump("refreshes" if refresh else "misses")
+        self.put(item_id, parsed)
+        return parsed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            db = self._db()
+            s = dict(db.execute("SELECT key, value FROM stats").fetchall())
+            entries, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        hits, misses = s.get("hits", 0), s.get("misses", 0)
+        return {
+            "entries": entries,
+            "bytes": size,
+            "hits": hits,
+            "misses": misses,
+            "stale_hits": s.get("stale_hits", 0),
+            "refreshes": s.get("refreshes", 0),
+            "evictions": s.get("evictions", 0),
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        }
+
+
+_CACHE: Optional[GetItemCache] = None
+
+
+def obtener_cache() -> GetItemCache:
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = GetItemCache()
+    return _CACHE
@@ -0,0 +1,362 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ebay_xml import ack_rapido
+from metricas import observar
+
+# Cliente único de la Trading API (resell, generar_drafts, crosslist, sync, delist).
+#
+# - una Session keep-alive para todo el proceso (también la usa fotos.py)
+# - cubo de tokens en memoria: EBAY_RPS llamadas/s con ráfagas de
+#   EBAY_RAFAGA. Con throttling baja solo a la mitad y vuelve de a poco
+#   (AIMD) cuando las llamadas salen bien
+# - cuota persistida en inventory/ebay_cuota.db (SQLite, compartida entre
+#   procesos): llamadas por día (UTC) y por hora. Las llamadas masivas
+#   (GetItem, GetSellerList, ...) dejan libre el último RESERVA_PRIORIDAD de
+#   cada ventana para los EndItem/EndItems que dispara una venta
+# - prioridad: EndItem/EndItems pasan primero en el cubo de tokens aunque
+#   haya un crosslist en lote esperando
+# - throttling (HTTP 429, ErrorCode 518), 5xx, errores internos de eBay
+#   (10007) y cortes de red se reintentan con backoff exponencial con
+#   jitter (o lo que diga Retry-After)
+# - los errores son ErrorEbay (RuntimeError) con call, ack, código y status;
+#   CuotaAgotada avisa sin llamar a eBay cuándo se libera la ventana, para que
+#   un lote corte en vez de gastar el resto de la corrida
+
+ROOT = Path(__file__).resolve().parent
+CUOTA_DB = ROOT / "inventory" / "ebay_cuota.db"
+
+# Trading API (EBAY_TRADING_URL permite apuntar a un stub local)
+EBAY_TRADING_URL = os.environ.get("EBAY_TRADING_URL", "https://api.ebay.com/ws/api.dll")
+
+RPS = float(os.environ.get("EBAY_RPS", "4")) # 0 = sin límite en el proceso
+RAFAGA = int(os.environ.get("EBAY_RAFAGA", "8"))
+RPS_MIN = 0.2 # piso del AIMD
+CUOTA_DIA = int(os.environ.get("EBAY_CUOTA_DIA", "5000")) # 0 = sin límite
+CUOTA_HORA = int(os.environ.get("EBAY_CUOTA_HORA", "0"))
+RESERVA_PRIORIDAD = 0.10 # parte de cada ventana que solo pueden usar las llamadas prioritarias
+
+HTTP_POOL_SIZE = 16 # conexiones keep-alive reutilizadas hacia api.ebay.com
+TIMEOUT_S = 30
+MAX_INTENTOS = 5
+BACKOFF_BASE_S = 0.5
+BACKOFF_MAX_S = 30.0
+
+PRIORITARIAS = frozenset({"EndItem", "EndItems", "EndFixedPriceItem"})
+CODIGOS_THROTTLING = frozenset({"518"}) # "Call usage limit has been reached"
+CODIGOS_TRANSITORIOS = frozenset({"10007"}) # "Internal error to the application"
+
+
+class ErrorEbay(RuntimeError):
+    def __init__(self, mensaje: str, call: str = "", ack: str = "", codigo: str = "", status: int = 0,
+                 transitorio: bool = False):
+        super().__init__(mensaje)
+        self.call = call
+        self.ack = ack
+        self.codigo = codigo
+        self.status = status
+        # red, throttling o 5xx que siguieron después de los reintentos: vale
+        # usar una copia vieja (ebay_cache); un 4xx o CuotaAgotada no
+        self.transitorio = transitorio
+
+
+class EbayThrottling(ErrorEbay):
+    """eBay siguió frenando después de todos los reintentos."""
+
+
+class CuotaAgotada(ErrorEbay):
+    def __init__(self, mensaje: str, call: str = "", libre_en_s: float = 0.0):
+        super().__init__(mensaje, call=call)
+        self.libre_en_s = libre_en_s
+
+
+# ----------------------------
+# Session compartida
+# ----------------------------
+
+_SESSION = None # requests.Session
+_SESSION_LOCK = threading.Lock()
+
+
+def obtener_session():
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                _SESSION = s
+    return _SESSION
+
+
+# ----------------------------
+# Cubo de tokens (en memoria, por proceso)
+# ----------------------------
+
+class CuboTokens:
+    def __init__(self, rps: float = RPS, rafaga: int = RAFAGA):
+        self.rps_max = rps
+        self.rps = rps
+        self.capacidad = max(1, rafaga)
+        self.tokens = float(self.capacidad)
+        self._t = time.monotonic()
+        self._cond = threading.Condition()
+        self._prioritarias = 0 # prioritarias esperando: las masivas les ceden el turno
+
+    def ajustar(self, rps: float) -> None:
+        with self._cond:
+            self.rps_max = self.rps = rps
+            self._cond.notify_all()
+
+    def _rellenar(self) -> None:
+        ahora = time.monotonic()
+        self.tokens = min(self.capacidad, self.tokens + (ahora - self._t) * self.rps)
+        self._t = ahora
+
+    def tomar(self, prioritaria: bool = False) -> float:
+        """Bloquea hasta tener un token. Devuelve cuánto esperó."""
+        if not self.rps_max:
+            return 0.0
+        t0 = time.monotonic()
+        with self._cond:
+            if prioritaria:
+                self._prioritarias += 1
+            try:
+                while True:
+                    self._rellenar()
+                    if self.tokens >= 1 and (prioritaria or not self._prioritarias):
+                        self.tokens -= 1
+                        return time.monotonic() - t0
+                    falta = (1 - self.tokens) / self.rps if self.tokens < 1 else 0.01
+                    self._cond.wait(max(0.001, falta))
+            finally:
+                if prioritaria:
+                    self._prioritarias -= 1
+                    self._cond.notify_all()
+
+    def frenar(self) -> None:
+        """Throttling: la mitad de velocidad y sin ráfaga acumulada."""
+        with self._cond:
+            if self.rps_max:
+                self.rps = max(RPS_MIN, self.rps / 2)
+                self.tokens = min(self.tokens, 0.0)
+
+    def exito(self) -> None:
+        if self.rps < self.rps_max:
+            with self._cond:
+                self.rps = min(self.rps_max, self.rps + self.rps_max * 0.05)
+
+
+# ----------------------------
+# Cuota persistida (entre procesos)
+# ----------------------------
+
+_NOMBRES = {"dia": "diaria", "hora": "por hora"}
+
+_CUOTA_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cuota (
+    ventana TEXT PRIMARY KEY,  -- dia:2026-01-31 | hora:2026-01-31T13
+    usadas  INTEGER NOT NULL
+);
+"""
+
+
+class CuotaEbay:
+    def __init__(self, path: Path = CUOTA_DB, por_dia: int = CUOTA_DIA, por_hora: int = CUOTA_HORA,
+                 reserva: float = RESERVA_PRIORIDAD):
+        self.path = Path(path)
+        self.limites = {"dia": por_dia, "hora": por_hora}
+        self.reserva = reserva
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._ready = False
+        self._podado = ""
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            # dos procesos abriendo la base nueva a la vez: el cambio a WAL no
+            # espera con busy_timeout, falla con "database is locked" al toque
+            for intento in range(50):
+                try:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    break
+                except sqlite3.OperationalError:
+                    if intento == 49:
+                        raise
+                    time.sleep(0.05)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+            if not self._ready:
+                with self._init_lock:
+                    if not self._ready:
+                        conn.executescript(_CUOTA_SCHEMA)
+                        self._ready = True
+        return conn
+
+    @staticmethod
+    def _ventanas(ahora: datetime) -> Dict[str, tuple]:
+        # ventana -> (clave, segundos hasta que se libera)
+        dia = ahora.replace(hour=0, minute=0, second=0, microsecond=0)
+        hora = ahora.replace(minute=0, second=0, microsecond=0)
+        return {
+            "dia": (f"dia:{dia:%Y-%m-%d}", (dia + timedelta(days=1) - ahora).total_seconds()),
+            "hora": (f"hora:{hora:%Y-%m-%dT%H}", (hora + timedelta(hours=1) - ahora).total_seconds()),
+        }
+
+    def reservar(self, prioritaria: bool = False, call: str = "") -> None:
+        """Cuenta una llamada. CuotaAgotada (sin contar nada) si la ventana está llena."""
+        activas = {k: v for k, v in self.limites.items() if v > 0}
+        if not activas:
+            return
+        ventanas = self._ventanas(datetime.now(timezone.utc))
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for nombre, limite in activas.items():
+                clave, libre_en = ventanas[nombre]
+                fila = conn.execute("SELECT usadas FROM cuota WHERE ventana = ?", (clave,)).fetchone()
+                usadas = fila[0] if fila else 0
+                tope = limite if prioritaria else int(limite * (1 - self.reserva))
+                if usadas >= tope:
+                    conn.execute("ROLLBACK")
+                    raise CuotaAgotada(
+                        f"Cuota {_NOMBRES[nombre]} de la Trading API agotada para {call or 'llamadas'} "
+                        f"({usadas}/{limite}{'' if prioritaria else ', reserva para EndItem'}); "
+                        f"se libera en {libre_en / 60:.0f} min", call=call, libre_en_s=libre_en)
+            for nombre in activas:
+                conn.execute("INSERT INTO cuota (ventana, usadas) VALUES (?, 1) "
+                             "ON CONFLICT(ventana) DO UPDATE SET usadas = usadas + 1", (ventanas[nombre][0],))
+            if self._podado != ventanas["dia"][0]:
+                # ventanas de días anteriores ya no sirven
+                conn.execute("DELETE FROM cuota WHERE substr(ventana, instr(ventana, ':') + 1, 10) < ?",
+                             (ventanas["dia"][0][4:],))
+                self._podado = ventanas["dia"][0]
+            conn.execute("COMMIT")
+        except CuotaAgotada:
+            raise
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        ventanas = self._ventanas(datetime.now(timezone.utc))
+        out: Dict[str, Any] = {}
+        for nombre, (clave, libre_en) in ventanas.items():
+            fila = self._conn().execute("SELECT usadas FROM cuota WHERE ventana = ?", (clave,)).fetchone()
+            out[nombre] = {"usadas": fila[0] if fila else 0, "limite": self.limites[nombre],
+                           "libre_en_s": round(libre_en)}
+        return out
+
+
+# ----------------------------
+# Cliente
+# ----------------------------
+
+class ClienteTrading:
+    def __init__(self, url: str = EBAY_TRADING_URL, cubo: Optional[CuboTokens] = None,
+                 cuota: Optional[CuotaEbay] = None, max_intentos: int = MAX_INTENTOS):
+        self.url = url
+        self.cubo = cubo or CuboTokens()
+        self.cuota = cuota or CuotaEbay()
+        self.max_intentos = max_intentos
+        self.rand = random.Random()
+
+    def _espera(self, intento: int, retry_after: str = "") -> float:
+        if retry_after.strip().isdigit():
+            return min(BACKOFF_MAX_S, float(retry_after))
+        # full jitter: entre 0 y el tope exponencial, para que los hilos no reintenten juntos
+        return self.rand.uniform(0, min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2 ** (intento - 1)))
+
+    def llamar(self, call_name: str, xml_body: str, url: str = "", siteid: str = "0",
+               compat_level: str = "967", timeout: float = TIMEOUT_S, prioritaria: Optional[bool] = None,
+               plazo_s: Optional[float] = None) -> str:
+        """
+        POST a la Trading API con cubo de tokens, cuota y reintentos.
+        Devuelve el XML (el Ack lo interpreta quien llama). ErrorEbay si no hubo
+        respuesta utilizable después de los reintentos.
+
+        `plazo_s` acota el tiempo total (reintentos incluidos): cada POST usa
+        como timeout lo que queda y no se reintenta si el backoff no entra.
+        """
+        import requests
+        if prioritaria is None:
+            prioritaria = call_name in PRIORITARIAS
+        headers = {
+            "X-EBAY-API-CALL-NAME": call_name,
+            "X-EBAY-API-SITEID": siteid,
+            "X-EBAY-API-COMPATIBILITY-LEVEL": compat_level,
+            "Content-Type": "text/xml",
+        }
+        data = xml_body.encode("utf-8")
+        labels = {"call": call_name}
+        limite = time.monotonic() + plazo_s if plazo_s is not None else None
+        for intento in range(1, self.max_intentos + 1):
+            self.cuota.reservar(prioritaria, call_name)
+            espera_cubo = self.cubo.tomar(prioritaria)
+            if espera_cubo > 0.001:
+                observar("ebay_cubo_espera", espera_cubo, {"prioridad": "alta" if prioritaria else "normal"})
+            timeout_post = timeout
+            if limite is not None:
+                timeout_post = min(timeout, limite - time.monotonic())
+                if timeout_post <= 0:
+                    raise ErrorEbay(f"{call_name}: plazo de {plazo_s:.0f}s agotado", call=call_name, transitorio=True)
+            t0 = time.perf_counter()
+            retry_after = ""
+            throttling = False
+            try:
+                # Trading API usa token dentro del XML
+                r = obtener_session().post(url or self.url, data=data, headers=headers, timeout=timeout_post)
+            except requests.RequestException as e:
+                error = ErrorEbay(f"{call_name}: {type(e).__name__}: {e}", call=call_name, transitorio=True)
+                observar("ebay_api", time.perf_counter() - t0, labels, ack="", error=type(e).__name__)
+            else:
+                ack, codigo = ack_rapido(r.text)
+                observar("ebay_api", time.perf_counter() - t0, labels, ack=ack or f"HTTP {r.status_code}", error=codigo)
+                throttling = r.status_code == 429 or (ack == "Failure" and codigo in CODIGOS_THROTTLING)
+                if throttling:
+                    error = EbayThrottling(f"{call_name}: eBay está limitando las llamadas (HTTP {r.status_code}, "
+                                           f"código {codigo or '-'})", call_name, ack, codigo, r.status_code, True)
+                    retry_after = r.headers.get("Retry-After", "")
+                elif r.status_code >= 500 or (ack == "Failure" and codigo in CODIGOS_TRANSITORIOS):
+                    error = ErrorEbay(f"{call_name}: error transitorio de eBay (HTTP {r.status_code}, "
+                                      f"código {codigo or '-'})", call_name, ack, codigo, r.status_code, True)
+                elif r.status_code >= 400:
+                    raise ErrorEbay(f"{call_name}: HTTP {r.status_code}", call_name, ack, codigo, r.status_code)
+                else:
+                    self.cubo.exito()
+                    return r.text
+            # cada intento queda en ebay_api_total{call, ack, error} (518, HTTP 503, ...)
+            if throttling:
+                self.cubo.frenar()
+            espera = self._espera(intento, retry_after)
+            if intento == self.max_intentos or (limite is not None and time.monotonic() + espera >= limite):
+                raise error
+            time.sleep(espera)
+        raise AssertionError("inalcanzable")
+
+
+_CLIENTE: Optional[ClienteTrading] = None
+_CLIENTE_LOCK = threading.Lock()
+
+
+def obtener_cliente() -> ClienteTrading:
+    global _CLIENTE
+    if _CLIENTE is None:
+        with _CLIENTE_LOCK:
+            if _CLIENTE is None:
+                _CLIENTE = ClienteTrading()
+    return _CLIENTE
@@ -0,0 +1,164 @@
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+
+# Un solo resolvedor URL/texto -> ItemID para resell.py y crosslist.py.
+#
+# 1) patrones precompilados sobre el texto (sin red): número pelado,
+#    /itm/[slug/]<id>, item=<id> / itemId=<id> / iid=<id>, hash=item<hex>
+# 2) links cortos (ebay.us, etc.): HEAD siguiendo redirecciones y se vuelve
+#    a probar con la URL final, sin bajar la página
+# 3) último recurso: GET de la página y buscar el id en el HTML
+# Los resultados quedan memorizados (LRU acotado) por URL.
+
+MEMO_MAX = 4096
+RESOLVER_WORKERS = 8
+TIMEOUT_S = 15
+USER_AGENT = "Mozilla/5.0"
+
+_NUMERO = re.compile(r"\d{8,20}")
+_ITM = re.compile(r"/itm/(?:[^/?#]+/)?(\d{8,20})(?:[/?#]|$)")
+_PARAM = re.compile(r"[?&](?:item|itemId|itm|iid)=(\d{8,20})(?:&|#|$)", re.IGNORECASE)
+# hash=item<ItemID en hexadecimal>[:g:...]
+_HASH = re.compile(r"hash=item([0-9a-fA-F]{8,16})(?=[:&#]|$)")
+_HTML = (
+    re.compile(r'"legacyItemId"\s*:\s*"(\d{9,})"'),
+    re.compile(r'"itemId"\s*:\s*"(\d{9,})"'),
+    re.compile(r"/itm/(?:[^/\"'?]+/)?(\d{9,})"),
+    re.compile(r"[?&]item=(\d{9,})"),
+)
+_LARGO = re.compile(r"(?<!\d)(\d{12})(?!\d)")
+
+_ERROR = ("No pude extraer el ItemID. Pega la URL completa del listing de eBay o el número ItemID.\n"
+          "Tip: la URL del listing normalmente se ve como https://www.ebay.com/itm/123456789012")
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _session():
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                s = requests.Session()
+                s.headers["User-Agent"] = USER_AGENT
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=RESOLVER_WORKERS)
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                _SESSION = s
+    return _SESSION
+
+
+def _de_hash(valor: str) -> Optional[str]:
+    # hash=item suele traer el id en hex (10 dígitos hex para ids de 12);
+    # si son 11-13 dígitos decimales se toma tal cual
+    if valor.isdigit() and 11 <= len(valor) <= 13:
+        return valor
+    n = str(int(valor, 16))
+    return n if 9 <= len(n) <= 20 else None
+
+
+def es_item_id(valor: str) -> bool:
+    """True si `valor` ya es un ItemID de eBay (solo dígitos, 8-20)."""
+    return bool(_NUMERO.fullmatch(str(valor).strip()))
+
+
+@lru_cache(maxsize=MEMO_MAX)
+def item_id_sin_red(valor: str) -> Optional[str]:
+    """ItemID a partir del texto/URL, solo con patrones. None si no hay."""
+    s = valor.strip()
+    if _NUMERO.fullmatch(s):
+        return s
+    m = _ITM.search(s) or _PARAM.search(s)
+    if m:
+        return m.group(1)
+    m = _HASH.search(s)
+    if m:
+        return _de_hash(m.group(1))
+    return None
+
+
+def item_id_de_html(html: str) -> Optional[str]:
+    for pat in _HTML:
+        m = pat.search(html)
+        if m:
+            return m.group(1)
+    m = _LARGO.search(html)
+    return m.group(1) if m else None
+
+
+@lru_cache(maxsize=MEMO_MAX)
+def _resolver_red(url: str) -> str:
+    # las excepciones no se memorizan: un link caído se reintenta la próxima vez
+    s = _session()
+    r = s.head(url, allow_redirects=True, timeout=TIMEOUT_S)
+    if r.status_code in (405, 501): # hay servidores que no aceptan HEAD
+        r = s.get(url, allow_redirects=True, timeout=TIMEOUT_S, stream=True)
+        r.close()
+    for u in [h.headers.get("Location", "") for h in r.history] + [r.url]:
+        found = item_id_sin_red(u) if u else None
+        if found:
+            return found
+
+    r = s.get(r.url, timeout=TIMEOUT_S)
+    r.raise_for_status()
+    found = item_id_de_html(r.text)
+    if found:
+        return found
+    raise ValueError(_ERROR)
+
+
+def extract_item_id(valor: str, red: bool = True) -> str:
+    """
+    ItemID de un número o una URL de eBay. Con red=True, los links cortos o
+    sin id visible se resuelven por HTTP (HEAD primero, página después).
+    """
+    s = valor.strip()
+    found = item_id_sin_red(s)
+    if found:
+        return found
+    url = urlparse(s)
+    if red and url.scheme in ("http", "https") and url.netloc:
+        return _resolver_red(s)
+    m = _LARGO.search(s)
+    if m:
+        return m.group(1)
+    raise ValueError(_ERROR)
+
+
+def resolver_lote(valores: Iterable[str], workers: int = RESOLVER_WORKERS,
+                  red: bool = True) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Resuelve muchos valores a la vez: lo que sale por patrones no toca la
+    red; el resto se resuelve en paralelo. Devuelve ({valor: item_id}, {valor: error}).
+    """
+    ids: Dict[str, str] = {}
+    errores: Dict[str, str] = {}
+    pendientes = []
+    for v in dict.fromkeys(v.strip() for v in valores if v and v.strip()):
+        found = item_id_sin_red(v)
+        if found:
+            ids[v] = found
+        else:
+            pendientes.append(v)
+
+    def work(v: str) -> Tuple[str, Optional[str], str]:
+        try:
+            return v, extract_item_id(v, red=red), ""
+        except Exception as e:
+            return v, None, " ".join(str(e).split())
+
+    if pendientes:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pendientes)))) as ex:
+            for v, found, err in ex.map(work, pendientes):
+                if found:
+                    ids[v] = found
+                else:
+                    errores[v] = err
+    return ids, errores
@@ -0,0 +1,268 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ebay_cache import obtener_cache
+from ebay_xml import ack_and_message, parse_item_list_response
+
+# Sync incremental del catálogo de eBay (resell.py sync).
+#
+# - primera vez (o --full, o cursor muy viejo): GetSellerList de todos los
+#   listings activos, de a ENTRIES_PER_PAGE (el máximo con DetailLevel
+#   ReturnAll). Cada item ya viene completo, así que va directo a la caché
+#   de GetItem sin pedirlo de nuevo.
+# - siguientes veces: GetSellerEvents con ModTimeFrom = cursor. Solo los
+#   items que cambiaron se vuelven a pedir con GetItem (y los que terminaron
+#   se invalidan en la caché).
+# - el cursor es el Timestamp que devuelve eBay (reloj del servidor) y se
+#   guarda en inventory/sync_cursor.json; inventory/map.json queda con el
+#   estado de cada listing.
+# - los GetItem que fallan quedan en el cursor ("pendientes") y se vuelven a
+#   pedir en la corrida siguiente aunque eBay no informe cambios nuevos.
+
+ROOT = Path(__file__).resolve().parent
+CURSOR_PATH = ROOT / "inventory" / "sync_cursor.json"
+MAP_PATH = ROOT / "inventory" / "map.json"
+
+ENTRIES_PER_PAGE = 200
+VENTANA_LISTADO_DIAS = 120 # GetSellerList acepta rangos de EndTime de hasta ~120 días
+VENTANA_EVENTOS_H = 48 # cada GetSellerEvents cubre como mucho 48h de cambios
+MAX_EVENTOS = 3000 # si una ventana devuelve esto, se parte en dos
+CURSOR_MAX_DIAS = 30 # cursor más viejo que esto → sync completo
+SOLAPE_S = 120 # margen para no perder cambios en el borde del cursor
+
+TradingCall = Callable[[str, str], str] # (call_name, xml_body) -> xml
+
+
+def _iso(t: datetime) -> str:
+    t = t.astimezone(timezone.utc)
+    return t.strftime("%Y-%m-%dT%H:%M:%S.") + f"{t.microsecond // 1000:03d}Z"
+
+
+def _parse_ts(s: str) -> datetime:
+    return datetime.fromisoformat(s.replace("Z", "+00:00"))
+
+
+def _request(call_name: str, token: str, cuerpo: str) -> str:
+    return f"""<?xml version="1.0" encoding="utf-8"?>
+<{call_name}Request xmlns="urn:ebay:apis:eBLBaseComponents">
+  <RequesterCredentials>
+    <eBayAuthToken>{token}</eBayAuthToken>
+  </RequesterCredentials>{cuerpo}
+</{call_name}Request>"""
+
+
+def _check(parsed: Dict[str, Any], call_name: str) -> None:
+    ack, msg = ack_and_message(parsed)
+    if ack != "Success" and ack != "Warning":
+        raise RuntimeError(f"{call_name} falló. Ack={ack or '?'}. Mensaje: {msg or 'Sin mensaje'}")
+
+
+def _load_json(path: Path, default: Any) -> Any:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def _save_json(path: Path, data: Any) -> None:
+    path.parent.mkdir(exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+class SyncEbay:
+    def __init__(self, token: str, call: TradingCall, refrescar_item: Callable[[str], Any],
+                 workers: int = 4, esperar: Optional[Callable[[], None]] = None,
+                 cursor_path: Path = CURSOR_PATH, map_path: Path = MAP_PATH):
+        self.token = token
+        self.call = call
+        self.refrescar_item = refrescar_item
+        self.workers = max(1, workers)
+        self.esperar = esperar or (lambda: None)
+        self.cursor_path = Path(cursor_path)
+        self.map_path = Path(map_path)
+        self.cache = obtener_cache()
+        self.llamadas = 0
+        self._lock = threading.Lock()
+
+    def _trading(self, call_name: str, cuerpo: str) -> Dict[str, Any]:
+        self.esperar()
+        with self._lock:
+            self.llamadas += 1
+        parsed = parse_item_list_response(self.call(call_name, _request(call_name, self.token, cuerpo)))
+        _check(parsed, call_name)
+        return parsed
+
+    # ----------------------------
+    # Sync completo (GetSellerList)
+    # ----------------------------
+
+    def _pagina(self, desde: datetime, hasta: datetime, n: int) -> Dict[str, Any]:
+        return self._trading("GetSellerList", f"""
+  <EndTimeFrom>{_iso(desde)}</EndTimeFrom>
+  <EndTimeTo>{_iso(hasta)}</EndTimeTo>
+  <DetailLevel>ReturnAll</DetailLevel>
+  <IncludeItemSpecifics>true</IncludeItemSpecifics>
+  <Pagination>
+    <EntriesPerPage>{ENTRIES_PER_PAGE}</EntriesPerPage>
+    <PageNumber>{n}</PageNumber>
+  </Pagination>""")
+
+    def completo(self) -> Tuple[List[Dict[str, Any]], str]:
+        """Todos los listings activos. Devuelve (items, timestamp de eBay)."""
+        ahora = datetime.now(timezone.utc)
+        desde, hasta = ahora - timedelta(minutes=5), ahora + timedelta(days=VENTANA_LISTADO_DIAS)
+        primera = self._pagina(desde, hasta, 1)
+        paginas = int(primera.get("total_pages") or 1)
+        items = list(primera["items"])
+        if paginas > 1:
+            with ThreadPoolExecutor(max_workers=min(self.workers, paginas - 1)) as ex:
+                for res in ex.map(lambda n: self._pagina(desde, hasta, n), range(2, paginas + 1)):
+                    items.extend(res["items"])
+        for it in items:
+            if it.get("item_id"):
+                self.cache.put(it["item_id"], {"ack": primera["ack"], "errors": [], "item": it})
+        return items, primera.get("timestamp") or _iso(ahora)
+
+    # ----------------------------
+    # Sync incremental (GetSellerEvents)
+    # ----------------------------
+
+    def _eventos(self, desde: datetime, hasta: datetime) -> Tuple[List[Dict[str, Any]], str]:
+        res = self._trading("GetSellerEvents", f"""
+  <ModTimeFrom>{_iso(desde)}</ModTimeFrom>
+  <ModTimeTo>{_iso(hasta)}</ModTimeTo>
+  <DetailLevel>ReturnAll</DetailLevel>""")
+        if len(res["items"]) >= MAX_EVENTOS and hasta - desde > timedelta(minutes=1):
+            medio = desde + (hasta - desde) / 2
+            a, _ = self._eventos(desde, medio)
+            b, ts = self._eventos(medio, hasta)
+            return a + b, ts
+        return res["items"], res.get("timestamp") or _iso(hasta)
+
+    def cambios(self, cursor: str) -> Tuple[List[Dict[str, Any]], str]:
+        """Items modificados desde `cursor`, en ventanas de VENTANA_EVENTOS_H."""
+        desde = _parse_ts(cursor) - timedelta(seconds=SOLAPE_S)
+        ahora = datetime.now(timezone.utc)
+        por_id: Dict[str, Dict[str, Any]] = {}
+        ts = cursor
+        while desde < ahora:
+            hasta = min(ahora, desde + timedelta(hours=VENTANA_EVENTOS_H))
+            items, ts = self._eventos(desde, hasta)
+            for it in items:
+                if it.get("item_id"):
+                    por_id[it["item_id"]] = it # el último cambio gana
+            desde = hasta
+        return list(por_id.values()), ts
+
+    def _refrescar(self, items: List[Dict[str, Any]],
+                   pendientes: List[str] = ()) -> Tuple[int, List[str], List[str]]:
+        """GetItem de los activos que cambiaron más los `pendientes` de la corrida anterior.
+
+        Devuelve (refrescados, errores, ids que fallaron).
+        """
+        activos = [it["item_id"] for it in items if it.get("listing_status", "Active") == "Active"]
+        terminados = set()
+        for it in items:
+            if it.get("listing_status", "Active") != "Active":
+                self.cache.invalidate(it["item_id"])
+                terminados.add(it["item_id"])
+        vistos = set(activos)
+        activos += [i for i in dict.fromkeys(pendientes) if i not in vistos and i not in terminados]
+        errores: List[str] = []
+        fallidos: List[str] = []
+
+        def work(item_id: str) -> None:
+            self.esperar()
+            with self._lock:
+                self.llamadas += 1
+            try:
+                self.refrescar_item(item_id)
+            except Exception as e:
+                errores.append(f"{item_id}: {' '.join(str(e).split())}")
+                fallidos.append(item_id)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as ex:
+            list(ex.map(work, activos))
+        return len(activos) - len(errores), errores, fallidos
+
+    # ----------------------------
+    # Entrada
+    # ----------------------------
+
+    def sync(self, full: bool = False) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        cur = _load_json(self.cursor_path, {})
+        cursor = cur.get("mod_time_from", "")
+        viejo = not cursor or datetime.now(timezone.utc) - _parse_ts(cursor) > timedelta(days=CURSOR_MAX_DIAS)
+        modo = "full" if full or viejo else "delta"
+
+        # GetItem que fallaron la vez anterior: el cursor avanzó igual, así
+        # que eBay no los vuelve a informar y hay que pedirlos a mano
+        pendientes = [str(i) for i in cur.get("pendientes", [])] if not full else []
+        errores: List[str] = []
+        fallidos: List[str] = []
+        if modo == "full":
+            items, ts = self.completo()
+            refrescados = len(items)
+        else:
+            items, ts = self.cambios(cursor)
+            refrescados, errores, fallidos = self._refrescar(items, pendientes)
+
+        terminados = self._actualizar_mapa(items, modo == "full", ts)
+        _save_json(self.cursor_path, {
+            "mod_time_from": ts,
+            "last_sync_at": datetime.now().isoformat(),
+            "last_full_at": datetime.now().isoformat() if modo == "full" else cur.get("last_full_at", ""),
+            "mode": modo,
+            "pendientes": fallidos,
+        })
+        return {
+            "mode": modo,
+            "items": len(items),
+            "refreshed": refrescados,
+            "ended": terminados,
+            "calls": self.llamadas,
+            "errors": errores,
+            "retried": len(pendientes) if modo == "delta" else 0,
+            "secs": round(time.perf_counter() - t0, 2),
+            "cursor": ts,
+        }
+
+    def _actualizar_mapa(self, items: List[Dict[str, Any]], completo: bool, ts: str) -> int:
+        mp = _load_json(self.map_path, {})
+        vistos = set()
+        terminados = 0
+        for it in items:
+            item_id = it.get("item_id")
+            if not item_id:
+                continue
+            vistos.add(item_id)
+            status = it.get("listing_status") or "Active"
+            e = mp.setdefault(item_id, {})
+            if it.get("title"):
+                e["title"] = it["title"].strip()
+            if it.get("end_time"):
+                e["ebay_end_time"] = it["end_time"]
+            e["ebay_status"] = status
+            e["synced_at"] = ts
+            terminados += status != "Active"
+        if completo:
+            # lo que figuraba activo y ya no aparece en el listado, terminó
+            for item_id, e in mp.items():
+                if item_id not in vistos and e.get("ebay_status") == "Active":
+                    e["ebay_status"] = "Ended"
+                    e["synced_at"] = ts
+                    self.cache.invalidate(item_id)
+                    terminados += 1
+        _save_json(self.map_path, mp)
+        return terminados
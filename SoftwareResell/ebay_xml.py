@@ -0,0 +1,182 @@
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Parser de una sola pasada para respuestas de la Trading API.
+#
+# Antes resell.get_item_from_ebay y generar_drafts.ebay_get_item corrían una
+# docena de re.search/re.findall con DOTALL sobre el XML completo (más un
+# regex anidado por cada NameValueList). Aquí el documento se parsea UNA vez
+# con ElementTree (el acelerador en C arma el árbol sin callbacks en Python;
+# expat con handlers en Python era 2-3x más lento que los regex en un GetItem
+# típico) y se sacan todos los campos recorriendo los hijos directos; cada
+# módulo arma su propio dict de salida a partir del resultado.
+
+def _raiz(xml: Union[str, bytes], out: Dict[str, Any]) -> Tuple[Optional[ET.Element], str]:
+    """(raíz, "{namespace}") o (None, "") con el motivo en out["errors"]."""
+    try:
+        root = ET.fromstring(xml) # str o bytes, sin copiar
+    except ET.ParseError as e:
+        out["errors"].append({"short": "XML inválido", "long": str(e)})
+        return None, ""
+    ns = root.tag[:root.tag.index("}") + 1] if root.tag.startswith("{") else ""
+    out["ack"] = (root.findtext(ns + "Ack") or "").strip()
+    return root, ns
+
+# hijo del Item -> campo cuyo texto nos interesa
+_ITEM_FIELDS = {
+    "ItemID": "item_id",
+    "Title": "title",
+    "Description": "description",
+    "StartPrice": "start_price",
+    "ConditionDisplayName": "condition",
+    "ConditionDescription": "condition_description",
+}
+# contenedor dentro del Item -> {hijo: campo}
+_ITEM_NESTED = {
+    "SellingStatus": {"CurrentPrice": "current_price", "ListingStatus": "listing_status"},
+    "PrimaryCategory": {"CategoryID": "category_id", "CategoryName": "category_name"},
+    "ListingDetails": {"EndTime": "end_time"},
+}
+_ERROR_FIELDS = {"ShortMessage": "short", "LongMessage": "long", "ErrorCode": "code", "SeverityCode": "severity"}
+# campos de primer nivel de la respuesta (paginación de GetSellerList, etc.)
+_TOP_FIELDS = {
+    "Timestamp": "timestamp",
+    "HasMoreItems": "has_more",
+    "TotalNumberOfPages": "total_pages",
+    "TotalNumberOfEntries": "total_entries",
+}
+
+def _error(el: ET.Element, ns: str) -> Dict[str, str]:
+    return {campo: (child.text or "").strip() for tag, campo in _ERROR_FIELDS.items()
+            for child in (el.find(ns + tag),) if child is not None}
+
+def _campo(item: Dict[str, Any], campo: str, el: ET.Element) -> None:
+    raw = el.text or ""
+    # título y descripción tal cual (los limpia quien los usa)
+    item[campo] = raw if campo in ("title", "description") else raw.strip()
+    if campo in ("current_price", "start_price"):
+        item[campo.replace("price", "currency")] = el.get("currencyID", "")
+
+def _item(el: ET.Element, ns: str) -> Dict[str, Any]:
+    # un recorrido por los hijos directos: find() con rutas cuesta más que
+    # el parseo mismo en un GetItem típico
+    n = len(ns)
+    item: Dict[str, Any] = {"specifics": [], "pictures": []}
+    for child in el:
+        tag = child.tag[n:]
+        campo = _ITEM_FIELDS.get(tag)
+        if campo is not None:
+            _campo(item, campo, child)
+            continue
+        sub = _ITEM_NESTED.get(tag)
+        if sub is not None:
+            for nieto in child:
+                campo = sub.get(nieto.tag[n:])
+                if campo is not None:
+                    _campo(item, campo, nieto)
+    t_name, t_value = ns + "Name", ns + "Value"
+    for specs in el.iter(ns + "ItemSpecifics"):
+        for nv in specs.iter(ns + "NameValueList"):
+            name, value = "", None
+            for c in nv:
+                if c.tag == t_name:
+                    name = (c.text or "").strip()
+                elif c.tag == t_value and value is None:
+                    value = (c.text or "").strip()
+            if name and value is not None:
+                item["specifics"].append((name, value))
+    for pic in el.iter(ns + "PictureURL"):
+        text = (pic.text or "").strip()
+        if text:
+            item["pictures"].append(text)
+    return item
+
+def _parse_items(xml: Union[str, bytes]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Una pasada sobre la respuesta. Los Item pueden venir sueltos (GetItem) o
+    dentro de ItemArray (GetSellerList / GetSellerEvents).
+    """
+    out: Dict[str, Any] = {"ack": "", "errors": []}
+    root, ns = _raiz(xml, out)
+    if root is None:
+        return out, []
+    out["errors"] = [_error(e, ns) for e in root.iter(ns + "Errors")]
+    n = len(ns)
+    items: List[Dict[str, Any]] = []
+    for child in root:
+        tag = child.tag[n:]
+        if tag == "Item":
+            items.append(_item(child, ns))
+        elif tag == "ItemArray":
+            items.extend(_item(el, ns) for el in child.iterfind(ns + "Item"))
+        else:
+            for el in (child if tag == "PaginationResult" else (child,)):
+                campo = _TOP_FIELDS.get(el.tag[n:])
+                if campo is not None:
+                    out[campo] = (el.text or "").strip()
+    return out, items
+
+def parse_trading_response(xml: Union[str, bytes]) -> Dict[str, Any]:
+    """
+    Devuelve:
+      ack, errors[{code, severity, short, long}],
+      item{item_id, title, description, current_price, current_currency,
+           start_price, start_currency, listing_status, category_id,
+           category_name, condition, condition_description, end_time,
+           specifics[(name, value)], pictures[]}
+    Si el XML no se puede parsear, ack queda "" y errors trae el motivo.
+    """
+    out, items = _parse_items(xml)
+    out["item"] = items[0] if items else {"specifics": [], "pictures": []}
+    return out
+
+def parse_item_list_response(xml: Union[str, bytes]) -> Dict[str, Any]:
+    """
+    GetSellerList / GetSellerEvents: ack, errors, timestamp, has_more,
+    total_pages, total_entries e items[] (mismo formato que `item` arriba).
+    """
+    out, items = _parse_items(xml)
+    out["items"] = items
+    return out
+
+def ack_and_message(parsed: Dict[str, Any]) -> Tuple[str, str]:
+    """(Ack, primer LongMessage o ShortMessage) de una respuesta ya parseada."""
+    for e in parsed.get("errors") or []:
+        msg = e.get("long") or e.get("short") or ""
+        if msg:
+            return parsed.get("ack", ""), msg
+    return parsed.get("ack", ""), ""
+
+def ack_rapido(xml: str) -> Tuple[str, str]:
+    """
+    (Ack, primer ErrorCode) buscando los tags sin parsear el documento.
+    Para métricas: <Ack> está al principio de la respuesta, así que no
+    recorre los ~400 KB de un GetItem.
+    """
+    i = xml.find("<Ack>")
+    if i < 0:
+        return "", ""
+    ack = xml[i + 5:xml.find("<", i + 5)].strip()
+    if ack == "Success":
+        return ack, ""
+    j = xml.find("<ErrorCode>")
+    return ack, xml[j + 11:xml.find("<", j + 11)].strip() if j >= 0 else ""
+
+def parse_end_items_response(xml: Union[str, bytes]) -> Dict[str, Any]:
+    """
+    Respuesta de EndItems (hasta 10 items por llamada). Devuelve:
+      ack, errors[...] (los de nivel request),
+      items[{correlation_id, end_time, errors[...]}] (uno por EndItemResponseContainer)
+    """
+    out: Dict[str, Any] = {"ack": "", "errors": [], "items": []}
+    root, ns = _raiz(xml, out)
+    if root is None:
+        return out
+    out["errors"] = [_error(e, ns) for e in root.findall(ns + "Errors")]
+    for cont in root.iter(ns + "EndItemResponseContainer"):
+        out["items"].append({
+            "correlation_id": (cont.findtext(ns + "CorrelationID") or "").strip(),
+            "end_time": (cont.findtext(ns + "EndTime") or "").strip(),
+            "errors": [_error(e, ns) for e in cont.iter(ns + "Errors")],
+        })
+    return out
@@ -0,0 +1,285 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Fotos para los drafts de Depop/Poshmark (crosslist --fotos).
+#
+# - descarga en paralelo las PictureURL del item con una Session keep-alive
+# - caché direccionada por contenido: cache/fotos/objects/<sha256[:2]>/<sha256>
+#   (la misma foto en dos items o con dos URLs se guarda una vez)
+# - una URL ya descargada no se vuelve a pedir
+# - versión por plataforma (lado máximo en px) en un pool de procesos, con
+#   Pillow si está instalado; sin Pillow se usa la original (y no se guarda
+#   como variante: cuando se instale Pillow se redimensiona)
+# - una foto que no se puede redimensionar va a reporte["errores"] y no se
+#   copia; el resto del lote sigue
+# - copia lista para subir a mano en drafts/fotos/<item_id>/<plataforma>/NN.jpg
+# - cada corrida informa bytes y tiempo ahorrados por lo que ya estaba en caché
+
+ROOT = Path(__file__).resolve().parent
+CACHE_DIR = ROOT / "cache" / "fotos"
+SALIDA_DIR = ROOT / "drafts" / "fotos"
+
+DESCARGAS_SIMULTANEAS = 8
+TIMEOUT_S = 30
+
+# lado máximo y cantidad de fotos que acepta cada plataforma
+LIMITES: Dict[str, Dict[str, int]] = {
+    "depop": {"max_lado": 1280, "max_fotos": 4},
+    "posh": {"max_lado": 1080, "max_fotos": 16},
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    url        TEXT PRIMARY KEY,
+    hash       TEXT NOT NULL,
+    size       INTEGER NOT NULL,
+    ms         REAL NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_urls_hash ON urls(hash);
+CREATE TABLE IF NOT EXISTS variantes (
+    hash     TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    size     INTEGER NOT NULL,
+    ms       REAL NOT NULL,
+    PRIMARY KEY (hash, platform)
+);
+"""
+
+
+def _redimensionar(args: Tuple[str, str, int]) -> Tuple[str, int, float, bool, str]:
+    """
+    (origen, destino, max_lado) -> (destino, bytes, ms, redimensionada, error).
+    Corre en otro proceso. Sin Pillow no escribe nada (redimensionada=False).
+    """
+    src, dst, max_lado = args
+    t0 = time.perf_counter()
+    tmp = f"{dst}.{os.getpid()}.tmp" # cada proceso del pool escribe el suyo
+    try:
+        from PIL import Image
+    except ImportError:
+        return dst, 0, 0.0, False, ""
+    try:
+        with Image.open(src) as im:
+            im = im.convert("RGB")
+            im.thumbnail((max_lado, max_lado))
+            im.save(tmp, "JPEG", quality=88, optimize=True)
+        os.replace(tmp, dst)
+    except Exception as e:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return dst, 0, 0.0, False, f"{type(e).__name__}: {' '.join(str(e).split())}"
+    return dst, os.path.getsize(dst), (time.perf_counter() - t0) * 1000, True, ""
+
+
+class CacheFotos:
+    def __init__(self, root: Path = CACHE_DIR, session=None, workers: int = DESCARGAS_SIMULTANEAS):
+        self.root = Path(root)
+        self.workers = max(1, workers)
+        self._session = session
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.root / "index.db"), timeout=30,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def session(self):
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.workers)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            self._session = s
+        return self._session
+
+    def _obj_path(self, h: str) -> Path:
+        return self.root / "objects" / h[:2] / h
+
+    def _var_path(self, h: str, plataforma: str) -> Path:
+        return self.root / "variantes" / plataforma / h[:2] / f"{h}.jpg"
+
+    # ----------------------------
+    # Descarga
+    # ----------------------------
+
+    def _buscar(self, url: str) -> Optional[Tuple[str, int, float]]:
+        with self._lock:
+            row = self._db().execute("SELECT hash, size, ms FROM urls WHERE url = ?", (url,)).fetchone()
+        if row and self._obj_path(row[0]).exists():
+            return row
+        return None
+
+    def _descargar(self, url: str) -> Tuple[str, int, float]:
+        t0 = time.perf_counter()
+        r = self.session().get(url, timeout=TIMEOUT_S)
+        r.raise_for_status()
+        data = r.content
+        ms = (time.perf_counter() - t0) * 1000
+        h = hashlib.sha256(data).hexdigest()
+        p = self._obj_path(h)
+        if not p.exists():
+            p.parent.mkdir(parents=True, exist_ok=True)
+            # tmp propio de cada hilo/proceso: dos URLs con la misma foto se
+            # pueden bajar a la vez
+            tmp = p.with_name(f"{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, p)
+        with self._lock:
+            self._db().execute(
+                "INSERT OR REPLACE INTO urls (url, hash, size, ms, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (url, h, len(data), ms, time.time()),
+            )
+        return h, len(data), ms
+
+    def descargar(self, urls: Iterable[str], reporte: Dict[str, Any]) -> Dict[str, str]:
+        """Devuelve {url: hash}. Solo baja lo que no está en caché."""
+        unicas = list(dict.fromkeys(u for u in urls if u))
+        hashes: Dict[str, str] = {}
+        faltan: List[str] = []
+        for url in unicas:
+            hit = self._buscar(url)
+            if hit:
+                hashes[url] = hit[0]
+                reporte["hits"] += 1
+                reporte["bytes_ahorrados"] += hit[1]
+                reporte["ms_ahorrados"] += hit[2]
+            else:
+                faltan.append(url)
+
+        def work(url: str) -> Tuple[str, Optional[Tuple[str, int, float]], str]:
+            try:
+                return url, self._descargar(url), ""
+            except Exception as e:
+                return url, None, " ".join(str(e).split())
+
+        if faltan:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(faltan))) as ex:
+                for url, res, err in ex.map(work, faltan):
+                    if res is None:
+                        reporte["errores"].append(f"{url}: {err}")
+                        continue
+                    hashes[url] = res[0]
+                    reporte["descargadas"] += 1
+                    reporte["bytes_descargados"] += res[1]
+        reporte["duplicadas"] += len(hashes) - len(set(hashes.values()))
+        return hashes
+
+    # ----------------------------
+    # Variantes por plataforma
+    # ----------------------------
+
+    def variantes(self, hashes: Iterable[str], plataformas: Iterable[str], reporte: Dict[str, Any],
+                  procesos: Optional[int] = None) -> set:
+        """Genera las variantes que faltan. Devuelve los (hash, plataforma) que fallaron."""
+        fallidas = set()
+        trabajos: List[Tuple[str, str, int]] = []
+        claves: Dict[str, Tuple[str, str]] = {}
+        for h in dict.fromkeys(hashes):
+            for plat in plataformas:
+                dst = self._var_path(h, plat)
+                if dst.exists():
+                    with self._lock:
+                        row = self._db().execute("SELECT ms FROM variantes WHERE hash = ? AND platform = ?",
+                                                 (h, plat)).fetchone()
+                    reporte["ms_ahorrados"] += row[0] if row else 0.0
+                    continue
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                trabajos.append((str(self._obj_path(h)), str(dst), LIMITES[plat]["max_lado"]))
+                claves[str(dst)] = (h, plat)
+        if not trabajos:
+            return fallidas
+
+        if procesos is None:
+            procesos = os.cpu_count() or 1
+        if procesos > 1 and len(trabajos) > 4:
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                resultados = list(pool.map(_redimensionar, trabajos, chunksize=4))
+        else:
+            resultados = [_redimensionar(t) for t in trabajos]
+
+        with self._lock:
+            db = self._db()
+            for dst, size, ms, redimensionada, error in resultados:
+                h, plat = claves[dst]
+                if error:
+                    reporte["errores"].append(f"{h[:12]} ({plat}): {error}")
+                    fallidas.add((h, plat))
+                    continue
+                if not redimensionada:
+                    reporte["sin_pillow"] += 1
+                    continue
+                db.execute("INSERT OR REPLACE INTO variantes (hash, platform, size, ms) VALUES (?, ?, ?, ?)",
+                           (h, plat, size, ms))
+                reporte["redimensionadas"] += 1
+        return fallidas
+
+    # ----------------------------
+    # Entrada
+    # ----------------------------
+
+    def preparar(self, fotos_por_item: Dict[str, List[str]], plataformas: Iterable[str] = tuple(LIMITES),
+                 salida: Path = SALIDA_DIR) -> Dict[str, Any]:
+        """
+        Baja, deduplica y adapta las fotos de cada item y deja una copia por
+        plataforma en salida/<item_id>/<plataforma>/NN.jpg. Devuelve el reporte.
+        """
+        plataformas = list(plataformas)
+        reporte: Dict[str, Any] = {
+            "items": len(fotos_por_item), "urls": 0, "hits": 0, "descargadas": 0, "duplicadas": 0,
+            "bytes_descargados": 0, "bytes_ahorrados": 0, "ms_ahorrados": 0.0,
+            "redimensionadas": 0, "sin_pillow": 0, "archivos": 0, "errores": [], "secs": 0.0,
+        }
+        t0 = time.perf_counter()
+        todas = [u for urls in fotos_por_item.values() for u in urls]
+        reporte["urls"] = len(set(todas))
+        hashes = self.descargar(todas, reporte)
+        fallidas = self.variantes(hashes.values(), plataformas, reporte)
+
+        for item_id, urls in fotos_por_item.items():
+            for plat in plataformas:
+                dest = Path(salida) / str(item_id) / plat
+                dest.mkdir(parents=True, exist_ok=True)
+                for viejo in dest.glob("*.jpg"):
+                    viejo.unlink()
+                elegidas = [hashes[u] for u in urls if u in hashes and (hashes[u], plat) not in fallidas]
+                for n, h in enumerate(elegidas[:LIMITES[plat]["max_fotos"]], 1):
+                    src, dst = self._var_path(h, plat), dest / f"{n:02d}.jpg"
+                    if not src.exists():
+                        src = self._obj_path(h) # sin Pillow: la original
+                    try:
+                        os.link(src, dst) # mismo disco: no ocupa espacio extra
+                    except OSError:
+                        shutil.copyfile(src, dst)
+                    reporte["archivos"] += 1
+        reporte["secs"] = round(time.perf_counter() - t0, 2)
+        reporte["ms_ahorrados"] = round(reporte["ms_ahorrados"], 1)
+        return reporte
+
+
+def imprimir_reporte(rep: Dict[str, Any]) -> None:
+    mb = 1024 * 1024
+    print(f"🖼️ Fotos: {rep['urls']} URLs de {rep['items']} items → {rep['descargadas']} descargadas, "
+          f"{rep['hits']} ya en caché, {rep['duplicadas']} duplicadas ({rep['secs']}s)")
+    print(f"   bajado {rep['bytes_descargados'] / mb:.1f} MB | ahorrado {rep['bytes_ahorrados'] / mb:.1f} MB "
+          f"y ~{rep['ms_ahorrados'] / 1000:.1f}s por la caché | {rep['archivos']} archivos en drafts/fotos/")
+    if rep["sin_pillow"]:
+        print("⚠️ Pillow no está instalado: se copiaron las fotos originales sin redimensionar (pip install pillow)")
+    for err in rep["errores"][:5]:
+        print(f" ❌ {err[:140]}")
@@ -7,76 +7,32 @@
 
 from __future__ import annotations
 
+import os
 import re
-import json
-from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List
 
-import requests
-import yaml
+import plantillas
+from draft_store import ebay_json, obtener_store
+from ebay_cache import obtener_cache
+from ebay_xml import ack_and_message, parse_trading_response
 
 DRAFTS_DIR = Path("drafts")
 
+# Trading API (EBAY_TRADING_URL permite apuntar a un stub local, igual que resell.py)
+EBAY_TRADING_URL = os.environ.get("EBAY_TRADING_URL", "https://api.ebay.com/ws/api.dll")
+
 
 # ----------------------------
 # Utilidades
 # ----------------------------
 
-def _now_stamp() -> str:
-    return datetime.now().strftime("%Y%m%d_%H%M%S")
-
 def _norm(s: str) -> str:
     s = (s or "").strip()
     s = re.sub(r"\s+", " ", s)
     return s
 
-def _strip_html(html: str) -> str:
-    # quita tags básicos
-    if not html:
-        return ""
-    html = re.sub(r"<br\s*/?>", "\n", html, flags=re.IGNORECASE)
-    html = re.sub(r"</p\s*>", "\n", html, flags=re.IGNORECASE)
-    html = re.sub(r"<[^>]+>", "", html)
-    # decode entidades comunes
-    html = html.replace("&nbsp;", " ").replace("&amp;", "&")
-    html = html.replace("&lt;", "<").replace("&gt;", ">").replace("&quot;", '"')
-    return _norm(html)
-
-def _first_nonempty(*vals: str) -> str:
-    for v in vals:
-        if isinstance(v, str) and v.strip():
-            return v.strip()
-    return ""
-
-def _hashtags_from_text(*parts: str, limit: int = 18) -> List[str]:
-    raw = " ".join([p for p in parts if p])
-    raw = raw.lower().replace("&", "and")
-    raw = re.sub(r"[^a-z0-9\s]", " ", raw)
-    words = [w for w in raw.split() if 2 <= len(w) <= 18]
-
-    stop = {
-        "the", "and", "for", "with", "mens", "men", "women", "womens", "size",
-        "new", "like", "condition", "no", "not", "very", "good", "great", "nice"
-    }
-    words = [w for w in words if w not in stop]
-
-    seen = set()
-    uniq: List[str] = []
-    for w in words:
-        if w not in seen:
-            seen.add(w)
-            uniq.append(w)
-
-    tags: List[str] = []
-    for w in uniq:
-        if w.isdigit():
-            continue
-        tags.append("#" + w)
-        if len(tags) >= limit:
-            break
-    return tags
-
+_strip_html = plantillas.strip_html
 
 # ----------------------------
 # Cargar config ebay.yaml
@@ -86,6 +42,7 @@ def load_yaml_config(path: str = "ebay.yaml") -> Dict[str, Any]:
     p = Path(path)
     if not p.exists():
         raise FileNotFoundError(f"No existe {path}. Debe estar en la misma carpeta.")
+    import yaml
     with open(p, "r", encoding="utf-8") as f:
         cfg = yaml.safe_load(f) or {}
 
@@ -122,15 +79,19 @@ def load_yaml_config(path: str = "ebay.yaml") -> Dict[str, Any]:
 # eBay Trading API - GetItem
 # ----------------------------
 
-def ebay_get_item(item_id: str, token: str, siteid: str = "0", compat_level: str = "967") -> Dict[str, Any]:
-    url = "https://api.ebay.com/ws/api.dll"
+def ebay_get_item(item_id: str, token: str, siteid: str = "0", compat_level: str = "967",
+                  refresh: bool = False, offline: bool = False) -> Dict[str, Any]:
+    # Pasa por la caché en disco compartida con resell.py (ver ebay_cache.py)
+    parsed = obtener_cache().fetch(
+        item_id, lambda: _fetch_getitem_parsed(item_id, token, siteid, compat_level),
+        refresh=refresh, offline=offline,
+    )
+    return item_from_parsed(item_id, parsed)
 
-    headers = {
-        "X-EBAY-API-CALL-NAME": "GetItem",
-        "X-EBAY-API-SITEID": siteid,
-        "X-EBAY-API-COMPATIBILITY-LEVEL": compat_level,
-        "Content-Type": "text/xml",
-    }
+
+def _fetch_getitem_parsed(item_id: str, token: str, siteid: str, compat_level: str) -> Dict[str, Any]:
+    # ebay_cliente trae requests/sqlite: solo cuando hay que ir a eBay (la caché y --offline no lo necesitan)
+    from ebay_cliente import obtener_cliente
 
     body = f"""<?xml version="1.0" encoding="utf-8"?>
 <GetItemRequest xmlns="urn:ebay:apis:eBLBaseComponents">
@@ -142,65 +103,55 @@ def ebay_get_item(item_id: str, token: str, siteid: str = "0", compat_level: str
   <DetailLevel>ReturnAll</DetailLevel>
 </GetItemRequest>"""
 
-    r = requests.post(url, headers=headers, data=body.encode("utf-8"), timeout=45)
-    r.raise_for_status()
+    # mismo cubo de tokens, cuota y reintentos que resell.py (ver ebay_cliente.py)
+    xml = obtener_cliente().llamar("GetItem", body, url=EBAY_TRADING_URL, siteid=siteid,
+                                   compat_level=compat_level, timeout=45)
+
+    # Una sola pasada sobre el XML (ver ebay_xml.py)
+    return _check_ack(parse_trading_response(xml))
+
 
-    # parse “simple” sin librerías externas: extraemos campos por regex / xml básica
-    text = r.text
+def _check_ack(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    ack, long_msg = ack_and_message(parsed)
+    if ack and ack.lower() not in ("success", "warning"):
+        raise RuntimeError(f"eBay respondió con Ack={ack}. Mensaje: {_norm(long_msg) or 'Error desconocido'}")
+    return parsed
 
-    def x(tag: str) -> str:
-        m = re.search(rf"<{tag}[^>]*>(.*?)</{tag}>", text, flags=re.DOTALL)
-        return _norm(m.group(1)) if m else ""
 
-    ack = x("Ack")
-    if ack and ack.lower() != "success" and ack.lower() != "warning":
-        long_msg = x("LongMessage") or x("ShortMessage") or "Error desconocido"
-        raise RuntimeError(f"eBay respondió con Ack={ack}. Mensaje: {long_msg}")
+def item_from_getitem_xml(item_id: str, text: str) -> Dict[str, Any]:
+    return item_from_parsed(item_id, _check_ack(parse_trading_response(text)))
 
-    # Title / Description (Description suele venir en <Description> con HTML)
-    title = x("Title")
-    desc_html = ""
-    mdesc = re.search(r"<Description[^>]*>(.*?)</Description>", text, flags=re.DOTALL)
-    if mdesc:
-        desc_html = mdesc.group(1).strip()
+
+def item_from_parsed(item_id: str, parsed: Dict[str, Any]) -> Dict[str, Any]:
+    it = parsed["item"]
+
+    # Title / Description (Description suele venir con HTML)
+    title = _norm(it.get("title", ""))
+    desc_html = (it.get("description") or "").strip()
 
     # Precio
     # <CurrentPrice currencyID="USD">34.99</CurrentPrice> o <StartPrice ...>
-    price = ""
-    currency = ""
-    mprice = re.search(r'<CurrentPrice[^>]*currencyID="([^"]+)">([^<]+)</CurrentPrice>', text)
-    if not mprice:
-        mprice = re.search(r'<StartPrice[^>]*currencyID="([^"]+)">([^<]+)</StartPrice>', text)
-    if mprice:
-        currency = mprice.group(1).strip()
-        price = mprice.group(2).strip()
+    if it.get("current_price"):
+        price, currency = it["current_price"], it.get("current_currency", "")
+    else:
+        price, currency = it.get("start_price", ""), it.get("start_currency", "")
 
     # Condición
-    condition = x("ConditionDisplayName") or x("ConditionDescription")
+    condition = _norm(it.get("condition", "")) or _norm(it.get("condition_description", ""))
 
     # Fotos
-    photos: List[str] = []
-    pics = re.findall(r"<PictureURL[^>]*>(.*?)</PictureURL>", text, flags=re.DOTALL)
-    for p in pics:
-        u = p.strip()
-        if u:
-            photos.append(u)
-
-    # Item Specifics (NameValueList)
+    photos: List[str] = list(it.get("pictures", []))
+
+    # Item Specifics (NameValueList): gana el primer valor de cada Name
     item_specifics: Dict[str, str] = {}
-    # Captura pares <Name>Brand</Name> ... <Value>Lee</Value>
-    blocks = re.findall(r"<NameValueList>(.*?)</NameValueList>", text, flags=re.DOTALL)
-    for b in blocks:
-        n = re.search(r"<Name>(.*?)</Name>", b, flags=re.DOTALL)
-        v = re.search(r"<Value>(.*?)</Value>", b, flags=re.DOTALL)
-        if n and v:
-            name = _norm(n.group(1))
-            val = _norm(v.group(1))
-            if name and val and name not in item_specifics:
-                item_specifics[name] = val
-
-    # Category info
-    category = x("PrimaryCategoryID") or x("CategoryID")
+    for name, val in it.get("specifics", []):
+        name, val = _norm(name), _norm(val)
+        if name and val and name not in item_specifics:
+            item_specifics[name] = val
+
+    # Category info: "category" es el ID (como siempre en este script);
+    # category_id/category_name son las mismas claves que en resell.py
+    category = it.get("category_id", "")
 
     return {
         "item_id": item_id,
@@ -212,6 +163,8 @@ def ebay_get_item(item_id: str, token: str, siteid: str = "0", compat_level: str
         "condition": condition,
         "photos": photos,
         "category": category,
+        "category_id": category,
+        "category_name": it.get("category_name", ""),
         "itemSpecifics": item_specifics,
     }
 
@@ -220,121 +173,13 @@ def ebay_get_item(item_id: str, token: str, siteid: str = "0", compat_level: str
 # Draft builders
 # ----------------------------
 
-def _pick_spec(item: Dict[str, Any], keys: List[str]) -> str:
-    specs = item.get("itemSpecifics") or {}
-    for k in keys:
-        v = specs.get(k)
-        if isinstance(v, str) and v.strip():
-            return v.strip()
-    return ""
+# El texto de cada draft sale de templates/<plataforma>.txt (ver plantillas.py)
 
 def build_depop_draft(item: Dict[str, Any]) -> str:
-    title = _norm(item.get("title", ""))
-    price = _norm(str(item.get("price", "")))
-    currency = _norm(item.get("currency", ""))
-    condition = _norm(item.get("condition", ""))
-
-    brand = _norm(_pick_spec(item, ["Brand"]))
-    size = _norm(_pick_spec(item, ["Size", "Size Type", "Waist Size", "Inseam"]))
-    color = _norm(_pick_spec(item, ["Color", "Colour"]))
-    material = _norm(_pick_spec(item, ["Material", "Fabric Type"]))
-    style = _norm(_pick_spec(item, ["Style", "Fit", "Type"]))
-    dept = _norm(_pick_spec(item, ["Department"]))
-
-    desc = _norm(item.get("description_text", ""))
-
-    lines: List[str] = []
-    lines.append(title)
-
-    meta1 = " | ".join([x for x in [
-        f"Brand: {brand}" if brand else "",
-        f"Size: {size}" if size else "",
-        f"Color: {color}" if color else ""
-    ] if x])
-    if meta1:
-        lines.append("🧷 " + meta1)
-
-    meta2 = " | ".join([x for x in [
-        f"Material: {material}" if material else "",
-        f"Style/Fit: {style}" if style else "",
-        f"Dept: {dept}" if dept else ""
-    ] if x])
-    if meta2:
-        lines.append("📌 " + meta2)
-
-    if price:
-        p = f"{currency} {price}".strip()
-        lines.append(f"💵 Price: {p}")
-
-    if condition:
-        lines.append("✅ Condition: " + condition)
-
-    if desc:
-        short = desc[:450]
-        lines.append("")
-        lines.append("📝 Details:")
-        lines.append(short)
-
-    tags = _hashtags_from_text(title, brand, color, material, style, dept, limit=18)
-    if tags:
-        lines.append("")
-        lines.append(" ".join(tags))
-
-    lines.append("")
-    lines.append("📦 Ships fast. Message me for bundle deals.")
-
-    return "\n".join(lines)
+    return plantillas.render("depop", item)
 
 def build_posh_draft(item: Dict[str, Any]) -> str:
-    title = _norm(item.get("title", ""))
-    price = _norm(str(item.get("price", "")))
-    currency = _norm(item.get("currency", ""))
-    condition = _norm(item.get("condition", ""))
-    desc = _norm(item.get("description_text", ""))
-
-    brand = _norm(_pick_spec(item, ["Brand"]))
-    size = _norm(_pick_spec(item, ["Size", "Waist Size", "Inseam"]))
-    color = _norm(_pick_spec(item, ["Color", "Colour"]))
-    material = _norm(_pick_spec(item, ["Material", "Fabric Type"]))
-    dept = _norm(_pick_spec(item, ["Department"]))
-    style = _norm(_pick_spec(item, ["Style", "Fit", "Type"]))
-
-    lines: List[str] = []
-    lines.append(title)
-
-    if brand:
-        lines.append(f"Brand: {brand}")
-    if size:
-        lines.append(f"Size: {size}")
-    if color:
-        lines.append(f"Color: {color}")
-    if material:
-        lines.append(f"Material: {material}")
-    if style:
-        lines.append(f"Style/Fit: {style}")
-    if dept:
-        lines.append(f"Department: {dept}")
-
-    if price:
-        p = f"{currency} {price}".strip()
-        lines.append(f"Price: {p}")
-    if condition:
-        lines.append(f"Condition: {condition}")
-
-    if desc:
-        lines.append("")
-        lines.append("Description:")
-        lines.append(desc[:900])
-
-    lines.append("")
-    lines.append("Bundle to save on shipping ✨")
-
-    return "\n".join(lines)
-
-def extract_top_photos(item: Dict[str, Any], n: int = 4) -> List[str]:
-    photos = item.get("photos") or []
-    photos = [p for p in photos if isinstance(p, str) and p.strip()]
-    return photos[:n]
+    return plantillas.render("posh", item)
 
 
 # ----------------------------
@@ -344,50 +189,44 @@ def extract_top_photos(item: Dict[str, Any], n: int = 4) -> List[str]:
 def main() -> None:
     import sys
 
-    if len(sys.argv) < 2:
-        print("Uso: python generar_drafts.py ITEM_ID")
+    args = sys.argv[1:]
+    refresh = "--refresh" in args
+    offline = "--offline" in args
+    args = [a for a in args if a not in ("--refresh", "--offline")]
+
+    if len(args) < 1:
+        print("Uso: python generar_drafts.py ITEM_ID [--refresh | --offline]")
         print("Ejemplo: python generar_drafts.py 287045152832")
         return
 
-    item_id = sys.argv[1].strip()
+    item_id = args[0].strip()
 
-    cfg = load_yaml_config("ebay.yaml")
-    token = cfg["token"]
+    token = ""
+    if not offline:
+        cfg = load_yaml_config("ebay.yaml")
+        token = cfg["token"]
 
     print(f"🔎 Buscando listing eBay ItemID={item_id} ...")
-    item = ebay_get_item(item_id, token)
-
-    # Guardamos un json por si quieres debug
-    DRAFTS_DIR.mkdir(exist_ok=True)
-    json_path = DRAFTS_DIR / f"ebay_{item_id}.json"
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(item, f, ensure_ascii=False, indent=2)
-
-    # Fotos top (solo como lista para copiar/pegar)
-    top_photos = extract_top_photos(item, n=4)
-
-    stamp = _now_stamp()
-    depop_path = DRAFTS_DIR / f"draft_depop_{item_id}_{stamp}.txt"
-    posh_path = DRAFTS_DIR / f"draft_posh_{item_id}_{stamp}.txt"
+    item = ebay_get_item(item_id, token, refresh=refresh, offline=offline)
 
     depop_txt = build_depop_draft(item)
     posh_txt = build_posh_draft(item)
 
-    # anexamos fotos al final (copy/paste fácil)
-    if top_photos:
-        depop_txt += "\n\n📸 Top Photos (copy links):\n" + "\n".join(top_photos)
-        posh_txt += "\n\n📸 Photos (copy links):\n" + "\n".join(item.get("photos", []))
-
-    with open(depop_path, "w", encoding="utf-8") as f:
-        f.write(depop_txt)
+    # Guardamos en drafts/drafts.db (versionado, ver draft_store.py) + json por si quieres debug
+    store = obtener_store()
+    store.save_many([
+        (item_id, "ebay", ebay_json(item)),
+        (item_id, "depop", depop_txt),
+        (item_id, "posh", posh_txt),
+    ])
 
-    with open(posh_path, "w", encoding="utf-8") as f:
-        f.write(posh_txt)
+    # Copia "última versión" en drafts/ para copiar/pegar
+    store.export(DRAFTS_DIR, item_ids=[item_id])
 
     print("\n✅ Drafts creados:")
-    print(f" - {depop_path}")
-    print(f" - {posh_path}")
-    print(f" - {json_path} (debug)")
+    print(f" - {DRAFTS_DIR / f'draft_depop_{item_id}.txt'} (v{store.versions(item_id, 'depop')[0]['version']})")
+    print(f" - {DRAFTS_DIR / f'draft_posh_{item_id}.txt'} (v{store.versions(item_id, 'posh')[0]['version']})")
+    print(f" - {DRAFTS_DIR / f'ebay_{item_id}.json'} (debug)")
 
 
 if __name__ == "__main__":
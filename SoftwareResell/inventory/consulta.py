@@ -0,0 +1,289 @@
+import bisect
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from inventory.store import DB_PATH, PLATFORMS, get_store
+
+# Índice en memoria para `resell.py query`.
+#
+# Junta en una sola tabla por SKU/ItemID:
+# - inventory/state.db  (status, sold_on, sold_at)
+# - inventory/map.json  (last_crosslist_at)
+# - logs/acciones.log y logs/crosslist.log (+ rotados y .jsonl):
+#   ITEM_SOLD, CROSSLIST y DELIST
+#
+# Se carga la primera vez que se consulta y se reutiliza mientras no cambie
+# el mtime/tamaño de las fuentes. De los logs solo se lee lo agregado desde
+# la última carga (si rotaron, se releen enteros).
+
+INVENTORY_DIR = Path(__file__).resolve().parent
+ROOT = INVENTORY_DIR.parent
+MAP_PATH = INVENTORY_DIR / "map.json"
+LOGS_DIR = ROOT / "logs"
+LOG_NAMES = ("acciones", "crosslist")
+
+_OK = {"1", "true", "ok", "yes"}
+
+
+@dataclass
+class Fila:
+    sku: str
+    status: str = ""
+    sold_on: str = ""
+    sold_at: str = ""
+    modo: str = ""
+    crosslisted_at: str = ""
+    delisted: Set[str] = field(default_factory=set)
+
+    def como_dict(self) -> Dict[str, Any]:
+        return {
+            "sku": self.sku, "status": self.status or "ACTIVE", "sold_on": self.sold_on,
+            "sold_at": self.sold_at, "modo": self.modo, "crosslisted_at": self.crosslisted_at,
+            "delisted": sorted(self.delisted),
+        }
+
+
+def _firma(paths: Iterable[Path]) -> Tuple:
+    out = []
+    for p in paths:
+        try:
+            st = p.stat()
+            out.append((p.name, st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            out.append((p.name, 0, 0))
+    return tuple(out)
+
+
+def _parse_linea(linea: str) -> Optional[Tuple[str, str, List[str], Dict[str, str]]]:
+    """Devuelve (ts, evento, args, campos) de una línea de texto o JSON."""
+    linea = linea.strip()
+    if not linea:
+        return None
+    if linea.startswith("{"):
+        try:
+            rec = json.loads(linea)
+        except ValueError:
+            return None
+        campos = {k: str(v) for k, v in rec.items() if not isinstance(v, list)}
+        args = [str(a) for a in rec.get("args", [])]
+        if "sku" in campos:
+            args = [campos["sku"], campos.get("platform", ""), campos.get("modo", "")] + args
+        return campos.get("ts", "").replace("T", " "), campos.get("evento", ""), args, campos
+    partes = linea.split(" | ")
+    if len(partes) < 2:
+        return None
+    args: List[str] = []
+    campos: Dict[str, str] = {}
+    for p in partes[2:]:
+        k, sep, v = p.partition("=")
+        if sep and k.isidentifier():
+            campos[k] = v
+        else:
+            args.append(p)
+    return partes[0], partes[1], args, campos
+
+
+class IndiceInventario:
+    def __init__(self, db_path: Path = DB_PATH, map_path: Path = MAP_PATH, logs_dir: Path = LOGS_DIR):
+        self.db_path = Path(db_path)
+        self.map_path = Path(map_path)
+        self.logs_dir = Path(logs_dir)
+        self._firma_estado: Tuple = ()
+        self._firma_mapa: Tuple = ()
+        self._firma_logs: Tuple = ()
+        self._offsets: Dict[Path, int] = {}
+        self._estado: Dict[str, Dict[str, Any]] = {}
+        self._mapa: Dict[str, Dict[str, Any]] = {}
+        self._eventos: Dict[str, Fila] = {}
+        self._filas: Dict[str, Fila] = {}
+        self._por_estado: Dict[str, List[str]] = {}
+        self._ventas: Dict[str, List[Tuple[str, str]]] = {} # plataforma -> [(sold_at, sku)] ordenado
+        self.cargas = 0
+        self.ultima_carga_ms = 0.0
+
+    # ----------------------------
+    # Carga / invalidación
+    # ----------------------------
+
+    def _logs(self) -> List[Path]:
+        out = []
+        for nombre in LOG_NAMES:
+            for ext in (".log", ".jsonl"):
+                base = self.logs_dir / f"{nombre}{ext}"
+                out.extend(sorted(self.logs_dir.glob(f"{nombre}{ext}.*"), reverse=True))
+                out.append(base)
+        return out
+
+    def refrescar(self) -> bool:
+        """Recarga lo que haya cambiado. Devuelve True si hubo que reconstruir."""
+        t0 = time.perf_counter()
+        cambio = False
+
+        archivos_db = [self.db_path, self.db_path.with_name(self.db_path.name + "-wal")]
+        if _firma(archivos_db) != self._firma_estado:
+            self._estado = get_store().all() if self.db_path.exists() else {}
+            # abrir la base en WAL toca el -wal: la firma se toma después de leer
+            self._firma_estado = _firma(archivos_db)
+            cambio = True
+
+        firma = _firma([self.map_path])
+        if firma != self._firma_mapa:
+            try:
+                with open(self.map_path, "r", encoding="utf-8") as f:
+                    self._mapa = json.load(f)
+            except (FileNotFoundError, ValueError):
+                self._mapa = {}
+            self._firma_mapa = firma
+            cambio = True
+
+        logs = self._logs()
+        firma = _firma(logs)
+        if firma != self._firma_logs:
+            self._leer_logs(logs, firma)
+            self._firma_logs = firma
+            cambio = True
+
+        if cambio:
+            self._reconstruir()
+            self.cargas += 1
+            self.ultima_carga_ms = (time.perf_counter() - t0) * 1000
+        return cambio
+
+    def _leer_logs(self, logs: List[Path], firma: Tuple) -> None:
+        viejos = dict((n, (m, s)) for n, m, s in self._firma_logs)
+        # solo crecieron los archivos actuales: lectura incremental
+        incremental = bool(self._firma_logs) and all(
+            n in viejos and (s >= viejos[n][1] if not n.split(".")[-1].isdigit() else (m, s) == viejos[n])
+            for n, m, s in firma if s
+        )
+        if not incremental:
+            self._eventos = {}
+            self._offsets = {}
+        for p in logs:
+            if not p.exists():
+                continue
+            desde = self._offsets.get(p, 0)
+            with open(p, "rb") as f:
+                f.seek(desde)
+                data = f.read()
+            corte = data.rfind(b"\n") + 1 # una línea a medio escribir se lee la próxima vez
+            self._offsets[p] = desde + corte
+            for linea in data[:corte].decode("utf-8", errors="replace").splitlines():
+                self._aplicar(linea)
+
+    def _fila_evento(self, sku: str) -> Fila:
+        fila = self._eventos.get(sku)
+        if fila is None:
+            fila = self._eventos[sku] = Fila(sku)
+        return fila
+
+    def _aplicar(self, linea: str) -> None:
+        rec = _parse_linea(linea)
+        if rec is None:
+            return
+        ts, evento, args, campos = rec
+        evento = evento.upper()
+        if evento == "ITEM_SOLD" and args:
+            fila = self._fila_evento(args[0])
+            fila.status = "SOLD"
+            fila.sold_on = args[1].lower() if len(args) > 1 else ""
+            fila.sold_at = ts
+            fila.modo = args[2] if len(args) > 2 else ""
+        elif evento == "CROSSLIST" and campos.get("item_id"):
+            self._fila_evento(campos["item_id"]).crosslisted_at = ts
+        elif evento.startswith("DELIST") and (campos.get("item_id") or campos.get("sku")):
+            sku = campos.get("item_id") or campos["sku"]
+            if campos.get("ok", "1").lower() in _OK and campos.get("platform"):
+                self._fila_evento(sku).delisted.add(campos["platform"].lower())
+
+    def _reconstruir(self) -> None:
+        filas: Dict[str, Fila] = {}
+        for sku, ev in self._eventos.items():
+            filas[sku] = Fila(sku, ev.status, ev.sold_on, ev.sold_at, ev.modo, ev.crosslisted_at, set(ev.delisted))
+        for sku, info in self._mapa.items():
+            fila = filas.get(sku) or filas.setdefault(sku, Fila(sku))
+            ts = str((info or {}).get("last_crosslist_at", "")).replace("T", " ")
+            if ts > fila.crosslisted_at:
+                fila.crosslisted_at = ts
+        for sku, info in self._estado.items():
+            fila = filas.get(sku) or filas.setdefault(sku, Fila(sku))
+            fila.status = info.get("status") or fila.status
+            fila.sold_on = (info.get("sold_on") or fila.sold_on or "").lower()
+            fila.sold_at = str(info.get("sold_at") or fila.sold_at or "").replace("T", " ")
+
+        por_estado: Dict[str, List[str]] = {}
+        ventas: Dict[str, List[Tuple[str, str]]] = {}
+        for sku, fila in filas.items():
+            por_estado.setdefault(fila.status or "ACTIVE", []).append(sku)
+            if fila.status == "SOLD":
+                ventas.setdefault(fila.sold_on, []).append((fila.sold_at, sku))
+        for lista in ventas.values():
+            lista.sort()
+        self._filas = filas
+        self._por_estado = por_estado
+        self._ventas = ventas
+
+    # ----------------------------
+    # Consultas
+    # ----------------------------
+
+    def filas(self) -> Dict[str, Fila]:
+        self.refrescar()
+        return self._filas
+
+    def sin_vender(self) -> List[Fila]:
+        self.refrescar()
+        return [f for s, skus in self._por_estado.items() if s != "SOLD" for f in map(self._filas.get, skus)]
+
+    def vendidos(self, plataforma: Optional[str] = None, desde: str = "") -> List[Fila]:
+        self.refrescar()
+        plats = [plataforma.lower()] if plataforma else list(self._ventas)
+        out: List[Fila] = []
+        for p in plats:
+            lista = self._ventas.get(p, [])
+            i = bisect.bisect_left(lista, (desde, "")) if desde else 0
+            out.extend(self._filas[sku] for _, sku in lista[i:])
+        return out
+
+    def sin_delistar(self) -> List[Fila]:
+        """Crosslisteados y vendidos que todavía figuran en alguna otra plataforma."""
+        self.refrescar()
+        out = []
+        for _, sku in (x for lista in self._ventas.values() for x in lista):
+            fila = self._filas[sku]
+            if fila.crosslisted_at and set(PLATFORMS) - {fila.sold_on} - fila.delisted:
+                out.append(fila)
+        return out
+
+    def crosslisteados(self) -> List[Fila]:
+        self.refrescar()
+        return [f for f in self._filas.values() if f.crosslisted_at]
+
+
+def parse_desde(valor: str) -> str:
+    """'7d', '24h', 'week' o una fecha ISO -> 'YYYY-MM-DD HH:MM:SS' comparable con sold_at."""
+    v = valor.strip().lower()
+    ahora = datetime.now()
+    if v in ("today", "hoy"):
+        t = ahora.replace(hour=0, minute=0, second=0, microsecond=0)
+    elif v in ("week", "semana"):
+        t = (ahora - timedelta(days=ahora.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    elif v[:-1].isdigit() and v[-1] in "dh":
+        t = ahora - (timedelta(days=int(v[:-1])) if v[-1] == "d" else timedelta(hours=int(v[:-1])))
+    else:
+        t = datetime.fromisoformat(valor.strip())
+    return t.strftime("%Y-%m-%d %H:%M:%S")
+
+
+_INDICE: Optional[IndiceInventario] = None
+
+
+def obtener_indice_inventario() -> IndiceInventario:
+    global _INDICE
+    if _INDICE is None:
+        _INDICE = IndiceInventario()
+    return _INDICE
@@ -1,34 +1,12 @@
-import json
-from pathlib import Path
+from inventory.store import PLATFORMS, get_store
 
-STATE_FILE = Path("inventory/state.json")
-
-def _load_state():
-    if not STATE_FILE.exists():
-        return {}
-    with open(STATE_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def _save_state(data):
-    STATE_FILE.parent.mkdir(exist_ok=True)
-    with open(STATE_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+# El estado vive en inventory/state.db (ver inventory/store.py).
+# state.json se migra automáticamente la primera vez.
 
 def marcar_vendido(sku: str, plataforma: str):
-    data = _load_state()
-
-    if sku not in data:
-        data[sku] = {
-            "status": "SOLD",
-            "sold_on": plataforma,
-            "platforms": {
-                "ebay": False,
-                "depop": False,
-                "poshmark": False
-            }
-        }
-
-    data[sku]["status"] = "SOLD"
-    data[sku]["sold_on"] = plataforma
+    # Si el SKU es nuevo se crea con todas las plataformas en False;
+    # si ya existía se respeta su bloque "platforms".
+    get_store().mark_sold(sku, plataforma, platforms={p: False for p in PLATFORMS})
 
-    _save_state(data)
\ No newline at end of file
+def obtener_estado(sku: str):
+    return get_store().get(sku)
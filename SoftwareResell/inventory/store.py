@@ -0,0 +1,198 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+# Estado de inventario en SQLite (modo WAL):
+# - cada venta es un UPSERT de una fila → O(1), no reescribe todo el archivo
+# - lecturas indexadas por SKU/ItemID (PRIMARY KEY) y por status / sold_on
+# - varios procesos pueden escribir a la vez (WAL + busy_timeout)
+#
+# state.json se migra solo la primera vez que se abre la base.
+
+INVENTORY_DIR = Path(__file__).resolve().parent
+DB_PATH = INVENTORY_DIR / "state.db"
+LEGACY_JSON = INVENTORY_DIR / "state.json"
+
+PLATFORMS = ("ebay", "depop", "poshmark")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    sku        TEXT PRIMARY KEY,
+    status     TEXT NOT NULL,
+    sold_on    TEXT,
+    sold_at    TEXT,
+    platforms  TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_items_status ON items(status);
+CREATE INDEX IF NOT EXISTS idx_items_sold_on ON items(sold_on, sold_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class StateStore:
+    """Conexión por hilo a inventory/state.db."""
+
+    def __init__(self, path: Path = DB_PATH, legacy_json: Optional[Path] = LEGACY_JSON):
+        self.path = Path(path)
+        self.legacy_json = legacy_json
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._ready = False
+
+    # ----------------------------
+    # Conexión / esquema
+    # ----------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+            if not self._ready:
+                with self._init_lock:
+                    if not self._ready:
+                        conn.executescript(_SCHEMA)
+                        self._migrate_legacy(conn)
+                        self._ready = True
+        return conn
+
+    def _migrate_legacy(self, conn: sqlite3.Connection) -> None:
+        done = conn.execute("SELECT value FROM meta WHERE key = 'migrated_json'").fetchone()
+        if done or not self.legacy_json or not Path(self.legacy_json).exists():
+            return
+        with open(self.legacy_json, "r", encoding="utf-8") as f:
+            data = json.load(f) or {}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for sku, rec in data.items():
+                rec = rec or {}
+                conn.execute(
+                    "INSERT OR IGNORE INTO items (sku, status, sold_on, sold_at, platforms) VALUES (?, ?, ?, ?, ?)",
+                    (
+                        str(sku),
+                        rec.get("status", "SOLD"),
+                        rec.get("sold_on"),
+                        rec.get("sold_at"),
+                        json.dumps(rec["platforms"]) if rec.get("platforms") is not None else None,
+                    ),
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_json', ?)",
+                (datetime.now().isoformat(),),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        print(f"📦 Migrado {self.legacy_json.name} → {self.path.name} ({len(data)} items)")
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ----------------------------
+    # Escrituras
+    # ----------------------------
+
+    def mark_sold(self, sku: str, platform: str, sold_at: Optional[str] = None,
+                  platforms: Optional[Dict[str, bool]] = None) -> None:
+        """UPSERT de una venta. Conserva `platforms` si ya existía."""
+        sold_at = sold_at or datetime.now().isoformat()
+        plat_json = json.dumps(platforms) if platforms is not None else None
+        self._conn().execute(
+            """
+            INSERT INTO items (sku, status, sold_on, sold_at, platforms)
+            VALUES (?, 'SOLD', ?, ?, ?)
+            ON CONFLICT(sku) DO UPDATE SET
+                status = 'SOLD',
+                sold_on = excluded.sold_on,
+                sold_at = excluded.sold_at,
+                platforms = COALESCE(items.platforms, excluded.platforms)
+            """,
+            (sku, platform, sold_at, plat_json),
+        )
+
+    def mark_sold_many(self, events: Iterable[tuple]) -> int:
+        """Aplica muchas ventas (sku, platform[, sold_at]) en una sola transacción."""
+        conn = self._conn()
+        n = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for ev in events:
+                sku, platform = ev[0], ev[1]
+                sold_at = ev[2] if len(ev) > 2 else datetime.now().isoformat()
+                conn.execute(
+                    """
+                    INSERT INTO items (sku, status, sold_on, sold_at) VALUES (?, 'SOLD', ?, ?)
+                    ON CONFLICT(sku) DO UPDATE SET
+                        status = 'SOLD', sold_on = excluded.sold_on, sold_at = excluded.sold_at
+                    """,
+                    (sku, platform, sold_at),
+                )
+                n += 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return n
+
+    # ----------------------------
+    # Lecturas
+    # ----------------------------
+
+    @staticmethod
+    def _row_to_dict(row) -> Dict[str, Any]:
+        rec: Dict[str, Any] = {"status": row[1]}
+        if row[2] is not None:
+            rec["sold_on"] = row[2]
+        if row[3] is not None:
+            rec["sold_at"] = row[3]
+        if row[4] is not None:
+            rec["platforms"] = json.loads(row[4])
+        return rec
+
+    def get(self, sku: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute(
+            "SELECT sku, status, sold_on, sold_at, platforms FROM items WHERE sku = ?", (sku,)
+        ).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def by_status(self, status: str) -> Dict[str, Dict[str, Any]]:
+        rows = self._conn().execute(
+            "SELECT sku, status, sold_on, sold_at, platforms FROM items WHERE status = ?", (status,)
+        )
+        return {r[0]: self._row_to_dict(r) for r in rows}
+
+    def all(self) -> Dict[str, Dict[str, Any]]:
+        rows = self._conn().execute("SELECT sku, status, sold_on, sold_at, platforms FROM items")
+        return {r[0]: self._row_to_dict(r) for r in rows}
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM items").fetchone()[0]
+
+    def export_json(self, path: Path) -> None:
+        """Vuelca el estado al formato antiguo de state.json (para inspección)."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.all(), f, ensure_ascii=False, indent=2)
+
+
+_DEFAULT: Optional[StateStore] = None
+
+
+def get_store() -> StateStore:
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = StateStore()
+    return _DEFAULT
@@ -1,11 +1,207 @@
+import atexit
+import json
+import os
+import threading
+from collections import deque
 from datetime import datetime
 from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Logging con buffer en memoria y un hilo que escribe en segundo plano.
+#
+# log_accion (y resell.log_line) ya no hacen mkdir + open + write + close por
+# evento: solo agregan la línea a un buffer (no bloquea el event loop de
+# procesar_evento). Un hilo por archivo vacía el buffer cada FLUSH_S segundos
+# o cuando junta FLUSH_N líneas, con el archivo abierto todo el tiempo.
+#
+# - rotación por tamaño (MAX_BYTES) y por día (ROTAR_DIARIO): acciones.log.1, .2, ...
+# - LOG_FORMATO=json escribe JSON lines en <archivo>.jsonl en vez de texto
+# - el buffer es un anillo de BUFFER_MAX líneas: si el disco no da abasto se
+#   descartan las más viejas y se cuentan en `descartadas`
+# - varios procesos escriben el mismo archivo (server_webhook, procesar_cola,
+#   vender): antes de cada escritura se compara el inodo abierto con el del
+#   path y se reabre si otro proceso rotó (como WatchedFileHandler)
+# - si la escritura falla (OSError) las líneas vuelven al buffer
 
 LOG_FILE = Path("logs/acciones.log")
 
+FLUSH_S = 0.5
+FLUSH_N = 1000
+BUFFER_MAX = 100_000
+MAX_BYTES = int(os.environ.get("LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+BACKUPS = 5
+ROTAR_DIARIO = os.environ.get("LOG_ROTAR_DIARIO", "0") == "1"
+FORMATO = os.environ.get("LOG_FORMATO", "texto") # "texto" | "json"
+
+
+class Registro:
+    def __init__(self, path: Path, formato: str = FORMATO, max_bytes: int = MAX_BYTES,
+                 backups: int = BACKUPS, rotar_diario: bool = ROTAR_DIARIO):
+        self.formato = formato
+        self.path = Path(path).with_suffix(".jsonl") if formato == "json" else Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.rotar_diario = rotar_diario
+        self.descartadas = 0
+        self.escritas = 0
+        self._buffer: deque = deque(maxlen=BUFFER_MAX)
+        self._lock = threading.Lock() # protege archivo y rotación
+        self._hay_datos = threading.Event()
+        self._cerrado = False
+        self._fh = None
+        self._dia = datetime.now().date()
+        self._hilo = threading.Thread(target=self._bucle, name=f"log-{self.path.name}", daemon=True)
+        self._hilo.start()
+
+    # ----------------------------
+    # API
+    # ----------------------------
+
+    def escribir(self, texto: str, campos: Optional[Dict[str, Any]] = None) -> None:
+        """Encola una línea (ya con timestamp). No toca el disco."""
+        ts = datetime.now()
+        if len(self._buffer) == self._buffer.maxlen:
+            self.descartadas += 1
+        self._buffer.append((ts, texto, campos))
+        if len(self._buffer) >= FLUSH_N:
+            self._hay_datos.set()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._vaciar()
+
+    def cerrar(self) -> None:
+        self._cerrado = True
+        self._hay_datos.set()
+        self.flush()
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    # ----------------------------
+    # Hilo de escritura
+    # ----------------------------
+
+    def _bucle(self) -> None:
+        while not self._cerrado:
+            self._hay_datos.wait(FLUSH_S)
+            self._hay_datos.clear()
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"⚠️ No pude escribir {self.path}: {e}")
+
+    def _formatear(self, ts: datetime, texto: str, campos: Optional[Dict[str, Any]]) -> str:
+        if self.formato == "json":
+            rec = {"ts": ts.isoformat(timespec="seconds")}
+            rec.update(campos or {"msg": texto})
+            return json.dumps(rec, ensure_ascii=False) + "\n"
+        return f"{ts.strftime('%Y-%m-%d %H:%M:%S')} | {texto}\n"
+
+    def _vaciar(self) -> None:
+        if not self._buffer:
+            return
+        lineas = []
+        while self._buffer:
+            try:
+                lineas.append(self._buffer.popleft())
+            except IndexError:
+                break
+        try:
+            texto = "".join(self._formatear(*linea) for linea in lineas)
+            self._rotar_si_toca()
+            fh = self._abrir()
+            fh.write(texto)
+            fh.flush()
+        except OSError:
+            # de vuelta al principio del buffer para el próximo intento
+            sobran = len(self._buffer) + len(lineas) - self._buffer.maxlen
+            if sobran > 0:
+                self.descartadas += sobran
+            self._buffer.extendleft(reversed(lineas))
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            raise
+        self.escritas += len(lineas)
+
+    def _abrir(self):
+        if self._fh is not None:
+            # otro proceso rotó (o borró) el archivo: seguir escribiendo en el
+            # inodo viejo mandaría las líneas a .1, .2, ... o a un archivo borrado
+            try:
+                st, abierto = os.stat(self.path), os.fstat(self._fh.fileno())
+                vigente = (st.st_ino, st.st_dev) == (abierto.st_ino, abierto.st_dev)
+            except FileNotFoundError:
+                vigente = False
+            if not vigente:
+                self._fh.close()
+                self._fh = None
+        if self._fh is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.path, "a", encoding="utf-8")
+        return self._fh
+
+    def _rotar_si_toca(self) -> None:
+        hoy = datetime.now().date()
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            st = None
+        # por día solo si el archivo es de ayer: si otro proceso ya rotó hoy no
+        # se vuelve a rotar el archivo nuevo
+        por_dia = (self.rotar_diario and hoy != self._dia and st is not None
+                   and datetime.fromtimestamp(st.st_mtime).date() != hoy)
+        por_tamano = self.max_bytes > 0 and st is not None and st.st_size >= self.max_bytes
+        self._dia = hoy
+        if not (por_dia or por_tamano):
+            return
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        for i in range(self.backups - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                os.replace(src, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        try:
+            if self.backups > 0:
+                os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+            else:
+                self.path.unlink()
+        except FileNotFoundError:
+            pass # otro proceso rotó entre el stat y el rename
+
+
+_REGISTROS: Dict[str, Registro] = {}
+_REGISTROS_LOCK = threading.Lock()
+
+
+def obtener_registro(path: Path) -> Registro:
+    key = str(Path(path).resolve())
+    reg = _REGISTROS.get(key)
+    if reg is None:
+        with _REGISTROS_LOCK:
+            reg = _REGISTROS.get(key)
+            if reg is None:
+                reg = Registro(path)
+                _REGISTROS[key] = reg
+    return reg
+
+
+def flush_todo() -> None:
+    for reg in list(_REGISTROS.values()):
+        reg.flush()
+
+
+@atexit.register
+def _cerrar_todo() -> None:
+    for reg in list(_REGISTROS.values()):
+        reg.cerrar()
+
+
 def log_accion(evento: str, sku: str, platform: str, modo: str) -> None:
-    LOG_FILE.parent.mkdir(exist_ok=True)
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    linea = f"{timestamp} | {evento} | {sku} | {platform} | {modo}\n"
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(linea)
\ No newline at end of file
+    obtener_registro(LOG_FILE).escribir(
+        f"{evento} | {sku} | {platform} | {modo}",
+        {"evento": evento, "sku": sku, "platform": platform, "modo": modo},
+    )
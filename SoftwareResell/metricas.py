@@ -0,0 +1,438 @@
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Métricas en memoria estilo Prometheus: contadores e histogramas de latencia.
+#
+# - @cronometrar("procesar_evento") en una función (normal o async) registra
+#   procesar_evento_segundos (histograma) y procesar_evento_total{resultado,
+#   error} (contador); medir(...) hace lo mismo para un bloque con "with"
+# - observar(...) es la forma directa (p. ej. llamadas a la Trading API con
+#   su Ack y código de error)
+# - METRICAS=0 las apaga: cada muestra cuesta una lectura de variable global
+#   (menos de 1 µs, ver benchmarks/bench_metricas.py)
+# - cada proceso vuelca lo suyo a logs/metricas/<pid>-<inicio>.json cada
+#   VOLCAR_CADA_S y al salir; "python resell.py stats" y GET /metrics juntan
+#   todos los volcados
+# - un volcado sin tocar hace más de MUERTO_S es de un proceso que terminó:
+#   al leer se suma a acumulado-*.json y se borra, así el directorio queda
+#   con un archivo por proceso vivo más uno acumulado
+
+ROOT = Path(__file__).resolve().parent
+VOLCADOS_DIR = ROOT / "logs" / "metricas"
+
+ACTIVO = os.environ.get("METRICAS", "1") != "0"
+VOLCAR_CADA_S = 60.0
+MUERTO_S = 5 * VOLCAR_CADA_S # un proceso vivo toca su volcado cada VOLCAR_CADA_S
+BUCKETS_S = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_CO_COROUTINE = 0x80 # inspect.CO_COROUTINE (sin importar inspect, que es pesado)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Contador:
+    __slots__ = ("valor", "_lock")
+
+    def __init__(self):
+        self.valor = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, n: float = 1.0) -> None:
+        with self._lock:
+            self.valor += n
+
+
+class Histograma:
+    __slots__ = ("buckets", "cuentas", "suma", "n", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS_S):
+        self.buckets = buckets
+        self.cuentas = [0] * (len(buckets) + 1) # el último es +Inf
+        self.suma = 0.0
+        self.n = 0
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float) -> None:
+        i = bisect_left(self.buckets, valor)
+        with self._lock:
+            self.cuentas[i] += 1
+            self.suma += valor
+            self.n += 1
+
+
+class Metricas:
+    def __init__(self):
+        self.inicio = time.time()
+        self._familias: Dict[str, Dict[str, Any]] = {} # nombre -> {tipo, ayuda, buckets}
+        self._series: Dict[Tuple[str, Labels], Any] = {}
+        self._lock = threading.Lock()
+        self._volcado_n = 0
+
+    def _serie(self, tipo: str, nombre: str, ayuda: str, labels: Dict[str, Any], buckets=BUCKETS_S):
+        clave = (nombre, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        s = self._series.get(clave)
+        if s is None:
+            with self._lock:
+                s = self._series.get(clave)
+                if s is None:
+                    fam = self._familias.setdefault(nombre, {"tipo": tipo, "ayuda": ayuda, "buckets": list(buckets)})
+                    if fam["tipo"] != tipo:
+                        raise ValueError(f"{nombre} ya está registrada como {fam['tipo']}")
+                    s = Histograma(tuple(fam["buckets"])) if tipo == "histogram" else Contador()
+                    self._series[clave] = s
+        return s
+
+    def contador(self, nombre: str, ayuda: str = "", **labels) -> Contador:
+        return self._serie("counter", nombre, ayuda, labels)
+
+    def histograma(self, nombre: str, ayuda: str = "", buckets: Tuple[float, ...] = BUCKETS_S, **labels) -> Histograma:
+        return self._serie("histogram", nombre, ayuda, labels, buckets)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copia serializable (la que se vuelca a disco y se combina con otros procesos)."""
+        with self._lock:
+            series = list(self._series.items())
+            familias = {k: dict(v) for k, v in self._familias.items()}
+        filas = []
+        for (nombre, labels), s in series:
+            fila: Dict[str, Any] = {"nombre": nombre, "labels": dict(labels)}
+            if isinstance(s, Histograma):
+                with s._lock:
+                    fila.update(cuentas=list(s.cuentas), suma=s.suma, n=s.n)
+            else:
+                fila["valor"] = s.valor
+            filas.append(fila)
+        return {"pid": os.getpid(), "inicio": self.inicio, "ts": time.time(), "familias": familias, "series": filas}
+
+    def muestras(self) -> int:
+        return sum(int(s.n if isinstance(s, Histograma) else s.valor) for s in list(self._series.values()))
+
+    @property
+    def archivo(self) -> Path:
+        return VOLCADOS_DIR / f"{os.getpid()}-{int(self.inicio)}.json"
+
+    def volcar(self, forzar: bool = False) -> Optional[Path]:
+        """Escribe el snapshot de este proceso si cambió desde el último volcado."""
+        n = self.muestras()
+        if not n:
+            return None
+        if n == self._volcado_n and not forzar:
+            try:
+                os.utime(self.archivo) # sigue vivo: que no lo compacten
+            except FileNotFoundError:
+                pass
+            return None
+        VOLCADOS_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = self.archivo.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False)
+        os.replace(tmp, self.archivo)
+        self._volcado_n = n
+        return self.archivo
+
+
+# ----------------------------
+# Registro del proceso
+# ----------------------------
+
+_METRICAS: Optional[Metricas] = None
+_METRICAS_LOCK = threading.Lock()
+
+
+def obtener_metricas() -> Metricas:
+    global _METRICAS
+    if _METRICAS is None:
+        with _METRICAS_LOCK:
+            if _METRICAS is None:
+                _METRICAS = Metricas()
+                threading.Thread(target=_volcar_periodico, name="metricas", daemon=True).start()
+    return _METRICAS
+
+
+def _volcar_periodico() -> None:
+    while True:
+        time.sleep(VOLCAR_CADA_S)
+        try:
+            obtener_metricas().volcar()
+        except OSError as e:
+            print(f"⚠️ No pude volcar métricas: {e}")
+
+
+@atexit.register
+def _volcar_al_salir() -> None:
+    if _METRICAS is not None:
+        try:
+            _METRICAS.volcar()
+        except OSError:
+            pass
+
+
+def activar(valor: bool = True) -> None:
+    global ACTIVO
+    ACTIVO = valor
+
+
+# ----------------------------
+# Instrumentación
+# ----------------------------
+
+def observar(nombre: str, segundos: float, labels: Optional[Dict[str, Any]] = None, **detalle) -> None:
+    """
+    Una muestra: <nombre>_segundos{labels} (histograma) y
+    <nombre>_total{labels, detalle} (contador). `detalle` es para lo que solo
+    interesa contar (ack, código de error, status HTTP).
+    """
+    if not ACTIVO:
+        return
+    clave = (nombre, tuple(labels.items()) if labels else (), tuple(detalle.items()))
+    series = _OBSERVAR.get(clave)
+    if series is None:
+        m = obtener_metricas()
+        labels = labels or {}
+        series = _OBSERVAR[clave] = (
+            m.histograma(f"{nombre}_segundos", f"Latencia de {nombre}", **labels),
+            m.contador(f"{nombre}_total", f"Llamadas a {nombre}", **labels, **detalle),
+        )
+    series[0].observar(segundos)
+    series[1].inc()
+
+
+_OBSERVAR: Dict[tuple, Tuple[Histograma, Contador]] = {} # (nombre, labels, detalle) -> series
+
+
+def _tipo_error(e: BaseException) -> str:
+    return type(e).__name__
+
+
+def cronometrar(nombre: str) -> Callable[[Callable], Callable]:
+    """Decorador para funciones normales y async (ver comentario del módulo)."""
+    def deco(fn: Callable) -> Callable:
+        m = obtener_metricas()
+        hist = m.histograma(f"{nombre}_segundos", f"Latencia de {nombre}")
+        ok = m.contador(f"{nombre}_total", f"Llamadas a {nombre}", resultado="ok", error="")
+
+        def fallo(t0: float, e: BaseException) -> None:
+            hist.observar(time.perf_counter() - t0)
+            m.contador(f"{nombre}_total", resultado="error", error=_tipo_error(e)).inc()
+
+        if fn.__code__.co_flags & _CO_COROUTINE:
+            @wraps(fn)
+            async def envoltura_async(*args, **kwargs):
+                if not ACTIVO:
+                    return await fn(*args, **kwargs)
+                t0 = time.perf_counter()
+                try:
+                    r = await fn(*args, **kwargs)
+                except BaseException as e:
+                    fallo(t0, e)
+                    raise
+                hist.observar(time.perf_counter() - t0)
+                ok.inc()
+                return r
+            return envoltura_async
+
+        @wraps(fn)
+        def envoltura(*args, **kwargs):
+            if not ACTIVO:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                r = fn(*args, **kwargs)
+            except BaseException as e:
+                fallo(t0, e)
+                raise
+            hist.observar(time.perf_counter() - t0)
+            ok.inc()
+            return r
+        return envoltura
+    return deco
+
+
+class medir:
+    """with medir("render_drafts", plataforma="depop"): ..."""
+    __slots__ = ("nombre", "labels", "t0")
+
+    def __init__(self, nombre: str, **labels):
+        self.nombre = nombre
+        self.labels = labels
+        self.t0 = 0.0
+
+    def __enter__(self) -> "medir":
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, tb) -> None:
+        if ACTIVO:
+            observar(self.nombre, time.perf_counter() - self.t0, self.labels,
+                     resultado="error" if valor is not None else "ok",
+                     error=_tipo_error(valor) if valor is not None else "")
+
+
+# ----------------------------
+# Volcados de todos los procesos
+# ----------------------------
+
+def _leer(p: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(p, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None # a medio escribir, roto o ya compactado por otro: se ignora
+
+
+def compactar(propio: Optional[Path] = None) -> int:
+    """
+    Suma los volcados de procesos terminados (y los acumulados anteriores) en
+    un acumulado-*.json nuevo y los borra. Devuelve cuántos volcados juntó.
+
+    Cada archivo se reclama con un rename antes de leerlo: si dos procesos
+    compactan a la vez, ninguno suma un volcado que ya sumó el otro.
+    """
+    if not VOLCADOS_DIR.exists():
+        return 0
+    limite = time.time() - MUERTO_S
+    muertos = []
+    for p in VOLCADOS_DIR.glob("*.json"):
+        if p == propio or p.name.startswith("acumulado-"):
+            continue
+        try:
+            if p.stat().st_mtime < limite:
+                muertos.append(p)
+        except FileNotFoundError:
+            continue
+    if not muertos:
+        return 0
+    reclamados = []
+    for p in muertos + sorted(VOLCADOS_DIR.glob("acumulado-*.json")):
+        destino = p.with_suffix(".compactando")
+        try:
+            os.replace(p, destino)
+        except FileNotFoundError:
+            continue # lo reclamó otro
+        reclamados.append(destino)
+    snaps = [s for s in map(_leer, reclamados) if s is not None]
+    if snaps:
+        datos = combinar(snaps)
+        acumulado = VOLCADOS_DIR / f"acumulado-{os.getpid()}-{time.time_ns()}.json"
+        tmp = acumulado.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"pid": 0, "inicio": datos["desde"], "ts": time.time(), "procesos": datos["procesos"],
+                       "familias": datos["familias"], "series": datos["series"]}, f, ensure_ascii=False)
+        os.replace(tmp, acumulado)
+    # recién ahora: un corte antes de esto deja .compactando (que no se leen), nunca doble conteo
+    for p in reclamados:
+        try:
+            p.unlink()
+        except FileNotFoundError:
+            pass
+    return sum(1 for p in reclamados if not p.name.startswith("acumulado-"))
+
+
+def leer_volcados(incluir_propio: bool = True) -> List[Dict[str, Any]]:
+    """Snapshots de logs/metricas/ (el de este proceso, en vivo en vez del archivo)."""
+    propio = obtener_metricas().archivo if _METRICAS is not None else None
+    snaps = []
+    if VOLCADOS_DIR.exists():
+        try:
+            compactar(propio)
+        except OSError as e:
+            print(f"⚠️ No pude compactar volcados de métricas: {e}")
+        for p in sorted(VOLCADOS_DIR.glob("*.json")):
+            if p == propio:
+                continue
+            snap = _leer(p)
+            if snap is not None:
+                snaps.append(snap)
+    if incluir_propio and _METRICAS is not None and _METRICAS.muestras():
+        snaps.append(_METRICAS.snapshot())
+    return snaps
+
+
+def combinar(snaps: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Suma contadores e histogramas serie por serie."""
+    familias: Dict[str, Dict[str, Any]] = {}
+    series: Dict[Tuple[str, Labels], Dict[str, Any]] = {}
+    procesos = 0
+    desde = 0.0
+    for snap in snaps:
+        procesos += snap.get("procesos", 1) # un acumulado cuenta todos los que juntó
+        desde = min(desde or snap["inicio"], snap["inicio"])
+        for nombre, fam in snap["familias"].items():
+            familias.setdefault(nombre, fam)
+        for fila in snap["series"]:
+            clave = (fila["nombre"], tuple(sorted(fila["labels"].items())))
+            acc = series.get(clave)
+            if acc is None:
+                series[clave] = json.loads(json.dumps(fila))
+            elif "cuentas" in fila and len(fila["cuentas"]) == len(acc["cuentas"]):
+                acc["cuentas"] = [a + b for a, b in zip(acc["cuentas"], fila["cuentas"])]
+                acc["suma"] += fila["suma"]
+                acc["n"] += fila["n"]
+            elif "valor" in fila:
+                acc["valor"] += fila["valor"]
+    return {"procesos": procesos, "desde": desde, "familias": familias,
+            "series": [series[k] for k in sorted(series)]}
+
+
+def percentil(buckets: List[float], cuentas: List[int], p: float) -> float:
+    """Percentil estimado desde los buckets (interpolando dentro del bucket)."""
+    n = sum(cuentas)
+    if not n:
+        return 0.0
+    objetivo = p / 100 * n
+    acumulado = 0
+    for i, c in enumerate(cuentas):
+        if c and acumulado + c >= objetivo:
+            bajo = buckets[i - 1] if i > 0 else 0.0
+            alto = buckets[i] if i < len(buckets) else buckets[-1]
+            return bajo + (alto - bajo) * (objetivo - acumulado) / c
+        acumulado += c
+    return buckets[-1]
+
+
+def _fmt_labels(labels: Dict[str, Any], le: str = "") -> str:
+    partes = [f'{k}="{_escapar(v)}"' for k, v in labels.items()]
+    if le:
+        partes.append(f'le="{le}"')
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _escapar(v: Any) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def formato_prometheus(datos: Dict[str, Any]) -> str:
+    """Formato de texto de Prometheus (version 0.0.4)."""
+    lineas: List[str] = []
+    por_familia: Dict[str, List[Dict[str, Any]]] = {}
+    for fila in datos["series"]:
+        por_familia.setdefault(fila["nombre"], []).append(fila)
+    for nombre, filas in por_familia.items():
+        fam = datos["familias"].get(nombre, {})
+        if fam.get("ayuda"):
+            lineas.append(f"# HELP {nombre} {fam['ayuda']}")
+        lineas.append(f"# TYPE {nombre} {fam.get('tipo', 'counter')}")
+        for fila in filas:
+            labels = fila["labels"]
+            if "cuentas" not in fila:
+                lineas.append(f"{nombre}{_fmt_labels(labels)} {fila['valor']:g}")
+                continue
+            acumulado = 0
+            for le, c in zip(list(fam.get("buckets", BUCKETS_S)) + ["+Inf"], fila["cuentas"]):
+                acumulado += c
+                lineas.append(f"{nombre}_bucket{_fmt_labels(labels, str(le))} {acumulado}")
+            lineas.append(f"{nombre}_sum{_fmt_labels(labels)} {fila['suma']:.6f}")
+            lineas.append(f"{nombre}_count{_fmt_labels(labels)} {fila['n']}")
+    return "\n".join(lineas) + "\n"
+
+
+def exponer() -> str:
+    """Texto para GET /metrics: este proceso + los volcados de los demás."""
+    return formato_prometheus(combinar(leer_volcados()))
@@ -0,0 +1,240 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from string import Template
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from metricas import cronometrar
+
+# Motor único de drafts para Depop/Poshmark.
+#
+# Las plantillas viven en templates/<plataforma>.txt (editables a mano) y se
+# compilan una sola vez por proceso (se recompilan solo si cambia el mtime).
+# Cada plantilla se parte en bloques y líneas con sus variables ya
+# detectadas, así renderizar es solo sustituir y filtrar, sin reconstruir
+# strings línea por línea en código.
+
+TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+PLATAFORMAS = ("depop", "posh")
+
+_WS = re.compile(r"\s+")
+_NO_ALNUM = re.compile(r"[^a-z0-9\s]")
+_TAGS = re.compile(r"<[^>]+>")
+_BR = re.compile(r"<br\s*/?>", re.IGNORECASE)
+_P_END = re.compile(r"</p\s*>", re.IGNORECASE)
+_STOPWORDS = frozenset({
+    "the", "and", "for", "with", "mens", "men", "women", "womens", "size",
+    "new", "like", "condition", "no", "not", "very", "good", "great", "nice",
+})
+
+# Línea compilada: (str.format equivalente, variables que usa)
+_Linea = Tuple[str, Tuple[str, ...]]
+_COMPILADAS: Dict[str, Tuple[float, List[List[_Linea]]]] = {}
+
+
+# ----------------------------
+# Utilidades de texto
+# ----------------------------
+
+def _norm(s: Any) -> str:
+    return _WS.sub(" ", str(s or "")).strip()
+
+def strip_html(html: str) -> str:
+    if not html:
+        return ""
+    html = _BR.sub("\n", html)
+    html = _P_END.sub("\n", html)
+    html = _TAGS.sub("", html)
+    html = html.replace("&nbsp;", " ").replace("&amp;", "&")
+    html = html.replace("&lt;", "<").replace("&gt;", ">").replace("&quot;", '"')
+    return _norm(html)
+
+def hashtags(*parts: str, limit: int = 18) -> List[str]:
+    raw = " ".join([p for p in parts if p]).lower().replace("&", "and")
+    raw = _NO_ALNUM.sub(" ", raw)
+    tags: List[str] = []
+    seen = set()
+    for w in raw.split():
+        if not 2 <= len(w) <= 18 or w in _STOPWORDS or w in seen or w.isdigit():
+            continue
+        seen.add(w)
+        tags.append("#" + w)
+        if len(tags) >= limit:
+            break
+    return tags
+
+
+# ----------------------------
+# Compilación de plantillas
+# ----------------------------
+
+def _llaves(texto: str) -> str:
+    return texto.replace("{", "{{").replace("}", "}}")
+
+def _compilar_linea(linea: str) -> _Linea:
+    """$var / ${var} -> {var}; $$ -> $; llaves literales escapadas (solo fuera de las variables)."""
+    partes: List[str] = []
+    nombres: List[str] = []
+    i = 0
+    for m in Template.pattern.finditer(linea):
+        partes.append(_llaves(linea[i:m.start()]))
+        nombre = m.group("named") or m.group("braced")
+        if nombre:
+            nombres.append(nombre)
+            partes.append("{" + nombre + "}")
+        else: # $$ o un $ suelto
+            partes.append("$")
+        i = m.end()
+    partes.append(_llaves(linea[i:]))
+    return "".join(partes), tuple(nombres)
+
+def _compilar(texto: str) -> List[List[_Linea]]:
+    bloques: List[List[_Linea]] = [[]]
+    for linea in texto.splitlines():
+        if linea.startswith("##"):
+            continue
+        if not linea.strip():
+            if bloques[-1]:
+                bloques.append([])
+            continue
+        bloques[-1].append(_compilar_linea(linea))
+    return [b for b in bloques if b]
+
+def plantilla(plataforma: str) -> List[List[_Linea]]:
+    path = TEMPLATES_DIR / f"{plataforma}.txt"
+    mtime = path.stat().st_mtime
+    cached = _COMPILADAS.get(plataforma)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, _compilar(path.read_text(encoding="utf-8")))
+        _COMPILADAS[plataforma] = cached
+    return cached[1]
+
+
+# ----------------------------
+# Contexto por item
+# ----------------------------
+
+def _specs(item: Dict[str, Any]) -> Dict[str, str]:
+    # generar_drafts usa "itemSpecifics", resell usa "specifics"
+    return item.get("itemSpecifics") or item.get("specifics") or item.get("item_specifics") or {}
+
+def _pick(specs: Dict[str, str], keys: Iterable[str]) -> str:
+    for k in keys:
+        v = specs.get(k)
+        if isinstance(v, str) and v.strip():
+            return _norm(v)
+    return ""
+
+class _Ctx(dict):
+    # variables desconocidas en una plantilla editada a mano quedan vacías
+    def __missing__(self, key):
+        return ""
+
+_SIZE_KEYS = {
+    "depop": ["Size", "Size Type", "Waist Size", "Inseam"],
+    "posh": ["Size", "Waist Size", "Inseam"],
+}
+
+def _contexto_base(item: Dict[str, Any]) -> Dict[str, str]:
+    """Variables comunes a todas las plataformas (se calculan una vez por item)."""
+    specs = _specs(item)
+    title = _norm(item.get("title", ""))
+    price = _norm(item.get("price", ""))
+    currency = _norm(item.get("currency", ""))
+    desc = item.get("description_text")
+    if desc is None:
+        desc = item.get("description", "")
+    desc = _norm(desc)
+    photos = [p for p in (item.get("photos") or item.get("pictures") or []) if isinstance(p, str) and p.strip()]
+
+    brand = _pick(specs, ["Brand"]) or _norm(item.get("brand", ""))
+    color = _pick(specs, ["Color", "Colour"])
+    material = _pick(specs, ["Material", "Fabric Type"])
+    style = _pick(specs, ["Style", "Fit", "Type"])
+    dept = _pick(specs, ["Department"])
+
+    return {
+        "title": title,
+        "brand": brand, "color": color,
+        "material": material, "style": style, "dept": dept,
+        "price": f"{currency} {price}".strip() if price else "",
+        "condition": _norm(item.get("condition", "")),
+        "details": desc[:450],
+        "description": desc[:900],
+        "top_photos": "\n".join(photos[:4]),
+        "photos": "\n".join(photos),
+        "meta_extra": " | ".join(x for x in [
+            f"Material: {material}" if material else "",
+            f"Style/Fit: {style}" if style else "",
+            f"Dept: {dept}" if dept else "",
+        ] if x),
+        "hashtags": " ".join(hashtags(title, brand, color, material, style, dept, limit=18)),
+        "_specs": specs,
+    }
+
+def contexto(plataforma: str, item: Dict[str, Any], base: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+    base = base if base is not None else _contexto_base(item)
+    ctx = _Ctx(base)
+    size = _pick(base["_specs"], _SIZE_KEYS.get(plataforma, _SIZE_KEYS["posh"]))
+    ctx["size"] = size
+    ctx["meta_basic"] = " | ".join(x for x in [
+        f"Brand: {base['brand']}" if base["brand"] else "",
+        f"Size: {size}" if size else "",
+        f"Color: {base['color']}" if base["color"] else "",
+    ] if x)
+    return ctx
+
+
+# ----------------------------
+# Render
+# ----------------------------
+
+@cronometrar("render_draft")
+def render(plataforma: str, item: Dict[str, Any], base: Optional[Dict[str, Any]] = None) -> str:
+    ctx = contexto(plataforma, item, base)
+    salida: List[str] = []
+    for bloque in plantilla(plataforma):
+        lineas: List[str] = []
+        con_vars = 0
+        con_valor = 0
+        for fmt, nombres in bloque:
+            if nombres:
+                con_vars += 1
+                if not any(ctx.get(n) for n in nombres):
+                    continue
+                con_valor += 1
+            lineas.append(fmt.format_map(ctx))
+        if con_vars and not con_valor:
+            continue
+        salida.append("\n".join(lineas))
+    return "\n\n".join(salida)
+
+def render_item(item: Dict[str, Any], plataformas: Tuple[str, ...] = PLATAFORMAS) -> Dict[str, str]:
+    out = {"item_id": str(item.get("item_id", ""))}
+    base = _contexto_base(item)
+    for p in plataformas:
+        out[p] = render(p, item, base)
+    return out
+
+def _render_chunk(args) -> List[Dict[str, str]]:
+    items, plataformas = args
+    return [render_item(it, plataformas) for it in items]
+
+def render_batch(items: List[Dict[str, Any]], plataformas: Tuple[str, ...] = PLATAFORMAS,
+                 procesos: Optional[int] = None, chunk: int = 500) -> List[Dict[str, str]]:
+    """
+    Renderiza muchos items de una vez. Con procesos > 1 reparte en un pool de
+    procesos (cada proceso compila las plantillas una sola vez). Conserva el orden.
+    """
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+    if procesos <= 1 or len(items) < chunk * 2:
+        return _render_chunk((items, plataformas))
+
+    partes = [(items[i:i + chunk], plataformas) for i in range(0, len(items), chunk)]
+    out: List[Dict[str, str]] = []
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        for res in pool.map(_render_chunk, partes):
+            out.extend(res)
+    return out
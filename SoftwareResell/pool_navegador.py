@@ -0,0 +1,197 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Pool de navegador "tibio" por plataforma.
+#
+# Antes cada borrado lanzaba Playwright + Chromium con el perfil, hacía una
+# búsqueda y cerraba todo (varios segundos por item; Poshmark además
+# esperaba 60s fijos para el login). Ahora se abre UN contexto persistente
+# por perfil (perfil_depop, perfil_poshmark) la primera vez, se mantienen N
+# páginas abiertas y se reutilizan para toda la cola de SKUs.
+#
+# La sesión se detecta esperando un selector que solo existe con la cuenta
+# iniciada, no con sleeps fijos.
+
+HEADLESS = os.environ.get("PLAYWRIGHT_HEADLESS", "0") == "1"
+CHANNEL = os.environ.get("PLAYWRIGHT_CHANNEL", "chrome") or None
+PAGINAS_POR_PERFIL = int(os.environ.get("PLAYWRIGHT_PAGES", "2"))
+LOGIN_TIMEOUT_MS = 5 * 60 * 1000 # tiempo máximo para iniciar sesión a mano
+
+PLATAFORMAS: Dict[str, Dict[str, str]] = {
+    "depop": {
+        "perfil": "perfil_depop",
+        "base_url": os.environ.get("DEPOP_BASE_URL", "https://www.depop.com"),
+        "inventario": "/products/manage/",
+        "login": "/login/",
+        # la barra de búsqueda del inventario solo aparece con sesión iniciada
+        "sesion": 'input[id*="search"], [role="searchbox"]',
+        "buscar": 'input[id*="search"], [role="searchbox"]',
+    },
+    "poshmark": {
+        "perfil": "perfil_poshmark",
+        "base_url": os.environ.get("POSHMARK_BASE_URL", "https://poshmark.com"),
+        "inventario": "/feed",
+        "login": "/login",
+        "sesion": 'a[href*="/closet/"]',
+        "buscar": 'input[name="query"], input[type="search"]',
+    },
+}
+
+
+class PoolNavegador:
+    def __init__(self, plataforma: str, paginas: int = PAGINAS_POR_PERFIL,
+                 headless: bool = HEADLESS, channel: Optional[str] = CHANNEL,
+                 perfil_dir: Optional[str] = None):
+        self.plataforma = plataforma
+        self.cfg = PLATAFORMAS[plataforma]
+        self.n_paginas = max(1, paginas)
+        self.headless = headless
+        self.channel = channel
+        self.perfil_dir = perfil_dir or os.path.join(os.getcwd(), self.cfg["perfil"])
+        self._pw = None
+        self._context = None
+        self._libres: "asyncio.Queue" = asyncio.Queue()
+        self._lock = asyncio.Lock()
+        self._sesion_ok = False
+        self.latencias_ms: List[float] = []
+
+    def url(self, ruta: str) -> str:
+        return self.cfg["base_url"].rstrip("/") + ruta
+
+    # ----------------------------
+    # Ciclo de vida
+    # ----------------------------
+
+    async def start(self) -> None:
+        async with self._lock:
+            if self._context is not None:
+                return
+            from playwright.async_api import async_playwright
+
+            t0 = time.perf_counter()
+            self._pw = await async_playwright().start()
+            kwargs: Dict[str, Any] = {
+                "user_data_dir": self.perfil_dir,
+                "headless": self.headless,
+                "viewport": {"width": 1920, "height": 1080},
+                "args": ["--disable-blink-features=AutomationControlled"],
+            }
+            if self.channel:
+                kwargs["channel"] = self.channel
+            self._context = await self._pw.chromium.launch_persistent_context(**kwargs)
+
+            paginas = list(self._context.pages)
+            while len(paginas) < self.n_paginas:
+                paginas.append(await self._context.new_page())
+            for p in paginas[: self.n_paginas]:
+                self._libres.put_nowait(p)
+            print(f"🌐 {self.plataforma}: navegador listo en {(time.perf_counter() - t0):.1f}s "
+                  f"({self.n_paginas} páginas)")
+
+    async def close(self) -> None:
+        async with self._lock:
+            if self._context is not None:
+                await self._context.close()
+            if self._pw is not None:
+                await self._pw.stop()
+            self._context = None
+            self._pw = None
+            self._libres = asyncio.Queue()
+            self._sesion_ok = False
+
+    @asynccontextmanager
+    async def pagina(self):
+        await self.start()
+        page = await self._libres.get()
+        try:
+            yield page
+        finally:
+            self._libres.put_nowait(page)
+
+    # ----------------------------
+    # Sesión
+    # ----------------------------
+
+    async def asegurar_sesion(self, page) -> None:
+        """Abre el inventario y espera el selector de sesión iniciada.
+
+        Si el perfil ya tiene la sesión, vuelve apenas aparece el selector.
+        Si no, deja la ventana en el login hasta que el usuario entre
+        (máximo LOGIN_TIMEOUT_MS), sin esperas fijas.
+        """
+        if self._sesion_ok:
+            return
+        await page.goto(self.url(self.cfg["inventario"]), wait_until="domcontentloaded", timeout=60000)
+        sesion = page.locator(self.cfg["sesion"]).first
+        try:
+            await sesion.wait_for(state="visible", timeout=10000)
+        except Exception:
+            print(f"⚠️ {self.plataforma}: inicia sesión manualmente en la ventana que se abrió.")
+            print("⏳ El bot sigue solo en cuanto detecte la sesión...")
+            await sesion.wait_for(state="visible", timeout=LOGIN_TIMEOUT_MS)
+        self._sesion_ok = True
+
+    # ----------------------------
+    # Acciones
+    # ----------------------------
+
+    async def buscar(self, page, nombre_item: str) -> None:
+        if not page.url.startswith(self.url(self.cfg["inventario"])):
+            await page.goto(self.url(self.cfg["inventario"]), wait_until="domcontentloaded", timeout=60000)
+        search_bar = page.locator(self.cfg["buscar"]).first
+        await search_bar.wait_for(state="visible", timeout=20000)
+        await search_bar.fill(nombre_item)
+        await search_bar.press("Enter")
+        await page.wait_for_load_state("domcontentloaded")
+
+    async def ejecutar(self, nombre_item: str,
+                       accion: Optional[Callable[["PoolNavegador", Any, str], Awaitable[None]]] = None) -> float:
+        """Corre `accion` (por defecto: buscar) sobre una página del pool. Devuelve ms."""
+        accion = accion or (lambda pool, page, item: pool.buscar(page, item))
+        async with self.pagina() as page:
+            t0 = time.perf_counter()
+            await self.asegurar_sesion(page)
+            await accion(self, page, nombre_item)
+            ms = (time.perf_counter() - t0) * 1000
+        self.latencias_ms.append(ms)
+        return ms
+
+    async def procesar(self, skus: List[str], accion=None) -> List[Dict[str, Any]]:
+        """Procesa una cola de SKUs repartida entre las páginas abiertas."""
+        await self.start()
+        cola: "asyncio.Queue" = asyncio.Queue()
+        for s in skus:
+            cola.put_nowait(s)
+        resultados: List[Dict[str, Any]] = []
+
+        async def worker():
+            while not cola.empty():
+                sku = cola.get_nowait()
+                try:
+                    ms = await self.ejecutar(sku, accion)
+                    resultados.append({"sku": sku, "ok": True, "ms": ms})
+                except Exception as e:
+                    resultados.append({"sku": sku, "ok": False, "error": str(e)})
+
+        await asyncio.gather(*(worker() for _ in range(self.n_paginas)))
+        return resultados
+
+
+_POOLS: Dict[str, PoolNavegador] = {}
+
+
+def obtener_pool(plataforma: str) -> PoolNavegador:
+    pool = _POOLS.get(plataforma)
+    if pool is None:
+        pool = PoolNavegador(plataforma)
+        _POOLS[plataforma] = pool
+    return pool
+
+
+async def cerrar_pools() -> None:
+    pools = list(_POOLS.values())
+    _POOLS.clear()
+    await asyncio.gather(*(p.close() for p in pools), return_exceptions=True)
@@ -1,52 +1,208 @@
 import csv
 import asyncio
+import json
+import os
+import socket
+import sys
 from pathlib import Path
 from Cerebro_v2 import procesar_evento
+from pool_navegador import cerrar_pools
+from dedup import obtener_indice
+from cola import COLA_VENTAS, lease_renovado, obtener_cola
 
-COLA = Path("cola_ventas.csv")
+COLA = Path("cola_ventas.csv") # legado: se pasa a inventory/cola.db
 PROCESADAS = Path("logs/cola_procesada.csv")
+CHECKPOINT = Path("logs/cola_offset.json") # bytes de cola_ventas.csv ya encolados (o procesados, formato legado)
 
-async def main():
+WORKERS = 4 # eventos en paralelo
+ESPERA_VACIA_S = 1.0 # con --seguir: cada cuánto mirar si entró algo
+CONFIRMAR_CADA = 500 # ventas entre escrituras al log de procesadas
+IMPORTAR_LOTE = 1000 # filas de cola_ventas.csv por transacción al importar
+
+# Uso:
+# python procesar_cola.py [--workers N]   procesa lo que haya y termina
+# python procesar_cola.py --seguir         queda escuchando (se pueden correr varios a la vez)
+# python procesar_cola.py --muertos        lista los trabajos en dead-letter
+# python procesar_cola.py --revivir        los devuelve a la cola
+#
+# Las ventas viven en la cola persistente de cola.py (inventory/cola.db):
+# server_webhook.py y vender.py encolan, este script consume. Cada venta se
+# toma con un lease; si el proceso se corta a mitad de camino, el lease vence
+# y la venta se vuelve a entregar (at-least-once). El dedup de Cerebro_v2
+# reclama cada evento a nombre del trabajo y lo da por hecho recién al
+# terminar: la re-entrega del mismo trabajo se procesa de nuevo, y otro
+# trabajo con la misma venta (reintento del webhook) se descarta. Lo que
+# falla se reintenta con backoff y después de varios intentos queda en
+# dead-letter (benchmarks/check_reentrega.py mata un consumidor a mitad de
+# una venta y verifica que la re-entrega la completa).
+#
+# Si todavía existe cola_ventas.csv con filas, se importa primero.
+
+def importar_csv_legado() -> int:
+    """Pasa las filas de cola_ventas.csv a la cola persistente y deja el CSV vacío."""
+    importando = COLA.with_suffix(".importando")
+    n = 0
+    if importando.exists():
+        # una corrida anterior se cortó entre el rename y el encolar (si llegó
+        # a encolar, el dedup de Cerebro_v2 descarta lo repetido)
+        n += _importar_archivo(importando)
+    if not COLA.exists() or COLA.stat().st_size <= len("sku,platform\n"):
+        return n
+    # se renombra antes de leer: lo que un productor viejo agregue después
+    # cae en un cola_ventas.csv nuevo y entra en la próxima corrida
+    os.replace(COLA, importando)
+    n += _importar_archivo(importando)
     if not COLA.exists():
-        print("❌ No existe cola_ventas.csv")
-        return
+        with open(COLA, "w", encoding="utf-8", newline="") as f:
+            f.write("sku,platform\n")
+    return n
 
-    with open(COLA, "r", encoding="utf-8", newline="") as f:
-        filas = list(csv.DictReader(f))
+def _importar_archivo(importando: Path) -> int:
+    offset = 0
+    if CHECKPOINT.exists():
+        try:
+            with open(CHECKPOINT, "r", encoding="utf-8") as f:
+                offset = int(json.load(f).get("offset", 0))
+        except (ValueError, OSError):
+            offset = 0
 
-    if not filas:
-        print("📭 No hay ventas en cola.")
-        return
+    # línea por línea y en lotes de IMPORTAR_LOTE: memoria acotada aunque el
+    # archivo tenga millones de filas. Después de cada lote el checkpoint
+    # guarda hasta qué byte se encoló, así un corte no vuelve a encolar todo
+    cola = obtener_cola()
+    n = 0
+    eventos = []
+    with open(importando, "rb") as f:
+        pos = offset
+        if offset:
+            # un offset a mitad de línea saltea esa línea (como antes)
+            f.seek(offset - 1)
+            if f.read(1) != b"\n":
+                pos += len(f.readline())
+        for linea in f:
+            pos += len(linea)
+            # la última línea puede venir sin \n: se importa igual
+            row = next(csv.reader([linea.decode("utf-8", errors="replace")]), [])
+            sku = (row[0] if len(row) > 0 else "").strip()
+            platform = (row[1] if len(row) > 1 else "").strip().lower()
+            if sku and platform and (sku, platform) != ("sku", "platform"):
+                eventos.append({"event": "ITEM_SOLD", "platform": platform, "sku": sku})
+            if len(eventos) >= IMPORTAR_LOTE:
+                n += cola.encolar_muchos(eventos)
+                eventos = []
+                _guardar_offset(pos)
+    if eventos:
+        n += cola.encolar_muchos(eventos)
+    importando.unlink()
+    if CHECKPOINT.exists():
+        CHECKPOINT.unlink()
+    return n
 
-    pendientes = []
-    for fila in filas:
-        sku = (fila.get("sku") or "").strip()
-        platform = (fila.get("platform") or "").strip().lower()
-        if sku and platform:
-            pendientes.append({"sku": sku, "platform": platform})
+def _guardar_offset(pos: int) -> None:
+    CHECKPOINT.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CHECKPOINT.with_name(CHECKPOINT.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"offset": pos}, f)
+    os.replace(tmp, CHECKPOINT)
 
-    if not pendientes:
-        print("📭 No hay filas válidas en cola.")
-        return
+async def main(workers: int = WORKERS, seguir: bool = False):
+    cola = obtener_cola()
+    importadas = importar_csv_legado()
+    if importadas:
+        print(f"📥 Importadas {importadas} ventas de {COLA} a la cola persistente")
 
-    for v in pendientes:
-        evento = {"event": "ITEM_SOLD", "platform": v["platform"], "sku": v["sku"]}
-        await procesar_evento(evento)
-        _guardar_procesada(v["sku"], v["platform"])
+    consumidor = f"{socket.gethostname()}:{os.getpid()}"
+    procesadas_buffer = []
+    hechas = 0
+    fallidas = 0
+    muertas = 0
 
-    with open(COLA, "w", encoding="utf-8", newline="") as f:
-        f.write("sku,platform\n")
+    async def worker(n: int):
+        nonlocal hechas, fallidas, muertas
+        while True:
+            # SQLite es rápido, pero BEGIN IMMEDIATE puede esperar a otro proceso
+            trabajos = await asyncio.to_thread(cola.tomar, f"{consumidor}/{n}", 1, COLA_VENTAS)
+            if not trabajos:
+                if not seguir:
+                    return
+                await asyncio.sleep(ESPERA_VACIA_S)
+                continue
+            trabajo = trabajos[0]
+            evento = trabajo.payload
+            try:
+                # el lease se renueva mientras dura el delist (login + deadline)
+                async with lease_renovado(cola, trabajo):
+                    await procesar_evento(evento, trabajo.id)
+            except Exception as e:
+                estado = await asyncio.to_thread(cola.fallar, trabajo, str(e) or type(e).__name__,
+                                                 payload=getattr(e, "payload_reintento", None))
+                fallidas += 1
+                if estado == "muerto":
+                    muertas += 1
+                    print(f"☠️ {evento.get('sku')} pasó a dead-letter tras {trabajo.intentos} intentos: {e}")
+                else:
+                    print(f"❌ Error procesando {evento.get('sku')} (intento {trabajo.intentos}, se reintenta): {e}")
+                continue
+            await asyncio.to_thread(cola.confirmar, trabajo)
+            procesadas_buffer.append((evento.get("sku", ""), evento.get("platform", "")))
+            hechas += 1
+            if len(procesadas_buffer) >= CONFIRMAR_CADA:
+                _guardar_procesadas(procesadas_buffer)
+                procesadas_buffer.clear()
 
-    print("✅ Cola procesada y limpiada.")
+    try:
+        await asyncio.gather(*(worker(n) for n in range(max(1, workers))))
+    finally:
+        if procesadas_buffer:
+            _guardar_procesadas(procesadas_buffer)
 
-def _guardar_procesada(sku, platform):
+    s = cola.stats()
+    if hechas == 0 and fallidas == 0:
+        print("📭 No hay ventas en cola.")
+    else:
+        d = obtener_indice().stats()
+        print(f"♻️ Dedup: {d['hits']} duplicados / {d['misses']} nuevos "
+              f"({d['delists_evitados']} delists evitados)")
+        print(f"✅ Procesadas {hechas} ventas ({fallidas} fallos, {muertas} a dead-letter).")
+    if s["pending"] or s["in_flight"] or s["dead"]:
+        print(f"📦 Cola: {s['pending']} pendientes (reintentos con backoff incluidos), "
+              f"{s['in_flight']} tomadas por otro consumidor, {s['dead']} en dead-letter")
+
+def _guardar_procesadas(filas):
     PROCESADAS.parent.mkdir(exist_ok=True)
     existe = PROCESADAS.exists()
     with open(PROCESADAS, "a", encoding="utf-8", newline="") as f:
         w = csv.writer(f)
         if not existe:
             w.writerow(["sku", "platform"])
-        w.writerow([sku, platform])
+        w.writerows(filas)
+
+def _muertos(revivir: bool) -> None:
+    cola = obtener_cola()
+    if revivir:
+        print(f"🔁 {cola.revivir()} trabajos devueltos a la cola")
+        return
+    muertos = cola.muertos()
+    if not muertos:
+        print("📭 No hay trabajos en dead-letter.")
+    for m in muertos:
+        p = m["payload"]
+        print(f"☠️ #{m['id']} {p.get('sku')} {p.get('platform')} ({m['intentos']} intentos): {m['error'][:120]}")
+
+async def _run():
+    workers = WORKERS
+    if "--workers" in sys.argv:
+        workers = int(sys.argv[sys.argv.index("--workers") + 1])
+    try:
+        await main(workers, seguir="--seguir" in sys.argv)
+    finally:
+        await cerrar_pools()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if "--muertos" in sys.argv or "--revivir" in sys.argv:
+        _muertos(revivir="--revivir" in sys.argv)
+    else:
+        try:
+            asyncio.run(_run())
+        except KeyboardInterrupt:
+            print("\n🛑 Consumidor detenido (lo que estaba a medias se vuelve a entregar).")
\ No newline at end of file
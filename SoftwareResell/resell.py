@@ -1,15 +1,21 @@
 import json
+import os
 import re
 import sys
 import time
-from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
-from urllib.parse import urlparse
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-import requests
-import yaml
+from logger import obtener_registro
+from metricas import cronometrar
+
+# Arranque rápido: requests, yaml, sqlite, asyncio y los módulos de cada
+# comando (drafts, query, sync, delist, fotos, ...) se importan dentro de la
+# función que los usa. "python resell.py" sin argumentos o un "query" no
+# cargan la pila HTTP, y este módulo no crea carpetas al importarse (cada
+# store crea la suya la primera vez que escribe).
+# benchmarks/check_importtime.py controla que esto no se pierda.
 
 # =========================
 # CONFIG / PATHS
@@ -17,13 +23,9 @@ import yaml
 ROOT = Path(__file__).resolve().parent
 DRAFTS_DIR = ROOT / "drafts"
 LOGS_DIR = ROOT / "logs"
-STATE_PATH = ROOT / "inventory" / "state.json"
+STATE_PATH = ROOT / "inventory" / "state.json" # legado: se migra a inventory/state.db
 EBAY_YAML = ROOT / "ebay.yaml"
 
-DRAFTS_DIR.mkdir(exist_ok=True)
-LOGS_DIR.mkdir(exist_ok=True)
-STATE_PATH.parent.mkdir(exist_ok=True)
-
 ACCIONES_LOG = LOGS_DIR / "acciones.log"
 CROSSLIST_LOG = LOGS_DIR / "crosslist.log"
 MAP_PATH = ROOT / "inventory" / "map.json" # item_id -> platform ids (posh/depop), etc.
@@ -31,17 +33,34 @@ MAP_PATH = ROOT / "inventory" / "map.json" # item_id -> platform ids (posh/depop
 # Cambia a False cuando ya estés listo en producción
 MODO_PRUEBA = True
 
+# Crosslist en lote (crosslist --batch)
+BATCH_WORKERS = 8 # llamadas GetItem simultáneas
+# requests/s, cuota diaria y reintentos de la Trading API: ebay_cliente.py
+
+# Trading API (EBAY_TRADING_URL permite apuntar a un stub local)
+EBAY_TRADING_URL = os.environ.get("EBAY_TRADING_URL", "https://api.ebay.com/ws/api.dll")
+
+# Delist en lote (delist --batch)
+END_ITEMS_MAX = 10 # máximo de items por llamada EndItems
+END_ITEMS_RETRIES = 3 # reintentos solo de los items que fallaron
+END_ITEMS_WORKERS = 4 # llamadas EndItems simultáneas
+END_ITEMS_YA_TERMINADO = {"1047"} # "already closed": para nosotros es éxito
+END_ITEMS_NO_REINTENTAR = {"17"} # no es tuyo / no existe
+
 # =========================
 # UTIL
 # =========================
-def now_stamp() -> str:
-    return datetime.now().strftime("%Y%m%d_%H%M%S")
-
 def log_line(path: Path, msg: str) -> None:
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    path.parent.mkdir(exist_ok=True)
-    with open(path, "a", encoding="utf-8") as f:
-        f.write(f"{ts} | {msg}\n")
+    # "EVENTO | k=v | texto" -> campos para el modo JSON lines
+    partes = msg.split(" | ")
+    campos: Dict[str, Any] = {"evento": partes[0]}
+    for p in partes[1:]:
+        k, sep, v = p.partition("=")
+        if sep and k.isidentifier():
+            campos[k] = v
+        else:
+            campos.setdefault("args", []).append(p)
+    obtener_registro(path).escribir(msg, campos)
 
 def load_json(path: Path, default: Any) -> Any:
     if not path.exists():
@@ -68,29 +87,10 @@ def clean_html(html: str) -> str:
 def one_line(s: str) -> str:
     return re.sub(r"\s+", " ", s).strip()
 
-def extract_item_id(value: str) -> str:
-    s = value.strip()
-
-    # Si ya es puro número
-    if re.fullmatch(r"\d{8,20}", s):
-        return s
-
-    # URL eBay típica: /itm/287045152832 o .../itm/Title/287045152832
-    # Acepta URLs con parámetros & (Powershell requiere comillas)
-    m = re.search(r"/itm/(?:[^/]+/)?(\d{8,20})", s)
-    if m:
-        return m.group(1)
-
-    # Algunas URLs llevan ?hash=item...
-    m2 = re.search(r"(?:item=|hash=item)(\d{8,20})", s)
-    if m2:
-        return m2.group(1)
-
-    raise ValueError("No pude extraer el ItemID. Pega la URL completa del listing de eBay o el número ItemID.")
-
 def load_ebay_cfg() -> Dict[str, Any]:
     if not EBAY_YAML.exists():
         raise FileNotFoundError("No encuentro ebay.yaml en la carpeta SoftwareResell.")
+    import yaml
     with open(EBAY_YAML, "r", encoding="utf-8") as f:
         cfg = yaml.safe_load(f) or {}
     # Soporta formato:
@@ -110,36 +110,29 @@ def load_ebay_cfg() -> Dict[str, Any]:
             raise ValueError("ebay.yaml no tiene la clave api.ebay.com.")
     return {"host": host, **(cfg.get(host) or {})}
 
-def ebay_trading_call(call_name: str, token: str, xml_body: str) -> str:
-    url = "https://api.ebay.com/ws/api.dll"
-    headers = {
-        "X-EBAY-API-CALL-NAME": call_name,
-        "X-EBAY-API-SITEID": "0", # US
-        "X-EBAY-API-COMPATIBILITY-LEVEL": "967",
-        "Content-Type": "text/xml",
-    }
-    # Trading API usa token dentro del XML
-    r = requests.post(url, data=xml_body.encode("utf-8"), headers=headers, timeout=30)
-    return r.text
-
-def parse_trading_ack_and_error(xml: str) -> Tuple[str, str]:
-    # super simple (sin librerías XML extra)
-    ack = ""
-    msg = ""
-    m_ack = re.search(r"<Ack>(.*?)</Ack>", xml, flags=re.S)
-    if m_ack:
-        ack = m_ack.group(1).strip()
-    # Error message largo
-    m_long = re.search(r"<LongMessage>(.*?)</LongMessage>", xml, flags=re.S)
-    if m_long:
-        msg = clean_html(m_long.group(1))
-    else:
-        m_short = re.search(r"<ShortMessage>(.*?)</ShortMessage>", xml, flags=re.S)
-        if m_short:
-            msg = clean_html(m_short.group(1))
-    return ack, msg
-
-def get_item_from_ebay(item_id: str, token: str) -> Dict[str, Any]:
+# Una sola Session y un solo cliente de la Trading API para todo el proceso
+# (cubo de tokens, cuota compartida entre procesos y backoff): ebay_cliente.py
+def get_session():
+    from ebay_cliente import obtener_session
+    return obtener_session()
+
+def ebay_trading_call(call_name: str, token: str, xml_body: str, plazo_s: Optional[float] = None) -> str:
+    # Trading API usa token dentro del XML. EndItem/EndItems van con prioridad;
+    # ErrorEbay (RuntimeError) si eBay sigue frenando o la cuota está agotada
+    from ebay_cliente import obtener_cliente
+    return obtener_cliente().llamar(call_name, xml_body, url=EBAY_TRADING_URL, plazo_s=plazo_s)
+
+@cronometrar("get_item_from_ebay")
+def get_item_from_ebay(item_id: str, token: str, refresh: bool = False, offline: bool = False) -> Dict[str, Any]:
+    """GetItem pasando por la caché en disco (ver ebay_cache.py)."""
+    from ebay_cache import obtener_cache
+    parsed = obtener_cache().fetch(
+        item_id, lambda: fetch_getitem_parsed(item_id, token), refresh=refresh, offline=offline
+    )
+    return item_from_parsed(item_id, parsed)
+
+def fetch_getitem_parsed(item_id: str, token: str) -> Dict[str, Any]:
+    from ebay_xml import ack_and_message, parse_trading_response
     body = f"""<?xml version="1.0" encoding="utf-8"?>
 <GetItemRequest xmlns="urn:ebay:apis:eBLBaseComponents">
   <RequesterCredentials>
@@ -151,61 +144,65 @@ def get_item_from_ebay(item_id: str, token: str) -> Dict[str, Any]:
 </GetItemRequest>"""
 
     xml = ebay_trading_call("GetItem", token, body)
-    ack, msg = parse_trading_ack_and_error(xml)
+    # Una sola pasada sobre el XML (ver ebay_xml.py)
+    parsed = parse_trading_response(xml)
+    ack, msg = ack_and_message(parsed)
     if ack != "Success" and ack != "Warning":
-        raise RuntimeError(f"eBay respondió con Ack={ack}. Mensaje: {msg or 'Sin mensaje'}")
-
-    # Extrae campos básicos de XML (rápido, sin parser pesado)
-    def grab(tag: str) -> str:
-        m = re.search(fr"<{tag}>(.*?)</{tag}>", xml, flags=re.S)
-        return clean_html(m.group(1)).strip() if m else ""
+        raise RuntimeError(f"eBay respondió con Ack={ack}. Mensaje: {clean_html(msg) or 'Sin mensaje'}")
+    return parsed
 
-    title = grab("Title")
-    desc = grab("Description")
+def item_from_getitem_xml(item_id: str, xml: str) -> Dict[str, Any]:
+    from ebay_xml import ack_and_message, parse_trading_response
+    parsed = parse_trading_response(xml)
+    ack, msg = ack_and_message(parsed)
+    if ack != "Success" and ack != "Warning":
+        raise RuntimeError(f"eBay respondió con Ack={ack}. Mensaje: {clean_html(msg) or 'Sin mensaje'}")
+    return item_from_parsed(item_id, parsed, xml)
 
-    price = ""
-    m_price = re.search(r"<CurrentPrice[^>]*>(.*?)</CurrentPrice>", xml, flags=re.S)
-    if m_price:
-        price = clean_html(m_price.group(1)).strip()
+def item_from_parsed(item_id: str, parsed: Dict[str, Any], xml: str = "") -> Dict[str, Any]:
+    it = parsed["item"]
 
-    category = grab("CategoryName")
-    condition = grab("ConditionDisplayName")
+    title = clean_html(it.get("title", "")).strip()
+    desc = (it.get("description") or "").strip()
+    price = it.get("current_price", "")
+    category = it.get("category_name", "")
+    condition = it.get("condition", "") or it.get("condition_description", "")
     brand = ""
 
     # Item specifics (NameValueList)
     specifics = {}
-    for block in re.findall(r"<NameValueList>(.*?)</NameValueList>", xml, flags=re.S):
-        n = re.search(r"<Name>(.*?)</Name>", block, flags=re.S)
-        v = re.search(r"<Value>(.*?)</Value>", block, flags=re.S)
-        if n and v:
-            key = clean_html(n.group(1)).strip()
-            val = clean_html(v.group(1)).strip()
-            specifics[key] = val
-            if key.lower() == "brand":
-                brand = val
+    for key, val in it.get("specifics", []):
+        specifics[key] = val
+        if key.lower() == "brand":
+            brand = val
 
     # Fotos
-    pics = []
-    for p in re.findall(r"<PictureURL>(.*?)</PictureURL>", xml, flags=re.S):
-        urlp = clean_html(p).strip()
-        if urlp:
-            pics.append(urlp)
+    pics = list(it.get("pictures", []))
 
+    # "category" sigue siendo el nombre, como siempre en resell.py (en
+    # generar_drafts.py es el ID). Claves agregadas para compartir código con
+    # generar_drafts/crosslist:
+    # - currency: la usan las plantillas (plantillas.py) para "USD 34.99"
+    # - category_id/category_name: sin ambigüedad, para draft_store.ebay_json()
     return {
         "item_id": item_id,
         "title": title,
         "description_html": desc,
         "description": clean_html(desc),
         "price": price,
+        "currency": it.get("current_currency", ""),
         "category": category,
+        "category_id": it.get("category_id", ""),
+        "category_name": category,
         "condition": condition,
         "brand": brand,
         "specifics": specifics,
         "pictures": pics,
-        "raw_xml": xml, # debug
+        "raw_xml": xml, # debug (vacío si vino de la caché)
     }
 
-def end_item_ebay(item_id: str, token: str, reason: str = "NotAvailable") -> None:
+@cronometrar("end_item_ebay")
+def end_item_ebay(item_id: str, token: str, reason: str = "NotAvailable", plazo_s: Optional[float] = None) -> None:
     body = f"""<?xml version="1.0" encoding="utf-8"?>
 <EndItemRequest xmlns="urn:ebay:apis:eBLBaseComponents">
   <RequesterCredentials>
@@ -214,166 +211,322 @@ def end_item_ebay(item_id: str, token: str, reason: str = "NotAvailable") -> Non
   <ItemID>{item_id}</ItemID>
   <EndingReason>{reason}</EndingReason>
 </EndItemRequest>"""
-    xml = ebay_trading_call("EndItem", token, body)
-    ack, msg = parse_trading_ack_and_error(xml)
-    if ack != "Success" and ack != "Warning":
-        raise RuntimeError(f"EndItem falló. Ack={ack}. Mensaje: {msg or 'Sin mensaje'}")
+    xml = ebay_trading_call("EndItem", token, body, plazo_s=plazo_s)
+    from ebay_xml import ack_and_message, parse_trading_response
+    parsed = parse_trading_response(xml)
+    ack, msg = ack_and_message(parsed)
+    if ack == "Success" or ack == "Warning":
+        return
+    # mismos códigos que EndItems: 1047 (ya terminado) cuenta como hecho y
+    # 17 (no existe / no es tuyo) no se arregla reintentando
+    codigos = {e.get("code", "") for e in parsed["errors"] if e.get("severity") != "Warning"}
+    if codigos and codigos <= END_ITEMS_YA_TERMINADO:
+        return
+    msg = clean_html(msg) or "Sin mensaje"
+    if codigos & END_ITEMS_NO_REINTENTAR:
+        from delist import ErrorDefinitivo
+        raise ErrorDefinitivo(f"EndItem {item_id} falló. Ack={ack}. Mensaje: {msg}")
+    raise RuntimeError(f"EndItem falló. Ack={ack}. Mensaje: {msg}")
+
+def _end_items_call(item_ids: List[str], token: str, reason: str) -> Dict[str, Tuple[str, str]]:
+    """Un EndItems con hasta END_ITEMS_MAX items. Devuelve {item_id: (error, código)}; error "" = terminado."""
+    from ebay_cliente import ErrorEbay
+    from ebay_xml import ack_and_message, parse_end_items_response
+    containers = "".join(f"""
+  <EndItemRequestContainer>
+    <MessageID>{i}</MessageID>
+    <ItemID>{item_id}</ItemID>
+    <EndingReason>{reason}</EndingReason>
+  </EndItemRequestContainer>""" for i, item_id in enumerate(item_ids))
+    body = f"""<?xml version="1.0" encoding="utf-8"?>
+<EndItemsRequest xmlns="urn:ebay:apis:eBLBaseComponents">
+  <RequesterCredentials>
+    <eBayAuthToken>{token}</eBayAuthToken>
+  </RequesterCredentials>{containers}
+</EndItemsRequest>"""
+    try:
+        xml = ebay_trading_call("EndItems", token, body)
+    except ErrorEbay as e:
+        return {item_id: (one_line(str(e)), e.codigo) for item_id in item_ids}
+
+    parsed = parse_end_items_response(xml)
+    _, msg = ack_and_message(parsed)
+    general = clean_html(msg) or f"Sin respuesta para el item (Ack={parsed['ack'] or '?'})"
+    out = {item_id: (general, "") for item_id in item_ids}
+    for cont in parsed["items"]:
+        cid = cont["correlation_id"]
+        if not cid.isdigit() or int(cid) >= len(item_ids):
+            continue
+        err, code = "", ""
+        for e in cont["errors"]:
+            if e.get("severity") == "Warning" or e.get("code") in END_ITEMS_YA_TERMINADO:
+                continue
+            err, code = clean_html(e.get("long") or e.get("short") or "Error"), e.get("code", "")
+            break
+        out[item_ids[int(cid)]] = (err, code)
+    return out
+
+def end_items_ebay(item_ids: Iterable[str], token: str, reason: str = "NotAvailable",
+                   retries: int = END_ITEMS_RETRIES, workers: int = END_ITEMS_WORKERS) -> Dict[str, Dict[str, Any]]:
+    """
+    Termina muchos listings con EndItems (END_ITEMS_MAX por llamada, varias
+    llamadas a la vez sobre la Session compartida). Lee el ack de cada item
+    por CorrelationID y reintenta solo los que fallaron, con backoff.
+    Devuelve {item_id: {ok, error, code, intentos}}.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    pendientes = list(dict.fromkeys(item_ids))
+    res = {i: {"ok": False, "error": "", "code": "", "intentos": 0} for i in pendientes}
+    intento = 0
+    while pendientes:
+        intento += 1
+        lotes = [pendientes[i:i + END_ITEMS_MAX] for i in range(0, len(pendientes), END_ITEMS_MAX)]
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(lotes)))) as ex:
+            for errores in ex.map(lambda lote: _end_items_call(lote, token, reason), lotes):
+                for item_id, (err, code) in errores.items():
+                    res[item_id].update(ok=not err, error=err, code=code, intentos=intento)
+        pendientes = [i for i in pendientes
+                      if not res[i]["ok"] and res[i]["code"] not in END_ITEMS_NO_REINTENTAR]
+        if intento > retries:
+            break
+        if pendientes:
+            time.sleep(min(8.0, 0.5 * 2 ** (intento - 1)))
+    return res
+
+def sync_catalog(token: str, full: bool = False, workers: int = BATCH_WORKERS,
+                 rps: Optional[float] = None) -> Dict[str, Any]:
+    """sync: trae el catálogo de eBay (completo o solo lo que cambió) a la caché y a map.json."""
+    from ebay_cliente import obtener_cliente
+    from ebay_sync import SyncEbay
+    if rps is not None:
+        obtener_cliente().cubo.ajustar(rps)
+    syncer = SyncEbay(
+        token,
+        call=lambda call_name, body: ebay_trading_call(call_name, token, body),
+        refrescar_item=lambda item_id: get_item_from_ebay(item_id, token, refresh=True),
+        workers=workers,
+    )
+    res = syncer.sync(full=full)
+    log_line(CROSSLIST_LOG, f"SYNC | mode={res['mode']} | items={res['items']} | ended={res['ended']} "
+                            f"| calls={res['calls']} | secs={res['secs']} | cursor={res['cursor']}")
+    print(f"🔄 Sync {res['mode']}: {res['items']} items ({res['refreshed']} en caché, {res['ended']} terminados) "
+          f"en {res['secs']}s con {res['calls']} llamadas")
+    for err in res["errors"][:10]:
+        print(f" ❌ {err[:120]}")
+    if res["errors"]:
+        print(f"🔁 {len(res['errors'])} items fallidos quedan pendientes para el próximo sync")
+    return res
+
+def delist_batch(item_ids: List[str], token: str, reason: str = "NotAvailable") -> Dict[str, Any]:
+    """delist --batch: EndItems en lote + una línea DELIST por item en acciones.log."""
+    total = len(item_ids)
+    if MODO_PRUEBA:
+        print(f"🧪 SIMULADO: EndItems para {total} items ({-(-total // END_ITEMS_MAX)} llamadas)")
+        return {"ok": [], "failed": {}}
+
+    print(f"🧨 EndItems: {total} items en lotes de {END_ITEMS_MAX} ...")
+    t0 = time.perf_counter()
+    res = end_items_ebay(item_ids, token, reason)
+    elapsed = time.perf_counter() - t0
+
+    ok = [i for i, r in res.items() if r["ok"]]
+    failed = {i: r["error"] for i, r in res.items() if not r["ok"]}
+    for item_id, r in res.items():
+        linea = f"DELIST | item_id={item_id} | platform=ebay | ok={int(r['ok'])} | intentos={r['intentos']}"
+        if not r["ok"]:
+            linea += f" | error={r['error'].replace('|', '/')}"
+        log_line(ACCIONES_LOG, linea)
+
+    print(f"✅ {len(ok)}/{total} terminados en {elapsed:.1f}s")
+    if failed:
+        print(f"❌ Fallaron {len(failed)}:")
+        for item_id, err in list(failed.items())[:10]:
+            print(f" ❌ {item_id}: {err[:120]}")
+        if len(failed) > 10:
+            print(f" ... y {len(failed) - 10} más (ver {ACCIONES_LOG.name})")
+    return {"ok": ok, "failed": failed}
 
 # =========================
 # DRAFT TEMPLATES
 # =========================
+# El texto sale de templates/<plataforma>.txt, mismo motor que generar_drafts.py
 def build_depop_draft(item: Dict[str, Any]) -> str:
-    title = one_line(item["title"])[:80]
-    price = item["price"]
-    desc = item["description"].strip()
-    specs = item.get("specifics", {}) or {}
-
-    # hashtags suaves (sin inventar cosas)
-    tags = []
-    for k in ["Brand", "Color", "Size", "Style"]:
-        if k in specs and specs[k]:
-            tags.append(specs[k])
-
-    hashtags = " ".join([f"#{re.sub(r'[^a-zA-Z0-9]', '', t).lower()}" for t in tags[:6] if t])
-
-    # Depop suele ir más corto
-    short = desc
-    if len(short) > 550:
-        short = short[:540].rsplit(" ", 1)[0] + "…"
-
-    photos = item.get("pictures", [])[:8]
-
-    lines = []
-    lines.append("=== DEPOP DRAFT ===")
-    lines.append(f"Título: {title}")
-    lines.append(f"Precio: {price}")
-    lines.append("")
-    lines.append("Descripción (copia/pega):")
-    lines.append(short)
-    if hashtags.strip():
-        lines.append("")
-        lines.append("Hashtags sugeridos:")
-        lines.append(hashtags)
-    lines.append("")
-    lines.append("Fotos (URLs):")
-    for i, p in enumerate(photos, 1):
-        lines.append(f"{i}. {p}")
-    lines.append("")
-    lines.append("Item specifics (referencia):")
-    for k, v in specs.items():
-        lines.append(f"- {k}: {v}")
-    return "\n".join(lines).strip()
+    import plantillas
+    return plantillas.render("depop", item)
 
 def build_posh_draft(item: Dict[str, Any]) -> str:
-    title = one_line(item["title"])[:80]
-    price = item["price"]
-    desc = item["description"].strip()
-    specs = item.get("specifics", {}) or {}
-    photos = item.get("pictures", [])[:16]
-
-    # Campos útiles (si existen)
-    brand = specs.get("Brand") or item.get("brand") or ""
-    size = specs.get("Size") or specs.get("Waist Size") or ""
-    color = specs.get("Color") or ""
-    style = specs.get("Style") or ""
-    material = specs.get("Material") or ""
-    dept = specs.get("Department") or ""
-
-    lines = []
-    lines.append("=== POSHMARK DRAFT ===")
-    lines.append(f"Título: {title}")
-    lines.append(f"Precio: {price}")
-    lines.append("")
-    lines.append("Campos sugeridos:")
-    lines.append(f"- Brand: {brand}")
-    lines.append(f"- Size: {size}")
-    lines.append(f"- Color: {color}")
-    lines.append(f"- Style: {style}")
-    lines.append(f"- Material: {material}")
-    lines.append(f"- Department: {dept}")
-    lines.append("")
-    lines.append("Descripción (copia/pega):")
-    lines.append(desc)
-    lines.append("")
-    lines.append("Fotos (URLs):")
-    for i, p in enumerate(photos, 1):
-        lines.append(f"{i}. {p}")
-    lines.append("")
-    lines.append("Item specifics (referencia):")
-    for k, v in specs.items():
-        lines.append(f"- {k}: {v}")
-    return "\n".join(lines).strip()
+    import plantillas
+    return plantillas.render("posh", item)
 
 # =========================
 # CORE ACTIONS
 # =========================
-def crosslist_from_item(item_id: str, token: str) -> None:
-    print(f"🔎 Buscando listing eBay ItemID={item_id} ...")
-    item = get_item_from_ebay(item_id, token)
-
-    # guarda debug JSON
-    debug_json = {
-        "item_id": item_id,
-        "title": item["title"],
-        "price": item["price"],
-        "category": item["category"],
-        "condition": item["condition"],
-        "pictures": item["pictures"],
-        "specifics": item["specifics"],
-        "description": item["description"],
-        "fetched_at": datetime.now().isoformat(),
-    }
-    debug_path = DRAFTS_DIR / f"ebay_{item_id}.json"
-    save_json(debug_path, debug_json)
+def crosslist_from_item(item_id: str, token: str, update_map: bool = True, verbose: bool = True,
+                        refresh: bool = False, offline: bool = False) -> Dict[str, Any]:
+    if verbose:
+        print(f"🔎 Buscando listing eBay ItemID={item_id} ...")
+    item = get_item_from_ebay(item_id, token, refresh=refresh, offline=offline)
 
     depop_text = build_depop_draft(item)
     posh_text = build_posh_draft(item)
 
-    stamp = now_stamp()
-    depop_path = DRAFTS_DIR / f"draft_depop_{item_id}_{stamp}.txt"
-    posh_path = DRAFTS_DIR / f"draft_posh_{item_id}_{stamp}.txt"
-
-    depop_path.write_text(depop_text, encoding="utf-8")
-    posh_path.write_text(posh_text, encoding="utf-8")
+    # drafts/drafts.db: versionado, sin duplicar textos idénticos (ver draft_store.py)
+    from draft_store import ebay_json, obtener_store
+    store = obtener_store()
+    store.save_many([
+        (item_id, "ebay", ebay_json(item)), # debug, mismo formato que crosslist.py
+        (item_id, "depop", depop_text),
+        (item_id, "posh", posh_text),
+    ])
+    depop_v = store.versions(item_id, "depop")[0]["version"]
+    posh_v = store.versions(item_id, "posh")[0]["version"]
 
     # registra en map.json para futuro delist cruzado
+    # (en lote se escribe una sola vez al final, ver crosslist_batch)
+    if update_map:
+        record_crosslisted([item_id])
+
+    log_line(CROSSLIST_LOG, f"CROSSLIST | item_id={item_id} | depop=v{depop_v} | posh=v{posh_v}")
+    if not verbose:
+        return item
+    print("\n✅ Drafts guardados en drafts/drafts.db:")
+    print(f" - depop v{depop_v}: python resell.py drafts show {item_id} depop")
+    print(f" - posh  v{posh_v}: python resell.py drafts show {item_id} posh")
+    print(f" - ebay (debug): python resell.py drafts show {item_id} ebay")
+    return item
+
+def prefetch_fotos(pictures: Dict[str, List[str]]) -> Dict[str, Any]:
+    """crosslist --fotos: baja y adapta las fotos (ver fotos.py) con la Session compartida."""
+    from fotos import CacheFotos, imprimir_reporte
+    rep = CacheFotos(session=get_session()).preparar(pictures)
+    log_line(CROSSLIST_LOG, f"FOTOS | items={rep['items']} | descargadas={rep['descargadas']} | hits={rep['hits']} "
+                            f"| bytes_ahorrados={rep['bytes_ahorrados']} | secs={rep['secs']}")
+    imprimir_reporte(rep)
+    return rep
+
+def record_crosslisted(item_ids: Iterable[str]) -> None:
     mp = load_json(MAP_PATH, {})
-    mp.setdefault(item_id, {})
-    mp[item_id]["last_crosslist_at"] = datetime.now().isoformat()
+    ts = datetime.now().isoformat()
+    for item_id in item_ids:
+        mp.setdefault(item_id, {})
+        mp[item_id]["last_crosslist_at"] = ts
     save_json(MAP_PATH, mp)
 
-    log_line(CROSSLIST_LOG, f"CROSSLIST | item_id={item_id} | depop={depop_path.name} | posh={posh_path.name}")
-    print("\n✅ Drafts creados:")
-    print(f" - {depop_path}")
-    print(f" - {posh_path}")
-    print(f" - {debug_path} (debug)")
+def read_batch_source(source: str) -> List[str]:
+    """Lee ItemIDs/URLs de un archivo (o stdin con "-"), uno por línea. Los links se resuelven en paralelo."""
+    from ebay_ids import resolver_lote
+    if source == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        lines = Path(source).read_text(encoding="utf-8").splitlines()
+
+    values = [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
+    resolved, errors = resolver_lote(values)
+    for value, err in errors.items():
+        print(f"⚠️ No pude extraer ItemID de {value!r} ({err.splitlines()[0] if err else 'sin detalle'}), lo salto")
+    return list(dict.fromkeys(resolved[v] for v in values if v in resolved))
+
+def crosslist_batch(item_ids: List[str], token: str, workers: int = BATCH_WORKERS, rps: Optional[float] = None,
+                    refresh: bool = False, offline: bool = False, fotos: bool = False) -> Dict[str, Any]:
+    """
+    Crosslist de muchos ItemIDs: pool de hilos acotado sobre una sola
+    Session keep-alive. El ritmo y la cuota los pone ebay_cliente.py (solo
+    las llamadas reales a eBay gastan presupuesto; la caché no); si la cuota
+    se agota, el resto del lote falla sin llamar a eBay.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from ebay_cache import obtener_cache
+    from ebay_cliente import CuotaAgotada, obtener_cliente
+    cubo = obtener_cliente().cubo
+    if rps is not None:
+        cubo.ajustar(rps)
+    ok: List[str] = []
+    failed: Dict[str, str] = {}
+    pictures: Dict[str, List[str]] = {}
+    agotada: List[CuotaAgotada] = []
+
+    def work(item_id: str) -> None:
+        if agotada:
+            raise agotada[0]
+        try:
+            item = crosslist_from_item(item_id, token, update_map=False, verbose=False, refresh=refresh, offline=offline)
+        except CuotaAgotada as e:
+            agotada.append(e)
+            raise
+        pictures[item_id] = item["pictures"]
+
+    total = len(item_ids)
+    print(f"🚚 Crosslist en lote: {total} items | workers={workers} | rps={cubo.rps_max or 'sin límite'}")
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(work, item_id): item_id for item_id in item_ids}
+        for done, fut in enumerate(as_completed(futures), 1):
+            item_id = futures[fut]
+            try:
+                fut.result()
+                ok.append(item_id)
+            except Exception as e:
+                failed[item_id] = str(e)
+                log_line(CROSSLIST_LOG, f"CROSSLIST_FAIL | item_id={item_id} | {one_line(str(e))}")
+            if done % 50 == 0 or done == total:
+                print(f"   {done}/{total} ({len(failed)} errores)")
+    elapsed = time.perf_counter() - t0
+
+    if ok:
+        record_crosslisted(ok)
+    if fotos and pictures:
+        prefetch_fotos({i: pictures[i] for i in item_ids if i in pictures}) # mismo orden que el lote
+
+    rate = len(item_ids) / elapsed if elapsed > 0 else 0.0
+    log_line(CROSSLIST_LOG, f"CROSSLIST_BATCH | total={total} | ok={len(ok)} | fail={len(failed)} | secs={elapsed:.1f} | items_s={rate:.2f}")
+    print(f"\n✅ Lote terminado: {len(ok)} OK, {len(failed)} con error en {elapsed:.1f}s ({rate:.2f} items/s)")
+    cs = obtener_cache().stats()
+    print(f"🗃️ Caché GetItem: {cs['entries']} items, hit-rate {cs['hit_rate']:.0%} ({cs['hits']} hits / {cs['misses']} misses)")
+    if agotada:
+        print(f"⛔ {agotada[0]}. Los items sin procesar quedan para la próxima corrida.")
+    for item_id, err in list(failed.items())[:10]:
+        print(f" ❌ {item_id}: {one_line(err)[:120]}")
+    if len(failed) > 10:
+        print(f" ... y {len(failed) - 10} más (ver {CROSSLIST_LOG.name})")
+    return {"total": total, "ok": len(ok), "failed": failed, "seconds": elapsed, "items_per_sec": rate}
 
 def mark_sold(item_id: str, platform: str) -> None:
-    # estado inventario
-    state = load_json(STATE_PATH, {})
-    state[item_id] = {"status": "SOLD", "sold_on": platform, "sold_at": datetime.now().isoformat()}
-    save_json(STATE_PATH, state)
+    # estado inventario (UPSERT de una fila en inventory/state.db)
+    from inventory.store import get_store
+    get_store().mark_sold(item_id, platform)
     log_line(ACCIONES_LOG, f"ITEM_SOLD | {item_id} | {platform} | {'SIMULADO' if MODO_PRUEBA else 'REAL'}")
 
-def delist_everywhere(item_id: str, sold_on: str, token: str) -> None:
+def delist_everywhere(item_id: str, sold_on: str, token: str) -> List[Any]:
     """
-    Delist seguro y oficial: eBay (sí).
-    Depop/Posh: dejamos placeholders (manual guiado / futuro).
+    Delist en todas las plataformas menos donde se vendió, a la vez:
+    eBay (EndItem oficial), Depop y Poshmark (pool de navegador).
+    Reintentos, límites y deadlines por plataforma en delist.py.
     """
-    if sold_on.lower() != "ebay":
-        # si se vendió fuera de eBay, bajamos eBay (oficial)
-        if MODO_PRUEBA:
-            print(f"🧪 SIMULADO: EndItem en eBay para ItemID={item_id}")
-        else:
-            print(f"🧨 Delist eBay (EndItem) ItemID={item_id} ...")
-            end_item_ebay(item_id, token)
-            print("✅ eBay delist OK")
-
-    # placeholders
-    if sold_on.lower() != "depop":
-        print(f"ℹ️ Depop delist: (manual por ahora) ItemID={item_id}")
-    if sold_on.lower() != "poshmark":
-        print(f"ℹ️ Poshmark delist: (manual por ahora) ItemID={item_id}")
+    from inventory.store import PLATFORMS
+    destinos = [p for p in PLATFORMS if p != sold_on.lower()]
+    if MODO_PRUEBA:
+        for p in destinos:
+            print(f"🧪 SIMULADO: delist en {p} para ItemID={item_id}")
+        return []
+
+    import asyncio
+    from delist import OrquestadorDelist, accion_ebay, accion_navegador, imprimir_resultados
+    from pool_navegador import cerrar_pools
+
+    async def run() -> List[Any]:
+        try:
+            return await OrquestadorDelist(acciones={
+                "ebay": accion_ebay(token),
+                "depop": accion_navegador("depop"),
+                "poshmark": accion_navegador("poshmark"),
+            }).delist(item_id, destinos)
+        finally:
+            await cerrar_pools()
+
+    print(f"🧨 Delist ItemID={item_id} en {', '.join(destinos)} ...")
+    resultados = asyncio.run(run())
+    imprimir_resultados(resultados)
+    return resultados
 
 def usage() -> None:
     print("""
@@ -383,12 +536,51 @@ Uso:
    python resell.py crosslist 287045152832
    python resell.py crosslist "https://www.ebay.com/itm/287045152832?..."
 
+   En lote (un ItemID o URL por línea; "-" lee de stdin):
+   python resell.py crosslist --batch items.txt
+   python resell.py crosslist --batch items.txt --workers 8 --rps 4
+   (límite de la Trading API: EBAY_RPS, EBAY_CUOTA_DIA, EBAY_CUOTA_HORA; ver ebay_cliente.py)
+
+   Caché de GetItem (cache/getitem, TTL 24h):
+   --refresh  ignora la caché y vuelve a pedir a eBay
+   --offline  solo usa la caché (regenera drafts sin llamar a eBay)
+   --fotos    además baja las fotos (caché en cache/fotos) y deja copias por
+              plataforma en drafts/fotos/<ItemID>/ (redimensiona si hay Pillow)
+   python resell.py cache stats
+
+   Drafts (drafts/drafts.db, últimas 5 versiones por item):
+   python resell.py drafts show 287045152832 depop
+   python resell.py drafts export carpeta_salida [ItemID ...]
+   python resell.py drafts stats
+
+   Consultas (estado + map.json + logs):
+   python resell.py query unsold
+   python resell.py query sold --on depop --since week
+   python resell.py query crosslisted --not-delisted
+   python resell.py query sold --by sold_on      (también --count, --json, --limit N, --by day)
+
 2) Marcar venta + delist (simula venta en otra plataforma):
    python resell.py sold 287045152832 depop
    python resell.py sold 287045152832 poshmark
    python resell.py sold 287045152832 ebay
 
-3) Cambiar modo prueba (opcional):
+3) Delist en lote en eBay (EndItems, 10 items por llamada):
+   python resell.py delist --batch vendidos.txt
+   python resell.py delist --batch vendidos.txt --reason NotAvailable
+
+4) Sync del catálogo de eBay (caché de GetItem + inventory/map.json):
+   python resell.py sync            (la primera vez completo, después solo cambios)
+   python resell.py sync --full
+
+5) Métricas (latencias de procesar_evento, GetItem/EndItem, Depop, drafts
+   y llamadas a la Trading API por Ack/error, de todos los procesos,
+   más la cuota de la Trading API usada hoy):
+   python resell.py stats
+   python resell.py stats --prom     (mismo formato que GET /metrics)
+   python resell.py stats --reset
+   python resell.py stats --cuota    (solo la cuota de la Trading API)
+
+6) Cambiar modo prueba (opcional):
    Edita MODO_PRUEBA = False en resell.py cuando estés listo.
 
 Tips PowerShell:
@@ -396,25 +588,267 @@ Tips PowerShell:
   python resell.py crosslist "https://www.ebay.com/itm/....&...."
 """.strip())
 
+def drafts_command(args: List[str]) -> None:
+    from draft_store import obtener_store
+    from ebay_ids import extract_item_id
+    store = obtener_store()
+    sub = args[0].lower()
+    if sub == "show" and len(args) >= 2:
+        item_id = extract_item_id(args[1])
+        platform = args[2].lower() if len(args) >= 3 else "depop"
+        body = store.latest(item_id, platform)
+        if body is None:
+            print(f"📭 No hay draft {platform} para ItemID={item_id}")
+            sys.exit(1)
+        print(body)
+        return
+    if sub == "export" and len(args) >= 2:
+        n = store.export(Path(args[1]), item_ids=[extract_item_id(a) for a in args[2:]] or None)
+        print(f"✅ Exportados {n} drafts a {args[1]}")
+        return
+    if sub == "stats":
+        print(json.dumps(store.stats(), indent=2))
+        return
+    usage()
+    sys.exit(1)
+
+def query_command(args: List[str]) -> None:
+    """
+    query unsold | sold [--on PLAT] [--since 7d|week|2026-01-01] | crosslisted [--not-delisted]
+    Salida: una línea por SKU, o --count, --by CAMPO (agregado), --json, --limit N.
+    """
+    on = pop_opt(args, "--on")
+    since = pop_opt(args, "--since")
+    by = pop_opt(args, "--by")
+    limit = pop_opt(args, "--limit")
+    as_json = pop_flag(args, "--json")
+    only_count = pop_flag(args, "--count")
+    not_delisted = pop_flag(args, "--not-delisted")
+    what = args[0].lower() if args else ""
+
+    from inventory.consulta import obtener_indice_inventario, parse_desde
+
+    idx = obtener_indice_inventario()
+    idx.refrescar()
+    t0 = time.perf_counter()
+    if what == "unsold":
+        rows = idx.sin_vender()
+    elif what == "sold":
+        rows = idx.vendidos(on, parse_desde(since) if since else "")
+    elif what == "crosslisted":
+        rows = idx.sin_delistar() if not_delisted else idx.crosslisteados()
+    elif what == "all":
+        rows = list(idx.filas().values())
+    else:
+        usage()
+        sys.exit(1)
+    if what != "sold" and on:
+        rows = [r for r in rows if r.sold_on == on.lower()]
+    query_ms = (time.perf_counter() - t0) * 1000
+
+    if by:
+        counts: Dict[str, int] = {}
+        for r in rows:
+            key = r.sold_at[:10] if by == "day" else str(r.como_dict().get(by) or "-")
+            counts[key] = counts.get(key, 0) + 1
+        for key, n in sorted(counts.items()):
+            print(f"{key:20} {n}")
+    elif only_count:
+        print(len(rows))
+    else:
+        shown = rows[:int(limit)] if limit else rows
+        for r in shown:
+            if as_json:
+                print(json.dumps(r.como_dict(), ensure_ascii=False))
+            else:
+                print(f"{r.sku:16} {r.status or 'ACTIVE':8} {r.sold_on or '-':9} {r.sold_at[:19] or '-':19} "
+                      f"crosslist={r.crosslisted_at[:10] or '-'} delisted={','.join(sorted(r.delisted)) or '-'}")
+    print(f"⏱️ {len(rows)} resultados | índice {len(idx.filas())} SKUs (carga {idx.ultima_carga_ms:.0f} ms) "
+          f"| consulta {query_ms:.2f} ms", file=sys.stderr)
+
+def stats_command(args: List[str]) -> None:
+    """
+    stats [--prom | --json | --reset | --cuota]: latencias y contadores de
+    metricas.py juntando los volcados de todos los procesos (logs/metricas/)
+    y la cuota de la Trading API (ebay_cliente.py).
+    """
+    from metricas import VOLCADOS_DIR, combinar, formato_prometheus, leer_volcados, percentil
+    if pop_flag(args, "--reset"):
+        n = 0
+        # *.compactando: restos de una compactación cortada (ver metricas.compactar)
+        for p in [*VOLCADOS_DIR.glob("*.json"), *VOLCADOS_DIR.glob("*.compactando")]:
+            p.unlink()
+            n += 1
+        print(f"🧹 Borrados {n} volcados de métricas")
+        return
+    datos = combinar(leer_volcados())
+    if not args or args == ["--cuota"]:
+        mostrar_cuota()
+    if pop_flag(args, "--cuota"):
+        return
+    if pop_flag(args, "--prom"):
+        print(formato_prometheus(datos), end="")
+        return
+    if pop_flag(args, "--json"):
+        print(json.dumps(datos, indent=2, ensure_ascii=False))
+        return
+    if not datos["series"]:
+        print(f"📭 Sin métricas todavía ({VOLCADOS_DIR} vacío).")
+        return
+
+    def etiqueta(nombre: str, labels: Dict[str, str]) -> str:
+        extra = ",".join(f"{k}={v}" for k, v in labels.items())
+        return f"{nombre}{{{extra}}}" if extra else nombre
+
+    desde = datetime.fromtimestamp(datos["desde"]).strftime("%Y-%m-%d %H:%M")
+    print(f"📊 Métricas de {datos['procesos']} procesos desde {desde}\n")
+    print(f"{'':40} {'n':>8} {'errores':>8} {'media':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    totales = [s for s in datos["series"] if s["nombre"].endswith("_total")]
+    for s in datos["series"]:
+        if "cuentas" not in s or not s["n"]:
+            continue
+        base = s["nombre"][:-len("_segundos")]
+        buckets = datos["familias"][s["nombre"]]["buckets"]
+        errores = sum(t["valor"] for t in totales if t["nombre"] == base + "_total"
+                      and all(t["labels"].get(k) == v for k, v in s["labels"].items())
+                      and (t["labels"].get("resultado") == "error" or t["labels"].get("error")
+                           or t["labels"].get("ack") not in (None, "Success", "Warning")))
+        ms = [percentil(buckets, s["cuentas"], p) * 1000 for p in (50, 95, 99)]
+        print(f"{etiqueta(base, s['labels']):40} {s['n']:>8} {int(errores):>8} {s['suma'] / s['n'] * 1000:>7.1f}ms "
+              + " ".join(f"{v:>7.1f}ms" for v in ms))
+
+    # desglose: Ack/código de eBay, status HTTP y errores por tipo
+    detalle = [t for t in totales if t["valor"] and ({"ack", "codigo"} & set(t["labels"]) or t["labels"].get("error"))]
+    if detalle:
+        print("\nPor Ack / status / error:")
+        for t in detalle:
+            print(f"  {etiqueta(t['nombre'], t['labels']):60} {int(t['valor']):>8}")
+
+def mostrar_cuota() -> None:
+    from ebay_cliente import CUOTA_DB, CuotaEbay
+    if not CUOTA_DB.exists():
+        return
+    for ventana, c in CuotaEbay().stats().items():
+        if c["limite"]:
+            print(f"🎫 Cuota Trading API ({ventana}): {c['usadas']}/{c['limite']} "
+                  f"| se libera en {c['libre_en_s'] // 60} min")
+    print()
+
+def pop_flag(args: List[str], flag: str) -> bool:
+    if flag in args:
+        args.remove(flag)
+        return True
+    return False
+
+def pop_opt(args: List[str], name: str) -> Optional[str]:
+    """Valor de `name VALOR` (y lo saca de args); None si no está, "" si falta el valor."""
+    if name in args:
+        i = args.index(name)
+        val = args[i + 1] if i + 1 < len(args) else ""
+        del args[i:i + 2]
+        return val
+    return None
+
+def opts_numericas(args: List[str]) -> Tuple[int, Optional[float]]:
+    """--workers N y --rps X de crosslist --batch / sync; sin valor válido muestra el uso y sale."""
+    workers, rps = pop_opt(args, "--workers"), pop_opt(args, "--rps")
+    try:
+        return (BATCH_WORKERS if workers is None else int(workers)), (None if rps is None else float(rps))
+    except ValueError:
+        usage()
+        sys.exit(1)
+
 def main():
-    if len(sys.argv) < 3:
+    argv = sys.argv[:]
+    refresh = pop_flag(argv, "--refresh")
+    offline = pop_flag(argv, "--offline")
+    fotos = pop_flag(argv, "--fotos")
+    if len(argv) < 3 and argv[1:] not in (["sync"], ["stats"]):
         usage()
         sys.exit(1)
 
-    cmd = sys.argv[1].lower()
-    cfg = load_ebay_cfg()
-    token = cfg.get("token", "").strip()
-    if not token:
-        raise ValueError("Falta token en ebay.yaml")
+    cmd = argv[1].lower()
+
+    if cmd == "cache" and argv[2] == "stats":
+        from ebay_cache import obtener_cache
+        print(json.dumps(obtener_cache().stats(), indent=2))
+        return
+
+    if cmd == "drafts":
+        drafts_command(argv[2:])
+        return
+
+    if cmd == "query":
+        query_command(argv[2:])
+        return
+
+    if cmd == "stats":
+        stats_command(argv[2:])
+        return
+
+    token = ""
+    if not offline:
+        cfg = load_ebay_cfg()
+        token = cfg.get("token", "").strip()
+        if not token:
+            raise ValueError("Falta token en ebay.yaml")
+
+    if cmd == "crosslist" and argv[2] == "--batch":
+        args = argv[3:]
+        if not args:
+            usage()
+            sys.exit(1)
+        source = args[0]
+        workers, rps = opts_numericas(args)
+        item_ids = read_batch_source(source)
+        if not item_ids:
+            print("📭 No hay ItemIDs válidos en el lote.")
+            return
+        result = crosslist_batch(item_ids, token, workers=workers, rps=rps, refresh=refresh, offline=offline,
+                                 fotos=fotos)
+        if result["failed"]:
+            sys.exit(2)
+        return
+
+    if cmd == "sync":
+        args = argv[2:]
+        workers, rps = opts_numericas(args)
+        res = sync_catalog(token, full="--full" in args, workers=workers, rps=rps)
+        if res["errors"]:
+            sys.exit(2)
+        return
+
+    if cmd == "delist" and argv[2] == "--batch":
+        args = argv[3:]
+        if not args:
+            usage()
+            sys.exit(1)
+        source = args[0]
+        reason = pop_opt(args, "--reason")
+        if reason == "":
+            usage()
+            sys.exit(1)
+        item_ids = read_batch_source(source)
+        if not item_ids:
+            print("📭 No hay ItemIDs válidos en el lote.")
+            return
+        result = delist_batch(item_ids, token, reason or "NotAvailable")
+        if result["failed"]:
+            sys.exit(2)
+        return
+
+    from ebay_ids import extract_item_id
 
     if cmd == "crosslist":
-        item_id = extract_item_id(" ".join(sys.argv[2:]).strip())
-        crosslist_from_item(item_id, token)
+        item_id = extract_item_id(" ".join(argv[2:]).strip())
+        item = crosslist_from_item(item_id, token, refresh=refresh, offline=offline)
+        if fotos:
+            prefetch_fotos({item_id: item["pictures"]})
         return
 
     if cmd == "sold":
-        item_id = extract_item_id(sys.argv[2])
-        platform = sys.argv[3].strip().lower() if len(sys.argv) >= 4 else "ebay"
+        item_id = extract_item_id(argv[2])
+        platform = argv[3].strip().lower() if len(argv) >= 4 else "ebay"
         print(f"📩 Venta recibida: item_id={item_id} platform={platform}")
         mark_sold(item_id, platform)
         delist_everywhere(item_id, platform, token)
@@ -1,46 +1,271 @@
-import json
-from http.server import BaseHTTPRequestHandler, HTTPServer
 import asyncio
+import json
+import os
+import socket
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
 
-from Cerebro_v2 import procesar_evento # tu cerebro ya existe
+from cola import COLA_VENTAS, ColaTrabajos, lease_renovado, obtener_cola
+from metricas import exponer
+
+# Servidor de webhooks asyncio-nativo:
+# - UN solo event loop de larga vida (nada de asyncio.run por request)
+# - responde 202 en milisegundos y encola el evento en la cola persistente
+#   (cola.py): lo aceptado sobrevive a un reinicio del servidor
+# - N workers consumen la cola y llaman a Cerebro_v2.procesar_evento; lo que
+#   falla se reintenta con backoff y termina en dead-letter
+# - GET /stats expone profundidad de cola y latencias; GET /metrics las
+#   métricas de metricas.py (procesar_evento, llamadas a eBay, ...) en
+#   formato Prometheus
 
 HOST = "0.0.0.0"
-PORT = 5000
-
-class Handler(BaseHTTPRequestHandler):
-    def _send_json(self, code: int, payload: dict):
-        body = json.dumps(payload).encode("utf-8")
-        self.send_response(code)
-        self.send_header("Content-Type", "application/json")
-        self.send_header("Content-Length", str(len(body)))
-        self.end_headers()
-        self.wfile.write(body)
-
-    def do_POST(self):
+PORT = int(os.environ.get("PORT", "5000"))
+WORKERS = int(os.environ.get("WEBHOOK_WORKERS", "4"))
+QUEUE_MAX = int(os.environ.get("WEBHOOK_QUEUE_MAX", "10000"))
+MAX_BODY = 1_000_000
+SAMPLES = 2000 # latencias recientes que se guardan para percentiles
+ESPERA_VACIA_S = 1.0 # workers sin trabajo: cada cuánto mirar reintentos con backoff
+PROFUNDIDAD_CADA_S = 0.5 # cada cuánto se recalcula la profundidad para el 503
+
+_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 413: "Payload Too Large", 503: "Service Unavailable"}
+
+
+def _percentil(muestras, p: float) -> float:
+    if not muestras:
+        return 0.0
+    orden = sorted(muestras)
+    k = min(len(orden) - 1, int(round(p / 100 * (len(orden) - 1))))
+    return orden[k]
+
+
+class WebhookServer:
+    def __init__(self, procesador: Callable[[dict, int], Awaitable[None]], workers: int = WORKERS,
+                 queue_max: int = QUEUE_MAX, stats_extra: Optional[Callable[[], dict]] = None,
+                 cola: Optional[ColaTrabajos] = None):
+        self.procesador = procesador
+        self.stats_extra = stats_extra
+        self.n_workers = max(1, workers)
+        self.queue_max = queue_max
+        self.cola = cola or obtener_cola()
+        self.consumidor = f"webhook@{socket.gethostname()}:{os.getpid()}"
+        self._hay_trabajo = asyncio.Event()
+        self._profundidad = 0
+        self._profundidad_en = 0.0
+        self._ocupados = 0
+        self.recibidos = 0
+        self.procesados = 0
+        self.errores = 0
+        self.rechazados = 0
+        self.ack_ms = deque(maxlen=SAMPLES) # tiempo de respuesta HTTP
+        self.espera_ms = deque(maxlen=SAMPLES) # tiempo en cola
+        self.proceso_ms = deque(maxlen=SAMPLES) # duración de procesar_evento
+        self._workers = []
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    # ----------------------------
+    # Workers
+    # ----------------------------
+
+    async def _worker(self, n: int) -> None:
+        while True:
+            self._ocupados += 1 # desde antes de tomar, para que stop(drain) no corte a mitad
+            self._hay_trabajo.clear() # antes de mirar: un encolar de ahora en más nos despierta
+            trabajos = await asyncio.to_thread(self.cola.tomar, f"{self.consumidor}/{n}", 1, COLA_VENTAS)
+            if not trabajos:
+                self._ocupados -= 1
+                try:
+                    await asyncio.wait_for(self._hay_trabajo.wait(), ESPERA_VACIA_S)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            trabajo = trabajos[0]
+            inicio = time.perf_counter()
+            self.espera_ms.append(max(0.0, time.time() - trabajo.creado_en) * 1000)
+            try:
+                async with lease_renovado(self.cola, trabajo):
+                    await self.procesador(trabajo.payload, trabajo.id)
+                await asyncio.to_thread(self.cola.confirmar, trabajo)
+                self.procesados += 1
+            except Exception as e:
+                self.errores += 1
+                estado = await asyncio.to_thread(self.cola.fallar, trabajo, str(e) or type(e).__name__,
+                                                 payload=getattr(e, "payload_reintento", None))
+                print(f"❌ Error procesando evento {trabajo.payload} (intento {trabajo.intentos}, {estado}): {e}")
+            finally:
+                self.proceso_ms.append((time.perf_counter() - inicio) * 1000)
+                self._ocupados -= 1
+
+    def stats(self) -> dict:
+        extra = self.stats_extra() if self.stats_extra else {}
+        cola = self.cola.stats()
+        return {
+            "queue_depth": cola["pending"] + cola["in_flight"],
+            "queue": cola,
+            "workers": self.n_workers,
+            "received": self.recibidos,
+            "processed": self.procesados,
+            "errors": self.errores,
+            "rejected": self.rechazados,
+            "ack_ms": {"p50": _percentil(self.ack_ms, 50), "p99": _percentil(self.ack_ms, 99)},
+            "queue_wait_ms": {"p50": _percentil(self.espera_ms, 50), "p99": _percentil(self.espera_ms, 99)},
+            "process_ms": {"p50": _percentil(self.proceso_ms, 50), "p99": _percentil(self.proceso_ms, 99)},
+            **extra,
+        }
+
+    # ----------------------------
+    # HTTP mínimo (HTTP/1.1 con keep-alive)
+    # ----------------------------
+
+    async def _responder(self, writer: asyncio.StreamWriter, code: int, payload, keep_alive: bool) -> None:
+        if isinstance(payload, str):
+            body, tipo = payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body, tipo = json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json"
+        head = (
+            f"HTTP/1.1 {code} {_REASONS.get(code, 'OK')}\r\n"
+            f"Content-Type: {tipo}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        ).encode("latin-1")
+        writer.write(head + body)
+        await writer.drain()
+
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
         try:
-            length = int(self.headers.get("Content-Length", "0"))
-            raw = self.rfile.read(length).decode("utf-8") if length > 0 else "{}"
-            data = json.loads(raw) if raw else {}
-        except Exception as e:
-            return self._send_json(400, {"ok": False, "error": f"JSON inválido: {e}"})
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                t0 = time.perf_counter()
+                try:
+                    metodo, ruta, version = linea.decode("latin-1").split()
+                except ValueError:
+                    await self._responder(writer, 400, {"ok": False, "error": "bad_request"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                try:
+                    length = int(headers.get("content-length", "0") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._responder(writer, 400, {"ok": False, "error": "bad_content_length"}, False)
+                    break
+                if length > MAX_BODY:
+                    await self._responder(writer, 413, {"ok": False, "error": "body_too_large"}, False)
+                    break
+                raw = await reader.readexactly(length) if length > 0 else b""
+
+                code, payload = await self._rutear(metodo, ruta, raw)
+                await self._responder(writer, code, payload, keep_alive)
+                if metodo == "POST":
+                    self.ack_ms.append((time.perf_counter() - t0) * 1000)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def _rutear(self, metodo: str, ruta: str, raw: bytes):
+        # todo lo que toca SQLite o disco va a un hilo: con busy_timeout de
+        # 30 s, hacerlo en el event loop frenaría a todas las conexiones
+        path = ruta.split("?", 1)[0]
+        if metodo == "GET":
+            if path in ("/stats", "/health", "/"):
+                return 200, {"ok": True, **await asyncio.to_thread(self.stats)}
+            if path == "/metrics":
+                return 200, await asyncio.to_thread(exponer)
+            return 404, {"ok": False, "error": "not_found"}
+        if metodo != "POST":
+            return 405, {"ok": False, "error": "method_not_allowed"}
 
         # Aceptamos /webhook o cualquier ruta
         try:
-            asyncio.run(procesar_evento(data))
+            data = json.loads(raw.decode("utf-8")) if raw else {}
         except Exception as e:
-            return self._send_json(500, {"ok": False, "error": str(e)})
+            return 400, {"ok": False, "error": f"JSON inválido: {e}"}
 
-        return self._send_json(200, {"ok": True})
+        if await self._profundidad_actual() >= self.queue_max:
+            # 503 → eBay reintenta más tarde en vez de perder el evento
+            self.rechazados += 1
+            return 503, {"ok": False, "error": "queue_full"}
+        # el 202 sale recién con el evento en disco
+        trabajo_id = await asyncio.to_thread(self.cola.encolar, data)
+        self._profundidad += 1
+        self._hay_trabajo.set()
+        self.recibidos += 1
+        return 202, {"ok": True, "queued": self._profundidad, "id": trabajo_id}
 
-    def log_message(self, format, *args):
-        # Silencia logs ruidosos del servidor
-        return
+    async def _profundidad_actual(self) -> int:
+        ahora = time.monotonic()
+        if ahora - self._profundidad_en >= PROFUNDIDAD_CADA_S:
+            self._profundidad_en = ahora # una sola consulta aunque lleguen varios POST a la vez
+            s = await asyncio.to_thread(self.cola.stats)
+            self._profundidad = s["pending"] + s["in_flight"]
+        return self._profundidad
 
-def main():
-    print(f"🟢 Webhook server corriendo en http://localhost:{PORT}")
+    # ----------------------------
+    # Ciclo de vida
+    # ----------------------------
+
+    async def start(self, host: str = HOST, port: int = PORT) -> None:
+        self._workers = [asyncio.create_task(self._worker(n)) for n in range(self.n_workers)]
+        self._server = await asyncio.start_server(self._atender, host, port)
+
+    async def stop(self, drain: bool = True) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if drain:
+            # hasta que no quede nada listo para tomar ni en proceso (lo que
+            # espera un backoff queda en la cola para el próximo arranque)
+            while self._ocupados or (await asyncio.to_thread(self.cola.stats))["ready"]:
+                await asyncio.sleep(0.05)
+        for w in self._workers:
+            w.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+    async def serve_forever(self, host: str = HOST, port: int = PORT) -> None:
+        await self.start(host, port)
+        async with self._server:
+            await self._server.serve_forever()
+
+
+async def _run() -> None:
+    from Cerebro_v2 import procesar_evento # tu cerebro ya existe
+    from dedup import obtener_indice
+    from delist import obtener_orquestador
+
+    server = WebhookServer(procesar_evento, workers=WORKERS,
+                           stats_extra=lambda: {"dedup": obtener_indice().stats(),
+                                                "delist": obtener_orquestador().stats()})
+    print(f"🟢 Webhook server corriendo en http://localhost:{PORT} ({WORKERS} workers)")
+    print(f"📊 Estado de la cola: http://localhost:{PORT}/stats")
     print("📌 Déjalo abierto. Ahora abre otra terminal y levanta ngrok.")
-    httpd = HTTPServer((HOST, PORT), Handler)
-    httpd.serve_forever()
+    try:
+        await server.serve_forever(HOST, PORT)
+    finally:
+        await server.stop(drain=False)
+        from pool_navegador import cerrar_pools
+        await cerrar_pools()
+
+
+def main():
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        print("\n🛑 Webhook server detenido.")
 
 if __name__ == "__main__":
-    main()__
\ No newline at end of file
+    main()
@@ -0,0 +1,266 @@
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Callable, Dict, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from metricas import observar
+
+# Servidor HTTP único para app.py (y los atajos SoftwareResell/app.py y
+# drafts/app.py), solo stdlib:
+# - pool de hilos acotado: un cliente lento o el health check de la
+#   plataforma no frenan al resto de los requests
+# - HTTP/1.1 con keep-alive; toda respuesta lleva Content-Length
+# - conexiones ociosas se cierran a los IDLE_TIMEOUT_S, o antes si el pool
+#   se llena: una conexión keep-alive ociosa ocupa un hilo, y HILOS clientes
+#   quietos no pueden dejar esperando a un webhook nuevo
+# - apagado ordenado con SIGTERM/SIGINT: deja de aceptar, termina lo que
+#   está en curso (hasta APAGADO_MAX_S) y cierra las conexiones ociosas
+#
+# Uso:
+#   app = App()
+#   @app.ruta("POST", "/sold")
+#   def sold(pedido: Pedido): return 200, {"ok": True}
+#   servir(app, "0.0.0.0", 10000)
+
+HILOS = int(os.environ.get("HTTP_HILOS", "32"))
+IDLE_TIMEOUT_S = float(os.environ.get("HTTP_IDLE_TIMEOUT_S", "15"))
+APAGADO_MAX_S = float(os.environ.get("HTTP_APAGADO_MAX_S", "10"))
+MAX_BODY = 1_000_000
+
+
+class Pedido:
+    __slots__ = ("metodo", "path", "query", "headers", "cuerpo", "cliente")
+
+    def __init__(self, metodo: str, ruta: str, headers, cuerpo: bytes, cliente: str):
+        u = urlparse(ruta)
+        self.metodo = metodo
+        self.path = u.path
+        self.query = u.query
+        self.headers = headers
+        self.cuerpo = cuerpo
+        self.cliente = cliente
+
+    def param(self, nombre: str) -> str:
+        return (parse_qs(self.query).get(nombre, [""])[0] or "").strip()
+
+
+Ruta = Callable[[Pedido], Tuple[int, Any]] # (status, dict/list → JSON | str → texto)
+
+
+class App:
+    def __init__(self, max_body: int = MAX_BODY):
+        self.max_body = max_body
+        self.rutas: Dict[Tuple[str, str], Ruta] = {}
+
+    def ruta(self, metodo: str, *paths: str) -> Callable[[Ruta], Ruta]:
+        def registrar(fn: Ruta) -> Ruta:
+            for p in paths:
+                self.rutas[(metodo.upper(), p)] = fn
+            return fn
+        return registrar
+
+    def atender(self, pedido: Pedido) -> Tuple[int, Any]:
+        fn = self.rutas.get((pedido.metodo, pedido.path))
+        if fn is None and pedido.metodo == "HEAD":
+            fn = self.rutas.get(("GET", pedido.path))
+        if fn is not None:
+            return fn(pedido)
+        if any(path == pedido.path for _, path in self.rutas):
+            return 405, {"ok": False, "error": "method_not_allowed"}
+        return 404, {"ok": False, "error": "not_found"}
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "SoftwareResell"
+    timeout = IDLE_TIMEOUT_S # conexión ociosa (o cliente que no termina de mandar) → se cierra
+    # headers + cuerpo salen en un solo send (handle_one_request hace flush);
+    # sin esto Nagle + ACK demorado meten ~40 ms por request keep-alive
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    ocupado = False
+    ultimo = 0.0 # monotonic del último request terminado (o de la conexión)
+
+    def setup(self):
+        super().setup()
+        self.ultimo = time.monotonic()
+        self.server._registrar(self)
+
+    def finish(self):
+        try:
+            super().finish()
+        finally:
+            self.server._olvidar(self)
+
+    def parse_request(self):
+        # ya llegó la primera línea: desde acá el request cuenta como "en curso"
+        self.ocupado = True
+        return super().parse_request()
+
+    def handle_one_request(self):
+        try:
+            super().handle_one_request()
+        except socket.timeout:
+            self.close_connection = True
+        finally:
+            self.ocupado = False
+            self.ultimo = time.monotonic()
+        if self.server.cerrando:
+            self.close_connection = True
+
+    def _atender(self) -> None:
+        app: App = self.server.app
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            self.close_connection = True
+            return self._enviar(411, {"ok": False, "error": "length_required"})
+        try:
+            length = int(self.headers.get("Content-Length", "0") or 0)
+        except ValueError:
+            self.close_connection = True
+            return self._enviar(400, {"ok": False, "error": "bad_content_length"})
+        if length > app.max_body:
+            self.close_connection = True # no se lee el cuerpo: la conexión no se puede reutilizar
+            return self._enviar(413, {"ok": False, "error": "body_too_large"})
+        cuerpo = self.rfile.read(length) if length > 0 else b""
+
+        t0 = time.perf_counter()
+        pedido = Pedido(self.command, self.path, self.headers, cuerpo, self.client_address[0])
+        try:
+            code, payload = app.atender(pedido)
+        except Exception as e:
+            print(f"❌ Error atendiendo {self.command} {pedido.path}: {e}", file=sys.stderr, flush=True)
+            code, payload = 500, {"ok": False, "error": "internal_error"}
+        self._enviar(code, payload)
+        # rutas desconocidas juntas: un escaneo de paths no crea series nuevas
+        ruta = pedido.path if (self.command, pedido.path) in app.rutas else "otra"
+        observar("http", time.perf_counter() - t0, {"ruta": ruta}, metodo=self.command, codigo=str(code))
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _atender
+
+    def _enviar(self, code: int, payload: Any) -> None:
+        if isinstance(payload, (dict, list)):
+            body, tipo = json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json"
+        elif isinstance(payload, bytes):
+            body, tipo = payload, "application/octet-stream"
+        else:
+            body, tipo = str(payload).encode("utf-8"), "text/plain; charset=utf-8"
+        if self.server.cerrando:
+            self.close_connection = True
+        self.send_response(code)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Connection", "close" if self.close_connection else "keep-alive")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verboso:
+            super().log_message(format, *args)
+
+
+class ServidorHTTP(HTTPServer):
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, app: App, host: str = "0.0.0.0", port: int = 0, hilos: int = HILOS, verboso: bool = False):
+        super().__init__((host, port), _Manejador)
+        self.app = app
+        self.verboso = verboso
+        self.cerrando = False
+        self.hilos = max(1, hilos)
+        self._pool = ThreadPoolExecutor(max_workers=self.hilos, thread_name_prefix="http")
+        self._conexiones = set()
+        self._en_pool = 0 # conexiones entregadas al pool (atendiéndose o esperando hilo)
+        self._lock = threading.Lock()
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def _registrar(self, h: _Manejador) -> None:
+        with self._lock:
+            self._conexiones.add(h)
+
+    def _olvidar(self, h: _Manejador) -> None:
+        with self._lock:
+            self._conexiones.discard(h)
+
+    def process_request(self, request, client_address):
+        # cada conexión (con todos sus requests keep-alive) va a un hilo del
+        # pool; si no quedan hilos libres se cierran las ociosas más viejas
+        with self._lock:
+            self._en_pool += 1
+            sobran = self._en_pool - self.hilos
+        if sobran > 0:
+            self._cerrar_ociosas(sobran)
+        self._pool.submit(self._conexion, request, client_address)
+
+    def _conexion(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._lock:
+                self._en_pool -= 1
+
+    def _cerrar_ociosas(self, n: int = 0) -> None:
+        """Cierra las conexiones sin request en curso (las n más viejas si n > 0)."""
+        with self._lock:
+            ociosas = sorted((h for h in self._conexiones if not h.ocupado), key=lambda h: h.ultimo)
+        if n > 0:
+            ociosas = ociosas[:n]
+        for h in ociosas:
+            try:
+                h.connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def apagar(self, espera_s: float = APAGADO_MAX_S) -> int:
+        """
+        Deja de aceptar conexiones, espera a que terminen los requests en
+        curso (hasta espera_s) y cierra las ociosas. Devuelve cuántas
+        conexiones quedaron abiertas al vencer la espera.
+        """
+        self.cerrando = True
+        self.shutdown() # corta serve_forever (hay que llamarlo desde otro hilo)
+        limite = time.monotonic() + espera_s
+        while True:
+            self._cerrar_ociosas()
+            with self._lock:
+                quedan = len(self._conexiones)
+            if not quedan or time.monotonic() >= limite:
+                break
+            time.sleep(0.05)
+        self._pool.shutdown(wait=not quedan, cancel_futures=True)
+        self.server_close()
+        return quedan
+
+
+def servir(app: App, host: str = "0.0.0.0", port: int = 10000, hilos: int = HILOS) -> None:
+    """Atiende hasta SIGTERM/SIGINT y apaga ordenadamente."""
+    srv = ServidorHTTP(app, host, port, hilos)
+    apagado: Dict[str, threading.Thread] = {}
+
+    def _senal(signum, frame):
+        if "hilo" not in apagado:
+            print(f"🛑 Señal {signal.Signals(signum).name}: terminando requests en curso ...", flush=True)
+            apagado["hilo"] = threading.Thread(target=srv.apagar, name="apagado")
+            apagado["hilo"].start()
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, _senal)
+    print(f"Listening on port {srv.port} ({hilos} hilos, keep-alive {IDLE_TIMEOUT_S:.0f}s) ...", flush=True)
+    srv.serve_forever()
+    if "hilo" in apagado:
+        apagado["hilo"].join()
+    print("✅ Servidor detenido.", flush=True)
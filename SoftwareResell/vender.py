@@ -1,21 +1,51 @@
 import sys
-import asyncio
 
-from Cerebro_v2 import procesar_evento
+# Cerebro_v2 (y con él asyncio, sqlite y el pool de navegador) se importa
+# recién después de validar los argumentos: un error de uso sale al instante.
+#
+# La venta primero se guarda en la cola persistente (cola.py) y después se
+# procesa. Si algo falla o se corta, queda en la cola y la retoma
+# procesar_cola.py. Con --encolar solo se guarda.
 
 def mostrar_uso():
     print("Uso:")
-    print(" python vender.py <SKU> <platform>")
+    print(" python vender.py <SKU> <platform> [--encolar]")
     print("Ejemplo:")
     print(" python vender.py SKU-DEMO-123 ebay")
 
-async def main():
-    if len(sys.argv) != 3:
+async def vender(trabajo_id: int):
+    from Cerebro_v2 import procesar_evento
+    from cola import lease_renovado, obtener_cola
+    from pool_navegador import cerrar_pools
+
+    cola = obtener_cola()
+    trabajos = cola.tomar("vender.py", ids=[trabajo_id])
+    if not trabajos:
+        print("ℹ️ La venta ya la tomó otro consumidor (procesar_cola.py).")
+        return
+    trabajo = trabajos[0]
+    try:
+        async with lease_renovado(cola, trabajo):
+            await procesar_evento(trabajo.payload, trabajo.id)
+    except Exception as e:
+        estado = cola.fallar(trabajo, str(e) or type(e).__name__, payload=getattr(e, "payload_reintento", None))
+        print(f"❌ Falló ({e}); queda en la cola como '{estado}' para procesar_cola.py")
+        raise
+    else:
+        cola.confirmar(trabajo)
+    finally:
+        await cerrar_pools()
+
+def main():
+    args = sys.argv[1:]
+    solo_encolar = "--encolar" in args
+    args = [a for a in args if a != "--encolar"]
+    if len(args) != 2:
         mostrar_uso()
         return
 
-    sku = sys.argv[1]
-    platform = sys.argv[2].lower()
+    sku = args[0]
+    platform = args[1].lower()
 
     if platform not in ["ebay", "depop", "poshmark"]:
         print("❌ Plataforma inválida. Usa: ebay, depop, poshmark")
@@ -27,7 +57,14 @@ async def main():
         "sku": sku
     }
 
-    await procesar_evento(evento)
+    from cola import obtener_cola
+    trabajo_id = obtener_cola().encolar(evento)
+    if solo_encolar:
+        print(f"📥 Venta encolada (#{trabajo_id}). Procesar con: python procesar_cola.py")
+        return
+
+    import asyncio
+    asyncio.run(vender(trabajo_id))
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    main()
\ No newline at end of file